@@ -0,0 +1,112 @@
+# Manupilot 백엔드 (FastAPI)
+# 실행 예: uvicorn backend.app:app --host 0.0.0.0 --port 8000
+#         MANUPILOT_BACKEND_URL=http://127.0.0.1:8000 streamlit run main.py
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel
+
+from services.query_service import QueryService, validate_filters, validate_pdf_hash
+
+service = QueryService()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    service.shutdown()
+
+
+app = FastAPI(title="Manupilot backend", lifespan=lifespan)
+
+
+class AskRequest(BaseModel):
+    question: str
+    pdf_hash: Optional[str] = None
+    filters: Optional[dict] = None
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", **service.snapshot()}
+
+
+MISSING_MANUAL = "등록되지 않은 매뉴얼입니다. 먼저 /manuals로 업로드하세요."
+
+
+# 매뉴얼 해시 형식 검사 (형식이 틀리면 400, 형식은 맞지만 등록되지 않았으면 각 경로에서 404)
+def check_pdf_hash(pdf_hash):
+    try:
+        validate_pdf_hash(pdf_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# PDF 원본을 요청 본문(application/pdf)으로 받아 등록·색인
+@app.post("/manuals")
+async def add_manual(request: Request):
+    data = await request.body()
+    if not data.startswith(b"%PDF"):
+        raise HTTPException(status_code=400, detail="PDF 파일이 아닙니다.")
+    return await service.add_manual(data)
+
+
+# 이미 등록된 매뉴얼인지 확인 (클라이언트는 해시만 보내고, 없을 때만 업로드)
+@app.get("/manuals/{pdf_hash}")
+async def get_manual(pdf_hash: str):
+    check_pdf_hash(pdf_hash)
+    if not service.has_manual(pdf_hash):
+        raise HTTPException(status_code=404, detail=MISSING_MANUAL)
+    return {"pdf_hash": pdf_hash}
+
+
+# 등록된 매뉴얼 요약 카드
+@app.post("/manuals/{pdf_hash}/summary")
+async def summarize(pdf_hash: str):
+    check_pdf_hash(pdf_hash)
+    try:
+        return await service.summarize(pdf_hash)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=MISSING_MANUAL)
+
+
+class LibraryRequest(BaseModel):
+    pdf_hash: str
+    line: str = "default"
+    equipment_id: Optional[str] = None
+    version: Optional[str] = None
+    language: str = "ko"
+    title: Optional[str] = None
+
+
+@app.get("/library")
+async def library():
+    return await service.library()
+
+
+# 등록된 매뉴얼을 매뉴얼 라이브러리에 추가
+@app.post("/library")
+async def add_to_library(req: LibraryRequest):
+    check_pdf_hash(req.pdf_hash)
+    try:
+        return await service.add_to_library(req.pdf_hash, req.line, equipment_id=req.equipment_id,
+                                            version=req.version, language=req.language, title=req.title)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=MISSING_MANUAL)
+
+
+@app.post("/ask")
+async def ask(req: AskRequest):
+    if not req.question.strip():
+        raise HTTPException(status_code=400, detail="질문을 입력해 주세요.")
+    try:
+        validate_filters(req.filters or {})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if req.pdf_hash is not None:
+        check_pdf_hash(req.pdf_hash)
+    try:
+        return await service.ask(req.question, pdf_hash=req.pdf_hash, filters=req.filters)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=MISSING_MANUAL)
@@ -0,0 +1,89 @@
+# ANN 인덱스 종류별 recall@k / 질의 지연(p50, p99) / 인덱스 메모리 비교 벤치마크
+# 실행 예: python -m bench.ann_benchmark --n 1000000 --dim 1536 --queries 200 --json bench_output.json
+import argparse
+import json
+import time
+
+import numpy as np
+
+from services import ann
+
+
+# 클러스터 구조가 있는 합성 벡터 (실제 임베딩처럼 주제별로 뭉쳐 있도록)
+def synthetic_vectors(n, dim, n_clusters=256, seed=42):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors.astype("float32")
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(n, dim, n_queries, top_k, kinds, seed=42):
+    data = synthetic_vectors(n + n_queries, dim, seed=seed)
+    base, queries = data[:n], data[n:]
+
+    # 기준값: 정확한 코사인 검색 결과
+    reference = ann.build_index(base, "flat_ip")
+    _, truth = ann.search(reference, queries, top_k)
+
+    results = []
+    for kind in kinds:
+        started = time.perf_counter()
+        index = ann.build_index(base, kind)
+        build_s = time.perf_counter() - started
+
+        latencies = []
+        found = []
+        for query in queries:
+            t0 = time.perf_counter()
+            _, labels = ann.search(index, query[None, :], top_k)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            found.append(labels[0])
+
+        results.append({
+            "index_type": kind,
+            "resolved_type": ann.resolve_type(kind, n),
+            "n": n,
+            "dim": dim,
+            "top_k": top_k,
+            "recall_at_k": round(recall_at_k(np.array(found), truth), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "build_s": round(build_s, 2),
+            "index_mb": round(ann.index_bytes(index) / 1024 / 1024, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN 인덱스 종류별 recall/지연/메모리 비교")
+    parser.add_argument("--n", type=int, default=100_000, help="인덱스에 넣을 벡터 수")
+    parser.add_argument("--dim", type=int, default=1536, help="벡터 차원 (ada-002: 1536)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--types", default=",".join(ann.INDEX_TYPES), help="쉼표로 구분한 인덱스 종류")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = run(args.n, args.dim, args.queries, args.top_k, args.types.split(","), args.seed)
+
+    header = f"{'type':<10}{'resolved':<10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'build s':>10}{'MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['index_type']:<10}{r['resolved_type']:<10}{r['recall_at_k']:>10.4f}"
+              f"{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['build_s']:>10.2f}{r['index_mb']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
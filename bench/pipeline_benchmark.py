@@ -0,0 +1,302 @@
+# 검색 파이프라인 단계별 처리량 / 지연(p50, p99) / 최대 RSS 벤치마크
+# 합성 한국어 매뉴얼(텍스트 페이지 + 스캔 이미지 페이지)과 로컬 결정적 임베딩, 가짜 LLM 서버 사용
+# 실행 예: python -m bench.pipeline_benchmark --pages 10,50,200 --json bench_pipeline.json
+#         python -m bench.pipeline_benchmark --compare bench_pipeline.json   (이전 결과와 비교)
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+STAGES = ("extract_text_with_ocr", "chunk_text", "get_openai_embeddings", "build_vectorstore",
+          "search_documents", "rag_chain")
+
+_PROCEDURES = ["전원을 차단하고 잠금 장치를 설치합니다", "냉각수 밸브를 천천히 엽니다", "필터 카트리지를 교체합니다",
+               "압력 게이지가 정상 범위인지 확인합니다", "컨베이어 벨트 장력을 조정합니다", "윤활유를 보충합니다",
+               "센서 커넥터를 분리한 뒤 접점을 청소합니다", "시운전 후 진동 값을 기록합니다"]
+_SAFETY = ["보호 장갑과 보안경을 착용하십시오", "회전부에 손을 넣지 마십시오", "고온 표면에 주의하십시오",
+           "작업 전 비상 정지 버튼 위치를 확인하십시오", "두 명 이상이 함께 작업하십시오"]
+_ERRORS = ["과열", "압력 저하", "통신 끊김", "모터 과전류", "센서 신호 없음", "유량 부족"]
+_QUERIES = ["냉각수 밸브 여는 방법", "E-203 오류 해결 방법", "필터 교체 순서", "안전 수칙은 무엇인가요",
+            "모터 과전류 조치", "벨트 장력 조정", "시운전 후 확인 사항", "압력 저하 원인"]
+
+
+# 한 페이지 분량의 합성 매뉴얼 문장
+def synthetic_page_text(rng, page_no, lines=30):
+    out = [f"제{page_no}장 설비 점검 및 유지보수"]
+    for _ in range(lines):
+        kind = rng.random()
+        if kind < 0.5:
+            out.append(f"{rng.randint(1, 9)}단계: {rng.choice(_PROCEDURES)}.")
+        elif kind < 0.8:
+            out.append(f"주의: {rng.choice(_SAFETY)}.")
+        else:
+            code = f"E-{rng.randint(100, 399)}"
+            out.append(f"오류 코드 {code}는 {rng.choice(_ERRORS)} 상태를 뜻하며 {rng.choice(_PROCEDURES)}.")
+    return out
+
+
+# 합성 매뉴얼 PDF 생성 (scanned_ratio 비율만큼 텍스트 레이어 없는 이미지 페이지)
+def make_manual(path, pages, scanned_ratio=0.0, seed=42):
+    from PIL import Image, ImageDraw
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+    from services.pdf_export import FONT_NAME, get_styles
+
+    get_styles()  # 한글 폰트 등록
+    rng = random.Random(seed)
+    c = canvas.Canvas(path)
+    for page_no in range(1, pages + 1):
+        lines = synthetic_page_text(rng, page_no)
+        if rng.random() < scanned_ratio:
+            # 스캔 페이지: 글자를 이미지로만 넣음 (OCR 대상)
+            image = Image.new("L", (1240, 1754), 255)
+            draw = ImageDraw.Draw(image)
+            for i in range(len(lines)):
+                draw.text((80, 80 + i * 50), f"STEP {i + 1}: CHECK VALVE E-{rng.randint(100, 399)}", fill=0)
+            c.drawImage(ImageReader(image), 0, 0, width=595, height=842)
+        else:
+            c.setFont(FONT_NAME, 10)
+            for i, line in enumerate(lines):
+                c.drawString(40, 800 - i * 24, line)
+        c.showPage()
+    c.save()
+
+
+# 디스크·메모리 캐시 초기화 (각 단계를 처음 실행하는 상태로 측정)
+def reset_caches():
+    from services import embeddings, index_cache
+
+    shutil.rmtree(index_cache.CACHE_DIR, ignore_errors=True)
+    with embeddings._stores_lock:
+        embeddings._stores.clear()
+    with index_cache._lock:
+        index_cache._memory_cache.clear()
+
+
+def _pid_rss(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _child_pids():
+    pids = []
+    for task in os.listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{task}/children") as f:
+                pids += [int(pid) for pid in f.read().split()]
+        except OSError:
+            continue
+    return pids
+
+
+# 현재 RSS(바이트): 이 프로세스 + 자식 프로세스(OCR 작업 프로세스 등)
+# faiss·pdfium 같은 C/C++ 할당까지 포함 (Linux /proc 기준)
+# /proc이 없으면 getrusage의 최대 RSS(지금까지의 최고치, 자식은 종료된 것만)로 대신함
+def current_rss():
+    if os.path.exists("/proc/self/statm"):
+        return _pid_rss("self") + sum(_pid_rss(pid) for pid in _child_pids())
+    import resource
+
+    scale = 1 if sys.platform == "darwin" else 1024  # macOS는 바이트, Linux는 KB
+    return scale * (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                    + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+# 실행하는 동안 RSS를 주기적으로 읽어 최댓값 기록 (백그라운드 스레드)
+class PeakRSS:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+# 함수 실행 시간(ms)과 최대 RSS(MB, 자식 프로세스 포함) 측정
+# 샘플링 스레드가 시간 측정에 섞이지 않도록 메모리는 memory=True인 회차(메모리 측정 회차)에서만 기록
+def measure(fn, *args, memory=False, **kwargs):
+    if not memory:
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, (time.perf_counter() - started) * 1000, None
+    with PeakRSS() as rss:
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return result, elapsed_ms, rss.peak / 1024 / 1024
+
+
+# tesseract와 OCR 언어 데이터(예: kor, kor+eng)가 모두 설치되어 있는지
+def tesseract_ready(lang):
+    if shutil.which("tesseract") is None:
+        return False
+    try:
+        listing = subprocess.run(["tesseract", "--list-langs"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    installed = set((listing.stdout + listing.stderr).split())
+    return all(part in installed for part in lang.split("+"))
+
+
+def summarize(name, pages, latencies, units, unit, peaks):
+    total_s = sum(latencies) / 1000
+    return {
+        "stage": name,
+        "pages": pages,
+        "runs": len(latencies),
+        "unit": unit,
+        "throughput": round(units / total_s, 2) if total_s else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "peak_rss_mb": round(max(peaks), 2),
+    }
+
+
+def run_size(path, pages, repeats, n_queries):
+    from services import rag
+
+    stats = {name: {"latencies": [], "peaks": [], "units": 0} for name in STAGES}
+
+    def record(name, elapsed_ms, rss_mb, units):
+        if rss_mb is not None:
+            stats[name]["peaks"].append(rss_mb)
+        else:
+            stats[name]["latencies"].append(elapsed_ms)
+            stats[name]["units"] += units
+
+    queries = [_QUERIES[i % len(_QUERIES)] for i in range(n_queries)]
+    # 시간 측정 회차(repeats번) + 마지막 메모리 측정 회차 1번
+    for run in range(repeats + 1):
+        memory = run == repeats
+        # 개별 단계 (캐시 없는 상태에서 순서대로)
+        reset_caches()
+        text, ms, mb = measure(rag.extract_text_with_ocr, path, memory=memory)
+        record("extract_text_with_ocr", ms, mb, pages)
+        chunks, ms, mb = measure(rag.chunk_text, text, memory=memory)
+        record("chunk_text", ms, mb, len(chunks))
+        _, ms, mb = measure(rag.get_openai_embeddings, chunks, memory=memory)
+        record("get_openai_embeddings", ms, mb, len(chunks))
+
+        # 전체 색인 생성 (추출 → 청크 → 임베딩 → FAISS)
+        reset_caches()
+        (index, doc_chunks), ms, mb = measure(rag.build_vectorstore, path, memory=memory)
+        record("build_vectorstore", ms, mb, len(doc_chunks))
+
+        # 질의별 지연 (질의 임베딩 + 벡터 검색)
+        for query in queries:
+            _, ms, mb = measure(rag.search_documents, index, doc_chunks, query, memory=memory)
+            record("search_documents", ms, mb, 1)
+
+        # 가짜 LLM까지 포함한 질의응답 (색인 캐시를 미리 채워 두고 질의 경로만 측정)
+        rag.load_vectorstore(path)
+        for query in queries[:max(1, n_queries // 4)]:
+            _, ms, mb = measure(rag.rag_chain, path, query, memory=memory)
+            record("rag_chain", ms, mb, 1)
+
+    units = {"extract_text_with_ocr": "pages/s", "search_documents": "queries/s", "rag_chain": "queries/s"}
+    return [summarize(name, pages, s["latencies"], s["units"], units.get(name, "chunks/s"), s["peaks"])
+            for name, s in stats.items()]
+
+
+def print_results(results, previous=None):
+    baseline = {(r["stage"], r["pages"]): r for r in previous or []}
+    header = f"{'stage':<24}{'pages':>7}{'throughput':>14}{'unit':>11}{'p50 ms':>11}{'p99 ms':>11}{'RSS MB':>10}"
+    if previous:
+        header += f"{'Δp50':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        line = (f"{r['stage']:<24}{r['pages']:>7}{r['throughput'] or 0:>14.2f}{r['unit']:>11}"
+                f"{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}{r['peak_rss_mb']:>10.2f}")
+        old = baseline.get((r["stage"], r["pages"]))
+        if old and old["p50_ms"]:
+            line += f"{(r['p50_ms'] / old['p50_ms'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 파이프라인 단계별 처리량/지연/메모리 벤치마크")
+    parser.add_argument("--pages", default="10,50,200", help="쉼표로 구분한 매뉴얼 페이지 수")
+    parser.add_argument("--scanned-ratio", type=float, default=0.1, help="스캔 이미지 페이지 비율 (tesseract 필요)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=20, help="반복마다 실행할 검색 질의 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    # 서비스 모듈을 불러오기 전에 임시 캐시·로컬 임베딩 설정 (실제 캐시와 API를 건드리지 않음)
+    workdir = tempfile.mkdtemp(prefix="manupilot-bench-")
+    os.environ["MANUPILOT_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["MANUPILOT_EMBEDDING_BACKEND"] = "local"
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+
+    import openai
+    from services.fake_openai import start_server
+    from services import rag
+    from services.extraction import OCR_LANG
+
+    server, openai.api_base = start_server()
+    scanned_ratio = args.scanned_ratio
+    if scanned_ratio and not tesseract_ready(OCR_LANG):
+        print(f"tesseract 또는 OCR 언어 데이터({OCR_LANG})가 없어 스캔 페이지 없이 측정합니다.", file=sys.stderr)
+        scanned_ratio = 0.0
+
+    results = []
+    try:
+        for pages in [int(p) for p in args.pages.split(",")]:
+            path = os.path.join(workdir, f"manual_{pages}.pdf")
+            make_manual(path, pages, scanned_ratio, seed=args.seed)
+            results += run_size(path, pages, args.repeats, args.queries)
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+    print_results(results, previous)
+
+    if args.json:
+        payload = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {"scanned_ratio": scanned_ratio, "repeats": args.repeats, "queries": args.queries,
+                         "seed": args.seed, "index_type": rag.ann.INDEX_TYPE,
+                         "embedding_model": rag.default_backend().model},
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,39 @@
-import pandas as pd
-import numpy as np
+# 설비 센서 로그 목업 데이터 생성 (벡터화·배치 단위 기록)
+# 실행 예: python dataset.py                      (기본: 10,000행 · 설비 5대 → mock_equipment_data.csv)
+#         python dataset.py --records 100000000 --equipment 300 --fault-rate 0.05 --drift 0.1 --out logs.parquet
+import argparse
+import os
+import time
 
-# 설정
-num_records = 10000
-num_equipment = 5
-equipment_ids = [f'EQP{i+1:03d}' for i in range(num_equipment)]
-start_time = pd.Timestamp('2024-11-01 00:00:00')
+from services.sensor_data import write_dataset
 
-# 데이터 생성
-np.random.seed(42)  # 재현 가능한 난수 생성
-data = []
 
-for i in range(num_records):
-    equipment_id = np.random.choice(equipment_ids)
-    timestamp = start_time + pd.Timedelta(seconds=i)
-    sensor_value1 = np.random.uniform(20, 100)  # 예: 온도 (20 ~ 100 사이)
-    sensor_value2 = np.random.uniform(0, 1)     # 예: 진동 (0 ~ 1 사이)
-    status_code = 'NORMAL' if sensor_value1 < 80 else 'ALERT'
-    is_anomaly = 1 if sensor_value1 >= 80 else 0  # 이상 여부를 0 또는 1로 표시
-    
-    data.append({
-        '설비ID': equipment_id,
-        '시간': timestamp,
-        '센서값1': sensor_value1,
-        '센서값2': sensor_value2,
-        '상태코드': status_code,
-        '이상 여부': is_anomaly,
-        '주기': 1,
-        '작업ID': f'JOB{i//2000 + 1:05d}',  # 2000개 단위로 작업ID 변경
-        '운영자': f'operator_{i % 3 + 1:02d}'  # 3명의 운영자 가정
-    })
+def main():
+    parser = argparse.ArgumentParser(description="설비 센서 로그 목업 데이터 생성")
+    parser.add_argument("--records", type=int, default=10000, help="생성할 행 수")
+    parser.add_argument("--equipment", type=int, default=5, help="설비 수")
+    parser.add_argument("--freq-seconds", type=int, default=1, help="행 사이 시간 간격(초)")
+    parser.add_argument("--start", default="2024-11-01 00:00:00")
+    parser.add_argument("--drift", type=float, default=0.0, help="전체 기간 동안 센서 기준값이 움직이는 비율")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="설비·시간당 고장 구간 수")
+    parser.add_argument("--fault-seconds", type=int, default=300, help="고장 구간 평균 길이(초)")
+    parser.add_argument("--schema", choices=["log", "pattern"], default="log",
+                        help="log: 센서값1/센서값2·작업ID·운영자, pattern: 온도·진동·압력·유량·전력")
+    parser.add_argument("--seed", type=int, default=42)  # 재현 가능한 난수 생성
+    parser.add_argument("--batch-size", type=int, default=1_048_576, help="한 번에 메모리에 올릴 행 수")
+    parser.add_argument("--out", default="mock_equipment_data.csv", help=".csv / .parquet / .arrow")
+    args = parser.parse_args()
 
-# 데이터프레임 생성
-df = pd.DataFrame(data)
+    fmt = {".csv": "csv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}.get(
+        os.path.splitext(args.out)[1].lower(), "parquet")
+    started = time.perf_counter()
+    rows = write_dataset(
+        args.out, fmt=fmt, n_records=args.records, n_equipment=args.equipment, start=args.start,
+        freq_seconds=args.freq_seconds, seed=args.seed, drift=args.drift, fault_rate=args.fault_rate,
+        fault_seconds=args.fault_seconds, schema=args.schema, batch_size=args.batch_size,
+    )
+    print(f"{args.out}: {rows:,}행 ({time.perf_counter() - started:.1f}초)")
 
-# CSV 파일로 저장 (파일 경로는 필요에 따라 조정)
-df.to_csv('mock_equipment_data.csv', index=False, encoding='utf-8-sig')
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import altair as alt
+from services.wiki_store import get_wiki_store
+from tabs.wiki import render_entry_html
 
 # 페이지 기본 설정
 st.set_page_config(page_title="Manupilot", layout="wide")
@@ -180,31 +182,20 @@ with tabs[2]:
     content = st.text_area("위키 내용", height=120)
     if st.button("저장"):
         if author and tags and content:
-            st.session_state.setdefault('wiki', []).append({'author': author, 'tags': tags, 'content': content})
+            get_wiki_store().add_entry(author, tags.split(","), content)
             st.success("위키 저장 완료")
         else:
             st.warning("작성자 이름, 태그, 내용을 모두 입력하세요.")
     
     # 위키 목록
     st.subheader("📂 위키 목록")
-    filter_tags = st.multiselect("필터 태그", options=[w['tags'] for w in st.session_state.get('wiki', [])])
-    wiki_data = st.session_state.get('wiki', [])
-    
-    if filter_tags:
-        wiki_data = [w for w in wiki_data if any(tag in w['tags'] for tag in filter_tags)]
+    store = get_wiki_store()
+    filter_tags = st.multiselect("필터 태그", options=sorted(store.tag_counts()))
+    wiki_data = store.search(tags=filter_tags)['entries']
     
     if wiki_data:
-        for entry in wiki_data:
-            st.markdown(
-                f'''
-                
-                    <strong>작성자</strong>: {entry['author']}<br />
-                    <strong>태그</strong>: {entry['tags']}<br />
-                    {entry['content']}
-                
-                ''',
-                unsafe_allow_html=True
-            )
+        # 저장된 글은 모든 사용자에게 보이므로 이스케이프한 카드 HTML로 표시 (협업 게시판 탭과 같은 캐시)
+        st.markdown("".join(render_entry_html(entry) for entry in wiki_data), unsafe_allow_html=True)
     else:
         st.info("등록된 위키 항목이 없습니다.")
 
@@ -0,0 +1,139 @@
+import math
+import os
+
+import faiss
+import numpy as np
+
+# 인덱스 종류 (flat_l2는 기존 방식과의 비교용)
+INDEX_TYPES = ("flat_l2", "flat_ip", "ivf_flat", "ivf_pq", "hnsw")
+INDEX_TYPE = os.getenv("MANUPILOT_INDEX_TYPE", "flat_ip")
+
+# 검색 파라미터 기본값 (정확도 ↔ 속도 조절)
+IVF_NPROBE = int(os.getenv("MANUPILOT_IVF_NPROBE", "16"))
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = int(os.getenv("MANUPILOT_HNSW_EF_SEARCH", "64"))
+
+# 학습에 필요한 최소 벡터 수 (FAISS 권장: 클러스터당 39개 이상)
+TRAIN_POINTS_PER_CENTROID = 39
+MAX_TRAIN_POINTS = 100_000
+PQ_NBITS = 8
+
+
+# 코사인 유사도용 L2 정규화 (원본은 그대로 두고 복사본 반환)
+def normalize(vectors):
+    vectors = np.array(vectors, dtype="float32", copy=True)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+# 벡터 수에 맞는 IVF 클러스터 개수 (약 4√n, 학습 데이터가 충분한 범위 안에서)
+def ivf_nlist(n_vectors):
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // TRAIN_POINTS_PER_CENTROID))
+
+
+# 차원을 나누어떨어지게 하는 PQ 서브벡터 개수 (바이트/벡터, 서브벡터당 8차원 이상)
+def pq_m(dimension, target=64):
+    for m in range(max(1, min(target, dimension // 8)), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+# 벡터 수가 부족해 학습할 수 없으면 flat_ip로 대체
+def resolve_type(kind, n_vectors):
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"unknown index type: {kind} (choose from {', '.join(INDEX_TYPES)})")
+    if kind == "ivf_flat" and ivf_nlist(n_vectors) < 2:
+        return "flat_ip"
+    if kind == "ivf_pq" and n_vectors < TRAIN_POINTS_PER_CENTROID * (1 << PQ_NBITS):
+        return "flat_ip"
+    return kind
+
+
+# 빈 인덱스 생성 (학습이 필요한 종류는 n_vectors로 크기 결정)
+def make_index(dimension, kind=INDEX_TYPE, n_vectors=0):
+    kind = resolve_type(kind, n_vectors)
+    if kind == "flat_l2":
+        return faiss.IndexFlatL2(dimension)
+    if kind == "flat_ip":
+        return faiss.IndexFlatIP(dimension)
+    if kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+    quantizer = faiss.IndexFlatIP(dimension)
+    nlist = ivf_nlist(n_vectors)
+    if kind == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m(dimension), PQ_NBITS,
+                                 faiss.METRIC_INNER_PRODUCT)
+    index.nprobe = min(IVF_NPROBE, nlist)
+    return index
+
+
+# 내적(코사인) 인덱스인지 여부 → 벡터 정규화, 점수가 클수록 유사
+def uses_inner_product(index):
+    return faiss.downcast_index(index).metric_type == faiss.METRIC_INNER_PRODUCT
+
+
+# 인덱스 생성 + 필요 시 학습 + 벡터 추가
+# ids를 주면 IndexIDMap2로 감싸 외부 ID로 추가 (코퍼스 샤드처럼 ID로 거르고 지우는 경우)
+def build_index(vectors, kind=INDEX_TYPE, ids=None):
+    vectors = np.asarray(vectors, dtype="float32")
+    index = make_index(vectors.shape[1], kind, len(vectors))
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+    if uses_inner_product(index):
+        vectors = normalize(vectors)
+    if not index.is_trained:
+        # 대용량에서는 일부 표본만으로 학습
+        sample = vectors
+        if len(vectors) > MAX_TRAIN_POINTS:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), MAX_TRAIN_POINTS, replace=False)]
+        index.train(sample)
+    if ids is not None:
+        index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+    else:
+        index.add(vectors)
+    return index
+
+
+# IDMap으로 감싼 경우 안쪽 실제 인덱스
+def base_index(index):
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+# 학습이 필요한 종류(IVF)나 HNSW가 아닌 단순 전수 탐색 인덱스인지
+def is_flat(index):
+    return isinstance(base_index(index), faiss.IndexFlat)
+
+
+# ID 선택기를 쓰는 검색 파라미터 (IVF는 전용 파라미터가 필요하고, nprobe·efSearch는 인덱스 값을 유지)
+def search_params(index, sel):
+    inner = base_index(index)
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=sel, nprobe=inner.nprobe)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=sel)
+
+
+# 질의 벡터를 인덱스 종류에 맞게 정규화한 뒤 검색
+def search(index, query_vectors, top_k, params=None):
+    query_vectors = np.asarray(query_vectors, dtype="float32")
+    if uses_inner_product(index):
+        query_vectors = normalize(query_vectors)
+    return index.search(query_vectors, top_k, params=params)
+
+
+# 인덱스 메모리 크기 (직렬화 바이트 수)
+def index_bytes(index):
+    return int(faiss.serialize_index(index).nbytes)
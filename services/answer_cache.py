@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# 답변 캐시 설정 (환경 변수로 조정 가능)
+ANSWER_CACHE_SIZE = int(os.getenv("MANUPILOT_ANSWER_CACHE_SIZE", "2000"))
+ANSWER_CACHE_TTL = float(os.getenv("MANUPILOT_ANSWER_CACHE_TTL", str(24 * 3600)))
+SIMILARITY_THRESHOLD = float(os.getenv("MANUPILOT_ANSWER_CACHE_SIMILARITY", "0.95"))
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+# 질문 정규화 (전각/반각 통일, 소문자, 문장부호·중복 공백 제거)
+def normalize_question(question):
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _PUNCT.sub(" ", text)
+    return " ".join(text.split())
+
+
+# (매뉴얼 해시, 정규화된 질문) → 답변 캐시
+# - 정확히 같은 질문은 딕셔너리 조회, 비슷한 질문은 같은 매뉴얼의 질문 임베딩과 코사인 유사도로 조회
+# - TTL이 지난 항목은 조회 시 제거, 최대 개수를 넘으면 가장 오래 쓰지 않은 항목부터 제거
+class AnswerCache:
+    def __init__(self, max_items=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL, threshold=SIMILARITY_THRESHOLD):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()  # (manual_key, 질문) → {"answer", "created", "embedding", ...}
+        self._by_manual = {}  # manual_key → 질문 집합
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry["created"] > self.ttl
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        questions = self._by_manual.get(key[0])
+        if questions is not None:
+            questions.discard(key[1])
+            if not questions:
+                del self._by_manual[key[0]]
+
+    # 캐시 조회 → 항목(dict) 또는 None. embedding을 주면 유사 질문도 찾음
+    # embedding은 함수여도 되며, 정확히 같은 질문이 없을 때만 호출 (적중 시 임베딩 비용 없음)
+    def get(self, manual_key, question, embedding=None):
+        now = time.time()
+        key = (manual_key, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                entry = None
+
+            similarity = 1.0
+            if entry is None and callable(embedding):
+                embedding = embedding()
+            if entry is None and embedding is not None:
+                key, similarity = self._nearest(manual_key, embedding, now)
+                entry = self._entries.get(key) if key else None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {**entry, "similarity": similarity, "matched_question": key[1]}
+
+    def _nearest(self, manual_key, embedding, now):
+        candidates = []
+        for question in list(self._by_manual.get(manual_key, ())):
+            key = (manual_key, question)
+            entry = self._entries[key]
+            if self._expired(entry, now):
+                self._drop(key)
+            elif entry["embedding"] is not None:
+                candidates.append((key, entry["embedding"]))
+        if not candidates:
+            return None, 0.0
+
+        query = np.asarray(embedding, dtype="float32").ravel()
+        matrix = np.stack([vec for _, vec in candidates])
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None, float(scores[best])
+        return candidates[best][0], float(scores[best])
+
+    def put(self, manual_key, question, answer, embedding=None, **extra):
+        key = (manual_key, normalize_question(question))
+        vec = None if embedding is None else np.asarray(embedding, dtype="float32").ravel()
+        with self._lock:
+            self._entries[key] = {"answer": answer, "created": time.time(), "embedding": vec, **extra}
+            self._entries.move_to_end(key)
+            self._by_manual.setdefault(manual_key, set()).add(key[1])
+            while len(self._entries) > self.max_items:
+                self._drop(next(iter(self._entries)))
+
+    # 매뉴얼이 바뀌었을 때 해당 매뉴얼의 답변을 모두 제거
+    def invalidate(self, manual_key):
+        with self._lock:
+            for question in list(self._by_manual.get(manual_key, ())):
+                self._drop((manual_key, question))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_manual.clear()
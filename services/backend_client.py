@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import urllib.error
+import urllib.request
+
+# 백엔드 주소 (설정되어 있으면 Streamlit 탭은 얇은 클라이언트로 동작)
+BACKEND_URL = os.getenv("MANUPILOT_BACKEND_URL")
+BACKEND_TIMEOUT = float(os.getenv("MANUPILOT_BACKEND_TIMEOUT", "600"))
+
+
+class BackendError(RuntimeError):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status  # HTTP 상태 코드 (연결 실패면 None)
+
+
+# 백엔드 질의 서비스용 HTTP 클라이언트 (표준 라이브러리만 사용)
+class BackendClient:
+    def __init__(self, base_url=BACKEND_URL, timeout=BACKEND_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None, content_type="application/json"):
+        request = urllib.request.Request(f"{self.base_url}{path}", data=body, method=method)
+        if body is not None:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            try:
+                detail = json.loads(detail).get("detail", detail)
+            except ValueError:
+                pass
+            raise BackendError(f"{e.code}: {detail}", status=e.code) from e
+        except urllib.error.URLError as e:
+            raise BackendError(f"백엔드에 연결할 수 없습니다: {e.reason}") from e
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    # PDF 바이트 등록 → {"pdf_hash", "chunks", "elapsed_ms"}
+    def add_manual(self, data):
+        return self._request("POST", "/manuals", body=data, content_type="application/pdf")
+
+    def _post_json(self, path, payload):
+        return self._request("POST", path, body=json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def has_manual(self, pdf_hash):
+        try:
+            self._request("GET", f"/manuals/{pdf_hash}")
+        except BackendError as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    # 해시를 먼저 확인하고 백엔드에 없을 때만 PDF 바이트 업로드 → pdf_hash
+    # known: 이미 업로드한 해시 집합 (세션에 보관하면 같은 매뉴얼은 확인 요청도 생략)
+    def ensure_manual(self, data, known=None):
+        pdf_hash = hashlib.sha256(data).hexdigest()
+        if known is not None and pdf_hash in known:
+            return pdf_hash
+        if not self.has_manual(pdf_hash):
+            pdf_hash = self.add_manual(data)["pdf_hash"]
+        if known is not None:
+            known.add(pdf_hash)
+        return pdf_hash
+
+    def summarize(self, pdf_hash):
+        return self._request("POST", f"/manuals/{pdf_hash}/summary")
+
+    def library(self):
+        return self._request("GET", "/library")
+
+    def add_to_library(self, pdf_hash, line, equipment_id=None, version=None, language="ko", title=None):
+        return self._post_json("/library", {"pdf_hash": pdf_hash, "line": line, "equipment_id": equipment_id,
+                                            "version": version, "language": language, "title": title})
+
+    def ask(self, question, pdf_hash=None, filters=None):
+        return self._post_json("/ask", {"question": question, "pdf_hash": pdf_hash, "filters": filters})
@@ -0,0 +1,215 @@
+# 여러 매뉴얼 × 표준 질문 오프라인 일괄 질의응답 (화면 없이 실행)
+# 실행 예: python -m services.batch --manifest manuals.txt --questions questions.txt --out results.jsonl
+#         python -m services.batch ... --pdf-dir answers/ --workers 8 --rate 5
+#         python -m services.batch ... --fake-llm   (로컬 가짜 LLM 서버로 실행)
+# manifest: 한 줄에 PDF 경로 하나 (.txt) 또는 [{"path", "name"}] (.json)
+# questions: 한 줄에 질문 하나 (.txt) 또는 {"id", "question"} 줄 (.jsonl)
+# 중단 후 같은 명령으로 다시 실행하면 결과 파일에 이미 성공한 (매뉴얼, 질문)은 건너뜀
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+
+from services import chat
+from services.context import assemble_context, CANDIDATE_K
+from services.embeddings import default_backend
+from services.index_cache import file_hash
+from services.pdf_export import render_answer_pdf
+from services.rag import load_vectorstore, load_lexical_index, search_documents
+
+MAX_RETRIES = 3
+
+
+def read_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            entries = json.load(f)
+        else:
+            entries = [{"path": line.strip()} for line in f if line.strip() and not line.startswith("#")]
+    return [{"path": e["path"], "name": e.get("name") or os.path.basename(e["path"])} for e in entries]
+
+
+def read_questions(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+            return [{"id": str(r.get("id", i + 1)), "question": r["question"]} for i, r in enumerate(rows)]
+        lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        return [{"id": str(i + 1), "question": q} for i, q in enumerate(lines)]
+
+
+# 초당 요청 수 제한 (여러 작업 스레드가 공유)
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# 임베딩 백엔드에도 같은 속도 제한 적용 (저장소에 없는 배치를 실제로 요청할 때만 기다림)
+class RateLimitedBackend:
+    def __init__(self, backend, limiter):
+        self.backend = backend
+        self.limiter = limiter
+        self.model = backend.model
+
+    def embed(self, texts):
+        self.limiter.wait()
+        return self.backend.embed(texts)
+
+
+# 이미 성공한 결과의 (pdf_hash, question_id) 집합 (이어서 실행할 때 건너뛰기용)
+def completed_keys(out_path):
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # 중단되면서 잘린 마지막 줄
+            if not row.get("error"):
+                done.add((row["pdf_hash"], row["question_id"]))
+    return done
+
+
+class BatchRunner:
+    def __init__(self, out_path, workers=4, rate=None, pdf_dir=None, top_k=CANDIDATE_K, backend=None):
+        self.out_path = out_path
+        self.workers = workers
+        self.limiter = RateLimiter(rate)
+        self.backend = RateLimitedBackend(backend or default_backend(), self.limiter)
+        self.pdf_dir = pdf_dir
+        self.top_k = top_k
+        self._write_lock = threading.Lock()
+        self.stats = {"answered": 0, "skipped": 0, "failed": 0}
+
+    def _write(self, out, row):
+        with self._write_lock:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            self.stats["failed" if row.get("error") else "answered"] += 1
+
+    def _complete(self, messages):
+        for attempt in range(MAX_RETRIES):
+            self.limiter.wait()
+            try:
+                return chat.complete(messages)
+            except openai.error.OpenAIError:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
+    # 질문 하나: 검색 → 문맥 구성 → LLM 답변 (단계별 시간 기록)
+    def _answer(self, manual, index, chunks, lexical, item):
+        row = {"manual": manual["name"], "path": manual["path"], "pdf_hash": manual["hash"],
+               "question_id": item["id"], "question": item["question"]}
+        try:
+            started = time.perf_counter()
+            candidates = search_documents(index, chunks, item["question"], top_k=self.top_k, lexical=lexical,
+                                          backend=self.backend)
+            context = assemble_context(item["question"], candidates, backend=self.backend)
+            retrieved = time.perf_counter()
+            answer = self._complete(chat.build_messages(item["question"], context["context"]))
+            finished = time.perf_counter()
+            row.update({
+                "answer": answer,
+                "pages": [doc["page"] for doc in context["docs"]],
+                "context_tokens": context["tokens"],
+                "retrieval_ms": round((retrieved - started) * 1000, 1),
+                "llm_ms": round((finished - retrieved) * 1000, 1),
+                "total_ms": round((finished - started) * 1000, 1),
+            })
+            if self.pdf_dir:
+                path = os.path.join(self.pdf_dir, f"{manual['hash'][:12]}_{item['id']}.pdf")
+                with open(path, "wb") as f:
+                    f.write(render_answer_pdf(item["question"], answer, context["docs"]))
+                row["pdf"] = path
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    # 매뉴얼 하나 준비 (해시 → 남은 질문 → 색인), 실패하면 남은 질문마다 오류 행을 남기고 다음 매뉴얼로
+    def _prepare(self, out, manual, questions, done):
+        manual = {**manual, "hash": None}
+        todo = questions
+        try:
+            manual["hash"] = file_hash(manual["path"])
+            todo = [q for q in questions if (manual["hash"], q["id"]) not in done]
+            self.stats["skipped"] += len(questions) - len(todo)
+            if not todo:
+                return None
+
+            # 매뉴얼마다 색인은 한 번만 (디스크 캐시가 있으면 그대로 사용)
+            started = time.perf_counter()
+            index, chunks = load_vectorstore(manual["path"], backend=self.backend)
+            lexical = load_lexical_index(manual["path"], chunks)
+            index_ms = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[{manual['name']}] 건너뜀 · {error}")
+            for item in todo:
+                self._write(out, {"manual": manual["name"], "path": manual["path"], "pdf_hash": manual["hash"],
+                                  "question_id": item["id"], "question": item["question"], "error": error})
+            return None
+        print(f"[{manual['name']}] 청크 {len(chunks)}개 · 색인 {index_ms} ms · 질문 {len(todo)}개")
+        return manual, todo, (index, chunks, lexical), index_ms
+
+    def run(self, manuals, questions):
+        if self.pdf_dir:
+            os.makedirs(self.pdf_dir, exist_ok=True)
+        done = completed_keys(self.out_path)
+        with open(self.out_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for manual in manuals:
+                prepared = self._prepare(out, manual, questions, done)
+                if prepared is None:
+                    continue
+                manual, todo, (index, chunks, lexical), index_ms = prepared
+
+                # 완료되는 순서대로 바로 기록 (중단돼도 그때까지의 결과는 남음)
+                futures = [pool.submit(self._answer, manual, index, chunks, lexical, item) for item in todo]
+                for future in as_completed(futures):
+                    row = future.result()
+                    row["index_ms"] = index_ms
+                    self._write(out, row)
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="매뉴얼 여러 개에 표준 질문 일괄 실행 (JSONL 결과)")
+    parser.add_argument("--manifest", required=True, help="PDF 목록 (.txt 또는 .json)")
+    parser.add_argument("--questions", required=True, help="질문 목록 (.txt 또는 .jsonl)")
+    parser.add_argument("--out", default="batch_results.jsonl", help="결과 JSONL 경로 (이어쓰기)")
+    parser.add_argument("--pdf-dir", help="질문별 답변 PDF를 저장할 폴더")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="초당 LLM·임베딩 요청 수 제한")
+    parser.add_argument("--fake-llm", action="store_true", help="로컬 가짜 OpenAI 서버 사용")
+    args = parser.parse_args()
+
+    if args.fake_llm:
+        from services.fake_openai import start_server
+        _, openai.api_base = start_server()
+        openai.api_key = openai.api_key or "test"
+
+    runner = BatchRunner(args.out, workers=args.workers, rate=args.rate, pdf_dir=args.pdf_dir)
+    stats = runner.run(read_manifest(args.manifest), read_questions(args.questions))
+    print(f"완료: 답변 {stats['answered']}건 · 건너뜀 {stats['skipped']}건 · 실패 {stats['failed']}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from services.index_cache import CACHE_DIR, try_file_lock
+from services.lexical import tokenize
+
+# 게시글 자동 분류 설정 (환경 변수로 조정 가능)
+CATEGORY_MODEL_PATH = os.getenv("MANUPILOT_CATEGORY_MODEL", os.path.join(CACHE_DIR, "wiki_categories.npz"))
+FEATURE_DIM = 4096  # 토큰 해시 공간 크기
+MAX_CATEGORIES = 50
+NEW_CATEGORY_SIMILARITY = 0.15  # 가장 가까운 중심과의 코사인 유사도가 이보다 낮으면 새 카테고리
+TAG_WEIGHT = 2  # 태그는 본문 토큰보다 가중치를 더 줌
+LABEL_TAGS = 3  # 카테고리 이름에 쓸 대표 태그 수
+SAVE_SECONDS = float(os.getenv("MANUPILOT_CATEGORY_SAVE_SECONDS", "10"))  # 대기열이 계속 차 있어도 이 간격으로 저장
+POLL_SECONDS = float(os.getenv("MANUPILOT_CATEGORY_POLL_SECONDS", "5"))  # 다른 프로세스가 저장·삭제한 글 확인 간격
+
+logger = logging.getLogger(__name__)
+
+
+# 온라인 카테고리 모델 (해시 TF-IDF 벡터 + 카테고리 중심)
+# - 새 글은 가장 가까운 중심에 배정(O(k)), 너무 멀면 새 카테고리를 만듦
+# - 중심은 배정된 글 벡터의 누적 평균으로 갱신, 문서 빈도(IDF)도 글마다 누적
+# - 모델 전체를 npz 파일 하나로 디스크에 저장 (배정할 때마다가 아니라 flush()에서 변경이 있을 때만)
+class CategoryModel:
+    def __init__(self, path=CATEGORY_MODEL_PATH, dim=FEATURE_DIM, max_categories=MAX_CATEGORIES,
+                 threshold=NEW_CATEGORY_SIMILARITY):
+        self.path = path
+        self.dim = dim
+        self.max_categories = max_categories
+        self.threshold = threshold
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.doc_freq = np.zeros(dim, dtype=np.int64)
+        self.n_docs = 0
+        self.tag_counts = []  # 카테고리별 Counter (이름 붙이기용)
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.centroids = data["centroids"].astype(np.float32)
+                self.counts = data["counts"].astype(np.int64)
+                self.doc_freq = data["doc_freq"].astype(np.int64)
+                self.n_docs = int(data["n_docs"])
+                self.tag_counts = [Counter(c) for c in json.loads(str(data["tag_counts"]))]
+        except (OSError, KeyError, ValueError):
+            logger.warning("카테고리 모델을 읽지 못해 새로 시작합니다: %s", self.path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}.npz"
+        np.savez(tmp_path, centroids=self.centroids, counts=self.counts, doc_freq=self.doc_freq,
+                 n_docs=self.n_docs, tag_counts=json.dumps([dict(c) for c in self.tag_counts], ensure_ascii=False))
+        os.replace(tmp_path, self.path)
+
+    def _features(self, text, tags):
+        tokens = tokenize(text) + [t for tag in tags for t in tokenize(tag)] * TAG_WEIGHT
+        buckets = np.array([zlib.crc32(t.encode("utf-8")) % self.dim for t in tokens], dtype=np.int64)
+        return np.bincount(buckets, minlength=self.dim).astype(np.float32)
+
+    def _vector(self, counts):
+        idf = np.log((self.n_docs + 1) / (self.doc_freq + 1)) + 1
+        vector = np.sqrt(counts) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # 글 하나를 카테고리에 배정하고 모델 갱신 → 카테고리 번호
+    def assign(self, text, tags=()):
+        counts = self._features(text, tags)
+        with self._lock:
+            self.doc_freq += counts > 0
+            self.n_docs += 1
+            vector = self._vector(counts)
+            category, similarity = None, -1.0
+            if len(self.centroids):
+                norms = np.linalg.norm(self.centroids, axis=1) + 1e-12
+                similarities = self.centroids @ vector / norms
+                category = int(np.argmax(similarities))
+                similarity = float(similarities[category])
+            if category is None or (similarity < self.threshold and len(self.centroids) < self.max_categories):
+                self.centroids = np.vstack([self.centroids, vector[None, :]])
+                self.counts = np.append(self.counts, 1)
+                self.tag_counts.append(Counter(tags))
+                category = len(self.centroids) - 1
+            else:
+                self.counts[category] += 1
+                self.centroids[category] += (vector - self.centroids[category]) / self.counts[category]
+                self.tag_counts[category].update(tags)
+            self.dirty = True
+            return category
+
+    # 삭제된 글을 모델에서 빼기 (배정 수·태그 집계·문서 빈도, 중심은 누적 평균을 한 단계 되돌림)
+    def remove(self, text, tags, category):
+        counts = self._features(text, tags)
+        with self._lock:
+            if not 0 <= category < len(self.counts) or self.counts[category] <= 0:
+                return
+            vector = self._vector(counts)
+            remaining = self.counts[category] - 1
+            if remaining:
+                self.centroids[category] += (self.centroids[category] - vector) / remaining
+            self.counts[category] = remaining
+            self.tag_counts[category].subtract(tags)
+            self.tag_counts[category] = +self.tag_counts[category]  # 0 이하 항목 제거
+            self.doc_freq = np.maximum(self.doc_freq - (counts > 0), 0)
+            self.n_docs = max(self.n_docs - 1, 0)
+            self.dirty = True
+
+    # 바뀐 내용이 있을 때만 저장
+    def flush(self):
+        with self._lock:
+            if not self.dirty:
+                return False
+            self.save()
+            self.dirty = False
+            return True
+
+    def label(self, category):
+        tags = [tag for tag, _ in self.tag_counts[category].most_common(LABEL_TAGS)]
+        return "·".join(tags) if tags else f"카테고리 {category + 1}"
+
+
+# 저장된 글을 UI 스레드 밖에서 분류하는 백그라운드 작업자
+# store: WikiStore (get, set_category, uncategorized, take_category_removals 사용)
+# - 모델 파일은 소유 잠금(모델 경로 + ".owner")을 잡은 프로세스 하나만 고침
+#   (Streamlit·백엔드 등 여러 프로세스가 떠 있어도 마지막 저장이 앞선 저장을 덮어쓰지 않음)
+# - 소유 프로세스는 POLL_SECONDS마다 다른 프로세스가 저장한 미분류 글과 삭제된 글을 DB에서 가져와 반영
+# - 소유하지 못한 프로세스는 제출된 글을 버리고(DB에 미분류로 남음) 소유 잠금을 다시 시도
+# - 모델 저장은 대기열을 다 비웠을 때 또는 SAVE_SECONDS마다 한 번
+class CategoryWorker:
+    def __init__(self, store, model=None, poll_seconds=POLL_SECONDS, save_seconds=SAVE_SECONDS):
+        self.store = store
+        self.model = model or CategoryModel()
+        self.poll_seconds = poll_seconds
+        self.save_seconds = save_seconds
+        self.owner = False
+        self._owner_file = None
+        self._saved_at = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="wiki-categories", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry):
+        self._queue.put(entry)
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def _assign(self, entry):
+        category = self.model.assign(entry["content"], entry["tags"])
+        self.store.set_category(entry["id"], category, self.model.label(category))
+
+    def _acquire(self):
+        self._owner_file = try_file_lock(f"{self.model.path}.owner")
+        self.owner = self._owner_file is not None
+        if self.owner:
+            self.model.load()  # 이전 소유 프로세스가 마지막으로 저장한 모델부터 이어서
+        return self.owner
+
+    def _flush(self, force=False):
+        if force or time.monotonic() - self._saved_at >= self.save_seconds:
+            self.model.flush()
+            self._saved_at = time.monotonic()
+
+    # 삭제된 글을 모델에서 빼고, 아직 분류되지 않은 글(다른 프로세스에서 저장한 글 포함)을 분류
+    def _catch_up(self):
+        try:
+            for removal in self.store.take_category_removals():
+                self.model.remove(removal["content"], removal["tags"], removal["category"])
+            for entry in self.store.uncategorized():
+                self._assign(entry)
+        except Exception:
+            logger.exception("게시글 분류 동기화 실패")
+        self._flush(force=True)
+
+    def _run(self):
+        while not self._acquire():
+            try:
+                self._queue.get(timeout=self.poll_seconds)
+                self._queue.task_done()
+            except queue.Empty:
+                pass
+        self._catch_up()
+        while True:
+            try:
+                entry = self._queue.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                self._catch_up()
+                continue
+            try:
+                # 시작 시 처리한 글이 대기열에도 들어왔을 수 있으므로 한 번 더 확인
+                current = self.store.get(entry["id"])
+                if current is not None and current["category"] is None:
+                    self._assign(current)
+                self._flush(force=self._queue.empty())
+            except Exception:
+                logger.exception("게시글 분류 실패: %s", entry.get("id"))
+            finally:
+                self._queue.task_done()
+
+    # 테스트·일괄 작업용: 대기 중인 분류가 끝날 때까지 기다림
+    def join(self):
+        self._queue.join()
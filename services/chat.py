@@ -0,0 +1,60 @@
+import os
+import time
+
+import openai
+
+# LLM 설정 (OPENAI_API_BASE로 로컬 가짜 서버 등 다른 엔드포인트 지정 가능)
+CHAT_MODEL = os.getenv("MANUPILOT_CHAT_MODEL", "gpt-4o")
+MAX_TOKENS = 150
+SYSTEM_PROMPT = (
+    "You are a helpful assistant. Check the pdf content and answer the question. "
+    "Cite the page numbers you used, e.g. (p.3)."
+)
+
+
+# 질문과 문맥으로 채팅 메시지 구성
+def build_messages(question, context):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Question: {question}\n\nContext: {context}\n\nAnswer:"},
+    ]
+
+
+# 전체 응답을 한 번에 받기
+def complete(messages, max_tokens=MAX_TOKENS, model=CHAT_MODEL):
+    response = openai.ChatCompletion.create(model=model, messages=messages, max_tokens=max_tokens)
+    return response["choices"][0]["message"]["content"].strip()
+
+
+# 응답 토큰을 도착하는 대로 반환
+def stream(messages, max_tokens=MAX_TOKENS, model=CHAT_MODEL):
+    response = openai.ChatCompletion.create(model=model, messages=messages, max_tokens=max_tokens, stream=True)
+    for chunk in response:
+        choices = chunk.get("choices") or []
+        if not choices:
+            continue
+        content = choices[0].get("delta", {}).get("content")
+        if content:
+            yield content
+
+
+# 스트림을 감싸 첫 토큰까지 시간(TTFT)·전체 시간·전체 텍스트를 기록
+class TimedStream:
+    def __init__(self, tokens, started=None):
+        self._tokens = tokens
+        self.started = started if started is not None else time.perf_counter()
+        self.ttft_ms = None
+        self.total_ms = None
+        self.parts = []
+
+    def __iter__(self):
+        for token in self._tokens:
+            if self.ttft_ms is None:
+                self.ttft_ms = (time.perf_counter() - self.started) * 1000
+            self.parts.append(token)
+            yield token
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    @property
+    def text(self):
+        return "".join(self.parts).strip()
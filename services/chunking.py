@@ -0,0 +1,110 @@
+import bisect
+import re
+
+# 청크 설정 (한글 매뉴얼 기준 글자 수 예산, 겹침은 예산의 15%)
+CHUNK_CHARS = 1000
+CHUNK_OVERLAP_RATIO = 0.15
+
+# 자르기 좋은 위치 (문단 > 문장 끝 > 공백 순으로 선호)
+_BREAKS = [
+    re.compile(r"\n\s*\n"),
+    re.compile(r"(?<=[.!?。])\s|(?<=다\.)\s|\n"),
+    re.compile(r"\s"),
+]
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+
+# 대략적인 토큰 수 (한글은 글자당 약 1토큰, 그 외는 4글자당 약 1토큰)
+def estimate_tokens(text):
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+# 예산(length_fn 기준)에 들어가는 가장 긴 접두사 길이
+def _fit(buffer, budget, length_fn):
+    if length_fn(buffer) <= budget:
+        return len(buffer)
+    lo, hi = 1, len(buffer)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if length_fn(buffer[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+# 예산 범위 뒤쪽 30% 안에서 자연스러운 경계 찾기
+def _cut_point(buffer, limit):
+    floor = int(limit * 0.7)
+    for pattern in _BREAKS:
+        best = None
+        for match in pattern.finditer(buffer, floor, limit):
+            best = match.end()
+        if best:
+            return best
+    return limit
+
+
+# 페이지 스트림 [(페이지 번호, 텍스트), ...]을 받아 청크를 순서대로 생성
+# 각 청크: {"text", "page", "end_page", "offset"} (offset = 시작 페이지 내 글자 위치)
+# max_tokens를 주면 토큰 예산으로 자르며, overlap은 예산과 같은 단위(글자 또는 토큰)
+# 버퍼에는 현재 청크와 한 페이지 분량만 유지하므로 매뉴얼 크기와 무관하게 메모리가 일정
+def iter_chunks(pages, max_chars=CHUNK_CHARS, overlap=None, max_tokens=None):
+    if max_tokens is not None:
+        budget, length_fn = max_tokens, estimate_tokens
+    else:
+        budget, length_fn = max_chars, len
+    overlap_budget = int(budget * CHUNK_OVERLAP_RATIO) if overlap is None else overlap
+    if overlap_budget * 2 > budget:
+        raise ValueError("overlap must be at most half of the chunk budget")
+
+    buffer = ""
+    marks = []  # (버퍼 내 위치, 페이지 번호, 페이지 내 위치)
+    pending = 0  # 버퍼에서 아직 청크로 내보내지 않은 구간의 시작 위치
+
+    def locate(pos):
+        i = bisect.bisect_right([m[0] for m in marks], pos) - 1
+        start, page_no, page_offset = marks[i]
+        return page_no, page_offset + pos - start
+
+    def emit(end):
+        nonlocal buffer, marks, pending
+        piece = buffer[:end]
+        lead = len(piece) - len(piece.lstrip())
+        page_no, offset = locate(lead)
+        end_page, _ = locate(max(end - 1, 0))
+        chunk = {"text": piece.strip(), "page": page_no, "end_page": end_page, "offset": offset}
+
+        # 다음 청크는 겹침(overlap) 구간부터 시작 (단어 중간에서 시작하지 않도록 공백 뒤로 이동)
+        keep = end - _fit(piece[::-1], overlap_budget, length_fn) if overlap_budget else end
+        space = piece.find(" ", keep, end)
+        if keep > 0 and space != -1 and not piece[keep - 1].isspace():
+            keep = space + 1
+        keep = max(keep, 1)
+
+        i = bisect.bisect_right([m[0] for m in marks], keep) - 1
+        pos, p, po = marks[i]
+        marks = [(0, p, po + keep - pos)] + [(q - keep, pp, ppo) for q, pp, ppo in marks[i + 1:]]
+        buffer = buffer[keep:]
+        pending = end - keep
+        return chunk
+
+    for page_no, page_text in pages:
+        if not page_text:
+            continue
+        if buffer and not buffer.endswith(("\n", " ")):
+            buffer += "\n"
+        marks.append((len(buffer), page_no, 0))
+        buffer += page_text
+
+        while length_fn(buffer) > budget:
+            limit = _fit(buffer, budget, length_fn)
+            chunk = emit(_cut_point(buffer, limit))
+            if chunk["text"]:
+                yield chunk
+
+    if buffer[pending:].strip():
+        chunk = emit(len(buffer))
+        if chunk["text"]:
+            yield chunk
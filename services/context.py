@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+
+from services.chunking import CHUNK_CHARS, estimate_tokens
+from services.embeddings import embed_texts
+from services.lexical import tokenize
+
+# 문맥 구성 설정 (환경 변수로 조정 가능)
+# 예산은 상위 CONTEXT_TOP_K개 청크가 잘리지 않고 모두 들어가도록 청크 크기에서 계산
+# (한글 청크는 글자당 약 1토큰이므로 CHUNK_CHARS가 청크 하나의 최대 토큰 수, 페이지 표시 몫을 더함)
+CONTEXT_TOP_K = 3
+LABEL_TOKENS = 8  # "[p.12-13] " + 구분 줄바꿈
+CONTEXT_TOKEN_BUDGET = int(os.getenv("MANUPILOT_CONTEXT_TOKENS", str(CONTEXT_TOP_K * (CHUNK_CHARS + LABEL_TOKENS))))
+CANDIDATE_K = 12  # 재정렬 전에 넉넉히 가져올 후보 수
+MAX_CONTEXT_CHUNKS = 5
+MIN_PIECE_TOKENS = 60  # 남은 예산이 이보다 작으면 잘라 넣지 않음
+DUPLICATE_SIMILARITY = 0.92  # 이미 고른 청크와 이 이상 비슷하면 중복으로 제외
+MMR_LAMBDA = 0.7  # 관련도 ↔ 다양성 가중치
+LEXICAL_WEIGHT = 0.3  # 재정렬 점수에서 질의 토큰 포함 비율의 가중치
+
+
+def page_label(doc):
+    if doc["page"] == doc["end_page"]:
+        return f"p.{doc['page']}"
+    return f"p.{doc['page']}-{doc['end_page']}"
+
+
+# 검색된 청크를 페이지 표시와 함께 프롬프트 문맥으로 합치기
+def format_context(docs):
+    return "\n\n".join(f"[{page_label(doc)}] {doc['text']}" for doc in docs)
+
+
+# 질의 토큰 중 청크에 들어 있는 비율 (오류 코드·부품 번호가 정확히 들어 있는 청크 우대)
+def lexical_coverage(query_tokens, text):
+    if not query_tokens:
+        return 0.0
+    doc_tokens = set(tokenize(text))
+    return len(query_tokens & doc_tokens) / len(query_tokens)
+
+
+ELLIPSIS = " …"
+
+
+# 예산에 맞게 문장 경계에서 자르기 (덧붙이는 말줄임표까지 예산 안에 들어감)
+def trim_to_tokens(text, budget):
+    if estimate_tokens(text) <= budget:
+        return text
+    budget -= estimate_tokens(ELLIPSIS)
+    if budget <= 0:
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    boundary = max(cut.rfind(". "), cut.rfind("다. "), cut.rfind("\n"))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + ELLIPSIS
+
+
+# 후보 청크 재정렬 → 중복 제거 → 토큰 예산에 맞춰 문맥 구성
+# 반환: {"docs": 사용한 청크, "context": 프롬프트 문맥, "tokens": 문맥 토큰 수, "candidates": 후보 수}
+def assemble_context(question, candidates, token_budget=CONTEXT_TOKEN_BUDGET, max_chunks=MAX_CONTEXT_CHUNKS,
+                     backend=None):
+    if not candidates:
+        return {"docs": [], "context": "", "tokens": 0, "candidates": 0}
+
+    # 임베딩은 색인할 때 저장소에 들어가 있으므로 네트워크 호출 없이 조회됨
+    vectors = embed_texts([question] + [doc["text"] for doc in candidates], backend=backend)
+    vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+    query_vec, doc_vecs = vectors[0], vectors[1:]
+
+    query_tokens = set(tokenize(question))
+    relevance = doc_vecs @ query_vec
+    relevance = relevance + LEXICAL_WEIGHT * np.array(
+        [lexical_coverage(query_tokens, doc["text"]) for doc in candidates], dtype="float32"
+    )
+
+    # MMR: 관련도는 높고 이미 고른 청크와는 덜 겹치는 순서로 선택
+    selected, remaining = [], list(range(len(candidates)))
+    docs, used = [], 0
+    while remaining and len(docs) < max_chunks and used < token_budget:
+        if selected:
+            redundancy = (doc_vecs[remaining] @ doc_vecs[selected].T).max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining), dtype="float32")
+        scores = MMR_LAMBDA * relevance[remaining] - (1 - MMR_LAMBDA) * redundancy
+        pick = int(np.argmax(scores))
+        i = remaining.pop(pick)
+        if redundancy[pick] >= DUPLICATE_SIMILARITY:
+            continue
+
+        doc = candidates[i]
+        cost = estimate_tokens(f"[{page_label(doc)}] {doc['text']}") + 1
+        if used + cost > token_budget:
+            room = token_budget - used - estimate_tokens(f"[{page_label(doc)}] ") - 1
+            if room < MIN_PIECE_TOKENS:
+                continue
+            doc = {**doc, "text": trim_to_tokens(doc["text"], room), "trimmed": True}
+            cost = estimate_tokens(f"[{page_label(doc)}] {doc['text']}") + 1
+        selected.append(i)
+        docs.append(doc)
+        used += cost
+
+    context = format_context(docs)
+    return {"docs": docs, "context": context, "tokens": estimate_tokens(context), "candidates": len(candidates)}
@@ -0,0 +1,432 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+import faiss
+import numpy as np
+
+from services import ann
+from services.chunking import iter_chunks
+from services.embeddings import embed_texts, default_backend
+from services.extraction import iter_pages_in_order
+from services.index_cache import CACHE_DIR, file_lock, read_pdf_bytes
+from services.lexical import tokenize, fts_query, reciprocal_rank_fusion, CANDIDATES
+
+# 코퍼스 설정 (환경 변수로 조정 가능)
+CORPUS_DIR = os.getenv("MANUPILOT_CORPUS_DIR", os.path.join(CACHE_DIR, "corpus"))
+MAX_LOADED_SHARDS = int(os.getenv("MANUPILOT_MAX_LOADED_SHARDS", "4"))
+SELECTOR_CACHE_SIZE = 64  # 필터별 FAISS ID 선택기 캐시 크기
+
+# 검색 필터로 쓸 수 있는 매뉴얼 메타데이터
+FILTER_FIELDS = ("line", "equipment_id", "version", "language", "manual_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manuals (
+    manual_id TEXT PRIMARY KEY,
+    line TEXT NOT NULL,
+    equipment_id TEXT,
+    version TEXT,
+    language TEXT,
+    title TEXT,
+    pdf_hash TEXT,
+    model TEXT
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    manual_id TEXT NOT NULL REFERENCES manuals(manual_id) ON DELETE CASCADE,
+    page INTEGER,
+    end_page INTEGER,
+    "offset" INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_manual ON chunks(manual_id);
+CREATE INDEX IF NOT EXISTS idx_manuals_line ON manuals(line);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(tokens);
+"""
+
+
+# 샤드 읽기/쓰기 잠금 (검색끼리는 동시에, 추가·삭제는 혼자)
+class _ReadWriteLock:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _shard_name(line):
+    return re.sub(r"[^0-9A-Za-z가-힣_-]", "_", line) or "default"
+
+
+# 여러 매뉴얼을 설비 라인별 샤드로 나눠 관리하는 코퍼스 인덱스
+# - 청크 본문과 메타데이터는 SQLite에, 벡터는 샤드별 FAISS 파일에 저장
+# - 메모리에는 최근 사용한 샤드 MAX_LOADED_SHARDS개만 올려 둠
+# - 샤드 파일이 다른 프로세스(Streamlit ↔ 백엔드)에서 바뀌면 다시 읽고, 쓰기는 파일 잠금으로 한 프로세스씩
+class CorpusIndex:
+    def __init__(self, root=CORPUS_DIR, backend=None, max_loaded_shards=MAX_LOADED_SHARDS, index_type=None):
+        self.root = root
+        self.backend = backend or default_backend()
+        self.index_type = index_type or ann.INDEX_TYPE
+        self.max_loaded_shards = max_loaded_shards
+        os.makedirs(os.path.join(root, "shards"), exist_ok=True)
+        self._db_path = os.path.join(root, "corpus.sqlite3")
+        self._local = threading.local()
+        self._shards = OrderedDict()  # line → (인덱스, 파일 수정 시각·크기)
+        self._shard_locks = {}
+        self._selectors = OrderedDict()  # (샤드, 샤드 파일 상태, 매뉴얼 ID들) → IDSelectorBatch
+        self._lock = threading.RLock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _shard_path(self, line):
+        return os.path.join(self.root, "shards", f"{_shard_name(line)}.faiss")
+
+    # 새 샤드용 인덱스 (외부 ID로 추가·삭제할 수 있도록 IDMap으로 감쌈)
+    # MANUPILOT_INDEX_TYPE이 IVF 계열이면 학습할 만큼 벡터가 쌓일 때까지는 flat_ip로 시작
+    def _new_index(self, dimension):
+        return faiss.IndexIDMap2(ann.make_index(dimension, self.index_type, 0))
+
+    # 샤드의 (외부 ID, 벡터) 전체 (flat·HNSW처럼 원본 벡터를 그대로 가진 인덱스만)
+    def _contents(self, index):
+        ids = faiss.vector_to_array(index.id_map).astype("int64")
+        inner = ann.base_index(index)
+        return ids, inner.reconstruct_n(0, inner.ntotal)
+
+    # flat으로 시작한 샤드가 학습 기준을 넘으면 설정된 종류(IVF 등)로 한 번 다시 만듦
+    def _maybe_upgrade(self, index):
+        if not ann.is_flat(index) or ann.resolve_type(self.index_type, index.ntotal) in ("flat_ip", "flat_l2"):
+            return index
+        ids, vectors = self._contents(index)
+        return ann.build_index(vectors, self.index_type, ids=ids)
+
+    def _shard_lock(self, line):
+        with self._lock:
+            lock = self._shard_locks.get(line)
+            if lock is None:
+                lock = self._shard_locks[line] = _ReadWriteLock()
+            return lock
+
+    # 샤드 쓰기 구간: 프로세스 안에서는 쓰기 잠금, 프로세스 사이에는 파일 잠금
+    @contextmanager
+    def _writing(self, line):
+        with self._shard_lock(line).write(), file_lock(self._shard_path(line) + ".lock"):
+            yield
+
+    # 샤드를 불러오고 LRU 한도를 넘으면 오래된 샤드를 메모리에서 내림
+    # 메모리에 있어도 파일이 그 뒤에 바뀌었으면 다시 읽음
+    def _load_shard(self, line, dimension=None):
+        path = self._shard_path(line)
+        stamp = _file_stamp(path)
+        with self._lock:
+            cached = self._shards.get(line)
+            if cached is not None and cached[1] == stamp:
+                self._shards.move_to_end(line)
+                return cached[0]
+        if stamp is not None:
+            index = faiss.read_index(path)
+        elif dimension is not None:
+            index = self._new_index(dimension)
+        else:
+            with self._lock:
+                self._shards.pop(line, None)
+            return None
+        self._remember_shard(line, index, stamp)
+        return index
+
+    def _remember_shard(self, line, index, stamp):
+        with self._lock:
+            self._shards[line] = (index, stamp)
+            self._shards.move_to_end(line)
+            while len(self._shards) > self.max_loaded_shards:
+                self._shards.popitem(last=False)
+
+    def _save_shard(self, line, index):
+        path = self._shard_path(line)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+        self._remember_shard(line, index, _file_stamp(path))
+
+    def lines(self):
+        rows = self._connect().execute("SELECT DISTINCT line FROM manuals ORDER BY line").fetchall()
+        return [row["line"] for row in rows]
+
+    def manuals(self, **filters):
+        where, params = self._where(filters)
+        sql = f"SELECT * FROM manuals m {where} ORDER BY line, manual_id"
+        return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    # 필터에 해당하는 매뉴얼 구성의 지문 (매뉴얼이 추가·교체·삭제되면 바뀜)
+    def signature(self, **filters):
+        items = sorted(f"{m['manual_id']}:{m['pdf_hash']}:{m['model']}" for m in self.manuals(**filters))
+        filter_part = repr(sorted((k, sorted(v) if isinstance(v, (list, tuple, set)) else v)
+                                  for k, v in filters.items() if v is not None))
+        return "corpus-" + hashlib.sha256("\n".join([filter_part, *items]).encode("utf-8")).hexdigest()
+
+    # 여러 샤드의 쓰기 구간 (샤드 이름순으로 잠가 교착을 피함)
+    @contextmanager
+    def _writing_all(self, lines):
+        with ExitStack() as stack:
+            for line in sorted(set(lines)):
+                stack.enter_context(self._writing(line))
+            yield
+
+    def _manual_row(self, manual_id):
+        return self._connect().execute(
+            "SELECT pdf_hash, line, model FROM manuals WHERE manual_id = ?", (manual_id,)
+        ).fetchone()
+
+    # 샤드 인덱스에서 벡터 제거 (HNSW는 개별 삭제를 지원하지 않으므로 남은 벡터로 다시 만듦)
+    def _remove_vectors(self, index, ids):
+        try:
+            index.remove_ids(faiss.IDSelectorBatch(np.array(ids, dtype="int64")))
+            return index
+        except RuntimeError:
+            all_ids, vectors = self._contents(index)
+            keep = ~np.isin(all_ids, ids)
+            return ann.build_index(vectors[keep], self.index_type, ids=all_ids[keep])
+
+    # 매뉴얼의 벡터·청크·메타데이터 삭제 (호출하는 쪽이 샤드 쓰기 잠금과 트랜잭션을 잡은 상태에서) → 삭제된 청크 ID
+    def _delete_manual(self, conn, manual_id, line):
+        ids = [r["id"] for r in conn.execute("SELECT id FROM chunks WHERE manual_id = ?", (manual_id,))]
+        index = self._load_shard(line)
+        if index is not None and ids:
+            self._save_shard(line, self._remove_vectors(index, ids))
+        conn.execute("DELETE FROM chunks_fts WHERE rowid IN (SELECT id FROM chunks WHERE manual_id = ?)",
+                     (manual_id,))
+        conn.execute("DELETE FROM chunks WHERE manual_id = ?", (manual_id,))
+        conn.execute("DELETE FROM manuals WHERE manual_id = ?", (manual_id,))
+        return ids
+
+    # 매뉴얼 추가 (같은 manual_id가 있으면 교체). 반환: 추가된 청크 수
+    # 기존 매뉴얼 확인·교체·추가는 관련 샤드 쓰기 잠금 안에서 한 트랜잭션으로 처리
+    # (같은 PDF를 동시에 추가해도 한 번만 들어감, 청크 분할·임베딩은 잠금 밖에서)
+    def add_manual(self, pdf_file, line, equipment_id=None, version=None, language="ko",
+                   manual_id=None, title=None):
+        pdf_hash = hashlib.sha256(read_pdf_bytes(pdf_file)).hexdigest()
+        manual_id = manual_id or pdf_hash[:16]
+
+        def unchanged(row):
+            return row is not None and row["pdf_hash"] == pdf_hash and row["line"] == line \
+                and row["model"] == self.backend.model
+
+        chunks = vectors = None
+        while True:
+            existing = self._manual_row(manual_id)
+            if unchanged(existing):
+                return 0
+            if chunks is None:
+                chunks = list(iter_chunks(iter_pages_in_order(pdf_file)))
+                if chunks:
+                    vectors = embed_texts([chunk["text"] for chunk in chunks], backend=self.backend)
+            lines = {line} | ({existing["line"]} if existing else set())
+            with self._writing_all(lines):
+                conn = self._connect()
+                with conn:
+                    # 확인부터 교체·추가까지 한 쓰기 트랜잭션 (다른 샤드에 같은 매뉴얼을 추가하는 쪽과도 직렬화)
+                    conn.execute("BEGIN IMMEDIATE")
+                    current = self._manual_row(manual_id)
+                    if current is not None and current["line"] not in lines:
+                        continue  # 잠그기 전에 다른 쪽에서 다른 샤드로 옮김 → 그 샤드까지 잠가 다시 시도
+                    if unchanged(current):
+                        return 0
+                    if current is not None:
+                        self._delete_manual(conn, manual_id, current["line"])
+                    if not chunks:
+                        return 0
+                    conn.execute(
+                        "INSERT INTO manuals VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (manual_id, line, equipment_id, version, language, title, pdf_hash, self.backend.model),
+                    )
+                    ids = []
+                    for chunk in chunks:
+                        cur = conn.execute(
+                            'INSERT INTO chunks (manual_id, page, end_page, "offset", text) VALUES (?, ?, ?, ?, ?)',
+                            (manual_id, chunk["page"], chunk["end_page"], chunk["offset"], chunk["text"]),
+                        )
+                        ids.append(cur.lastrowid)
+                        conn.execute("INSERT INTO chunks_fts (rowid, tokens) VALUES (?, ?)",
+                                     (cur.lastrowid, " ".join(tokenize(chunk["text"]))))
+                    index = self._load_shard(line, dimension=vectors.shape[1])
+                    added = ann.normalize(vectors) if ann.uses_inner_product(index) else vectors
+                    index.add_with_ids(added, np.array(ids, dtype="int64"))
+                    index = self._maybe_upgrade(index)
+                    self._save_shard(line, index)
+                return len(chunks)
+
+    # 매뉴얼 삭제 (해당 샤드에서 벡터 제거 후 메타데이터 삭제)
+    def remove_manual(self, manual_id):
+        while True:
+            row = self._manual_row(manual_id)
+            if row is None:
+                return 0
+            with self._writing(row["line"]):
+                conn = self._connect()
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    current = self._manual_row(manual_id)
+                    if current is None:
+                        return 0
+                    if current["line"] != row["line"]:
+                        continue
+                    return len(self._delete_manual(conn, manual_id, row["line"]))
+
+    def _where(self, filters):
+        clauses, params = self._filter_clauses(filters)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _filter_clauses(self, filters):
+        clauses, params = [], []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"unknown filter: {field}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"m.{field} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return clauses, params
+
+    # 필터에 맞는 샤드별 검색 대상 {샤드: ID 선택기 또는 None(샤드 전체)}
+    # 매뉴얼 단위로 먼저 거르고, 샤드의 매뉴얼 전부가 해당하면 선택기 없이 검색
+    def _targets(self, filters):
+        if not any(v is not None for v in filters.values()):
+            return {line: None for line in self.lines()}
+        selected = {}
+        for manual in self.manuals(**filters):
+            selected.setdefault(manual["line"], []).append(manual["manual_id"])
+        totals = dict(self._connect().execute("SELECT line, COUNT(*) FROM manuals GROUP BY line").fetchall())
+        return {
+            line: None if len(manual_ids) == totals.get(line) else self._selector(line, manual_ids)
+            for line, manual_ids in selected.items()
+        }
+
+    # 매뉴얼 묶음의 청크 ID 선택기 (샤드 파일이 바뀌지 않는 한 재사용)
+    def _selector(self, line, manual_ids):
+        key = (line, _file_stamp(self._shard_path(line)), tuple(sorted(manual_ids)))
+        with self._lock:
+            if key in self._selectors:
+                self._selectors.move_to_end(key)
+                return self._selectors[key]
+        marks = ", ".join("?" * len(manual_ids))
+        ids = [row[0] for row in self._connect().execute(
+            f"SELECT id FROM chunks WHERE manual_id IN ({marks})", list(manual_ids))]
+        selector = faiss.IDSelectorBatch(np.array(ids, dtype="int64"))
+        with self._lock:
+            self._selectors[key] = selector
+            while len(self._selectors) > SELECTOR_CACHE_SIZE:
+                self._selectors.popitem(last=False)
+        return selector
+
+    # 어휘(BM25) 검색: FTS5 색인에서 필터를 조인 조건으로 적용해 청크 ID 순위 반환
+    def lexical_search(self, query, top_k=CANDIDATES, **filters):
+        match = fts_query(query)
+        if not match:
+            return []
+        clauses, params = self._filter_clauses(filters)
+        sql = (
+            "SELECT f.rowid AS id FROM chunks_fts f JOIN chunks c ON c.id = f.rowid "
+            "JOIN manuals m ON m.manual_id = c.manual_id WHERE chunks_fts MATCH ? "
+            + "".join(f"AND {clause} " for clause in clauses)
+            + "ORDER BY bm25(chunks_fts) LIMIT ?"
+        )
+        return [row["id"] for row in self._connect().execute(sql, [match, *params, top_k])]
+
+    # 벡터 검색과 BM25 검색 결과를 RRF로 융합
+    def search(self, query, top_k=5, hybrid=True, **filters):
+        if not hybrid:
+            return self.dense_search(query, top_k, **filters)
+        n_candidates = max(top_k, CANDIDATES)
+        dense = [row["id"] for row in self.dense_search(query, n_candidates, fetch=False, **filters)]
+        sparse = self.lexical_search(query, n_candidates, **filters)
+        return self._fetch(reciprocal_rank_fusion([dense, sparse])[:top_k], swap=True)
+
+    # 벡터 검색: 필터는 FAISS 검색 단계에서 ID 선택기로 적용 (검색 후 거르지 않음)
+    def dense_search(self, query, top_k=5, fetch=True, **filters):
+        query_vec = embed_texts([query], backend=self.backend)
+        targets = self._targets(filters)
+
+        hits = []
+        for line, selector in targets.items():
+            # 같은 샤드에 추가·삭제가 진행 중이면 끝날 때까지 기다렸다가 검색
+            with self._shard_lock(line).read():
+                index = self._load_shard(line)
+                if index is None or index.ntotal == 0:
+                    continue
+                params = ann.search_params(index, selector) if selector is not None else None
+                scores, labels = ann.search(index, query_vec, top_k, params=params)
+                # 샤드마다 점수 방향을 맞춤 (내적은 클수록, L2 거리는 작을수록 유사)
+                sign = 1.0 if ann.uses_inner_product(index) else -1.0
+            hits.extend((sign * float(d), int(i)) for d, i in zip(scores[0], labels[0]) if i >= 0)
+        hits = sorted(hits, reverse=True)[:top_k]
+        if not fetch:
+            return [{"id": i, "score": score} for score, i in hits]
+        return self._fetch(hits)
+
+    # hits: [(점수, ID), ...] (swap=True면 [(ID, 점수), ...])
+    def _fetch(self, hits, swap=False):
+        if not hits:
+            return []
+        if swap:
+            hits = [(score, i) for i, score in hits]
+        ids = [i for _, i in hits]
+        sql = (
+            'SELECT c.id, c.text, c.page, c.end_page, c."offset", m.manual_id, m.line, m.equipment_id, '
+            f"m.version, m.language, m.title FROM chunks c JOIN manuals m ON m.manual_id = c.manual_id "
+            f"WHERE c.id IN ({', '.join('?' * len(ids))})"
+        )
+        rows = {row["id"]: dict(row) for row in self._connect().execute(sql, ids)}
+        results = []
+        for score, i in hits:
+            if i in rows:
+                rows[i]["score"] = score
+                results.append(rows[i])
+        return results
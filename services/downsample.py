@@ -0,0 +1,36 @@
+import numpy as np
+
+# 차트 다운샘플링 설정
+CHART_WIDTH = 800  # 차트 가로 픽셀 (버킷 수)
+
+
+# 최소/최대 버킷 다운샘플링 → 남길 행 위치 (시간순)
+# - 행을 buckets개 구간으로 나누고 구간마다 최솟값·최댓값 행만 남김 (구간당 최대 2점)
+# - 순간적인 스파이크도 구간 최댓값으로 반드시 남으므로 임계치 초과 구간이 차트에서 사라지지 않음
+# - 결측값(NaN)은 최소·최대 후보에서 빼고, 값이 모두 결측인 구간은 점을 남기지 않음
+# - 결과 크기는 원본 행 수와 상관없이 최대 2 × buckets + 2
+def minmax_indices(values, buckets=CHART_WIDTH):
+    values = np.asarray(values)
+    n = len(values)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    size = -(-n // buckets)  # 구간당 행 수
+    padded = n if n % size == 0 else n + size - n % size
+    low = np.full(padded, np.inf, dtype=np.float64)
+    high = np.full(padded, -np.inf, dtype=np.float64)
+    low[:n] = values
+    high[:n] = values
+    low, high = low.reshape(-1, size), high.reshape(-1, size)
+    valid = ~np.isnan(low).all(axis=1)  # 값이 모두 결측인 구간은 건너뜀
+    starts = np.arange(0, padded, size)[valid]
+    mins = starts + np.nanargmin(low[valid], axis=1)
+    maxs = starts + np.nanargmax(high[valid], axis=1)
+    keep = np.concatenate([[0, n - 1], mins, maxs])
+    return np.unique(keep[keep < n])
+
+
+# DataFrame 다운샘플링 (column 기준 최소/최대 보존, 행 순서 유지)
+def downsample(frame, column, buckets=CHART_WIDTH):
+    if len(frame) <= 2 * buckets:
+        return frame
+    return frame.iloc[minmax_indices(frame[column].to_numpy(), buckets)]
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import openai
+
+from services.index_cache import CACHE_DIR
+
+# 임베딩 설정 (환경 변수로 조정 가능)
+EMBEDDING_MODEL = os.getenv("MANUPILOT_EMBEDDING_MODEL", "text-embedding-ada-002")
+EMBEDDING_BACKEND = os.getenv("MANUPILOT_EMBEDDING_BACKEND", "openai")
+EMBEDDING_STORE_DB = os.getenv("MANUPILOT_EMBEDDING_DB", os.path.join(CACHE_DIR, "embeddings.sqlite3"))
+EMBEDDING_STORE_DTYPE = os.getenv("MANUPILOT_EMBEDDING_DTYPE", "float16")
+EMBEDDING_STORE_MAX_ITEMS = int(os.getenv("MANUPILOT_EMBEDDING_MAX_ITEMS", "500000"))  # 모델별 최대 저장 개수
+TOUCH_SECONDS = 60
+_SQL_BATCH = 500
+
+_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    dtype TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (model, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_used ON embeddings(model, used_at);
+"""
+
+# 요청당 최대 입력 개수 / 대략적인 글자 수 (API 요청 한도 이내로 유지)
+BATCH_SIZE = 256
+BATCH_MAX_CHARS = 200_000
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 5
+
+
+# 텍스트 해시 키 (모델 이름 포함 → 모델이 바뀌면 다시 임베딩)
+def text_key(text, model):
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+# OpenAI 임베딩 백엔드 (재시도 + 지수 백오프)
+class OpenAIBackend:
+    def __init__(self, model=EMBEDDING_MODEL, max_retries=MAX_RETRIES):
+        self.model = model
+        self.max_retries = max_retries
+
+    def embed(self, texts):
+        delay = 1.0
+        for attempt in range(self.max_retries):
+            try:
+                response = openai.Embedding.create(model=self.model, input=texts)
+                data = sorted(response["data"], key=lambda item: item["index"])
+                return np.array([item["embedding"] for item in data], dtype="float32")
+            except (openai.error.InvalidRequestError, openai.error.AuthenticationError):
+                raise
+            except openai.error.OpenAIError:
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+# 네트워크 없이 쓰는 결정적 로컬 임베딩 (문자 n-gram 해싱, 테스트·벤치마크용)
+class HashingBackend:
+    def __init__(self, dim=256, ngram=(2, 3)):
+        self.dim = dim
+        self.ngram = ngram
+        self.model = f"local-hashing-{dim}"
+
+    def embed_one(self, text):
+        vec = np.zeros(self.dim, dtype="float32")
+        text = " ".join(text.lower().split())
+        for n in range(self.ngram[0], self.ngram[1] + 1):
+            for i in range(max(len(text) - n + 1, 1)):
+                digest = hashlib.blake2b(text[i:i + n].encode("utf-8"), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def embed(self, texts):
+        return np.stack([self.embed_one(t) for t in texts]).astype("float32")
+
+
+# 환경 변수에 맞는 기본 백엔드
+def default_backend():
+    if EMBEDDING_BACKEND == "local":
+        return HashingBackend()
+    return OpenAIBackend()
+
+
+# 청크 단위 임베딩 저장소 (SQLite 테이블 하나에 (모델, 텍스트 해시) 키로 추가 저장)
+# - 필요한 키만 조회하므로 시작할 때 전부 읽어 들이지 않음
+# - 모델별 최대 항목 수를 넘으면 오래 쓰지 않은 임베딩부터 삭제 (LRU)
+class EmbeddingStore:
+    def __init__(self, model, path=EMBEDDING_STORE_DB, dtype=EMBEDDING_STORE_DTYPE, max_items=EMBEDDING_STORE_MAX_ITEMS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.model = model
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.max_items = max_items
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(_STORE_SCHEMA)
+        conn.commit()
+        self._count = self._count_rows()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count_rows(self):
+        return self._connect().execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model,)).fetchone()[0]
+
+    def __len__(self):
+        return self._count_rows()
+
+    def __contains__(self, key):
+        return key in self.get_many([key])
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    # 여러 키 한 번에 조회 → {키: float32 벡터} (없는 키는 빠짐)
+    def get_many(self, keys):
+        conn = self._connect()
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for i in range(0, len(keys), _SQL_BATCH):
+            part = keys[i:i + _SQL_BATCH]
+            marks = ",".join("?" * len(part))
+            rows = conn.execute(
+                f"SELECT key, vector, dtype FROM embeddings WHERE model = ? AND key IN ({marks})",
+                [self.model, *part],
+            ).fetchall()
+            for key, blob, dtype in rows:
+                found[key] = np.frombuffer(blob, dtype=dtype).astype("float32")
+        if found:
+            # 최근 사용 시각 갱신 (LRU 기준, 자주 쓰는 키를 매번 다시 쓰지 않도록 간격을 둠)
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE embeddings SET used_at = ? WHERE model = ? AND key = ? AND used_at < ?",
+                    [(now, self.model, key, now - TOUCH_SECONDS) for key in found],
+                )
+        return found
+
+    def put_many(self, keys, vectors):
+        vectors = np.asarray(vectors).astype(self.dtype)
+        now = time.time()
+        rows = [(self.model, k, v.tobytes(), self.dtype.str, now) for k, v in zip(keys, vectors)]
+        if not rows:
+            return
+        conn = self._connect()
+        with self._lock:
+            with conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, key, vector, dtype, used_at) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._count += conn.total_changes - before
+            if self._count > self.max_items:
+                self._evict()
+
+    def _evict(self):
+        conn = self._connect()
+        self._count = self._count_rows()
+        excess = self._count - self.max_items
+        if excess <= 0:
+            return
+        with conn:
+            conn.execute(
+                "DELETE FROM embeddings WHERE model = ? AND key IN "
+                "(SELECT key FROM embeddings WHERE model = ? ORDER BY used_at LIMIT ?)",
+                (self.model, self.model, excess),
+            )
+        self._count -= excess
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# 모델별 저장소를 프로세스 내에서 한 번만 로드
+def get_store(model):
+    with _stores_lock:
+        if model not in _stores:
+            _stores[model] = EmbeddingStore(model)
+        return _stores[model]
+
+
+# 입력 개수와 글자 수 한도에 맞게 배치 나누기
+def make_batches(texts, batch_size=BATCH_SIZE, max_chars=BATCH_MAX_CHARS):
+    batch, chars = [], 0
+    for text in texts:
+        if batch and (len(batch) >= batch_size or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
+
+
+# 중복 제거 → 저장소에 없는 청크만 배치로 동시 임베딩 → 입력 순서대로 반환
+def embed_texts(texts, backend=None, store=None, batch_size=BATCH_SIZE, max_workers=MAX_CONCURRENCY):
+    backend = backend or default_backend()
+    store = store if store is not None else get_store(backend.model)
+
+    keys = [text_key(t, backend.model) for t in texts]
+    vectors = store.get_many(keys)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors and key not in missing:
+            missing[key] = text
+
+    if missing:
+        batches = list(make_batches(list(missing.values()), batch_size))
+
+        def run(batch):
+            batch_vectors = backend.embed(batch)
+            batch_keys = [text_key(t, backend.model) for t in batch]
+            store.put_many(batch_keys, batch_vectors)
+            # 저장 형식(float16)과 같은 정밀도로 반환해 캐시 적중 때와 결과가 같도록 함
+            stored = np.asarray(batch_vectors).astype(store.dtype).astype("float32")
+            return dict(zip(batch_keys, stored))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+            for future in [pool.submit(run, batch) for batch in batches]:
+                vectors.update(future.result())
+
+    if not keys:
+        return np.zeros((0, 0), dtype="float32")
+    return np.stack([vectors[key] for key in keys]).astype("float32")
@@ -0,0 +1,146 @@
+import atexit
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pdfplumber
+import pytesseract
+
+from services import index_cache
+from services.index_cache import PAGE_CACHE_DIR, read_pdf_bytes
+
+# 추출 설정 (환경 변수로 조정 가능, 페이지 캐시는 인덱스 캐시와 함께 용량 한도로 정리됨)
+OCR_WORKERS = int(os.getenv("MANUPILOT_OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_LANG = os.getenv("MANUPILOT_OCR_LANG", "kor")
+OCR_RESOLUTION = 200
+OCR_BATCH_PAGES = int(os.getenv("MANUPILOT_OCR_BATCH_PAGES", "4"))  # 워커 하나가 PDF를 한 번 열어 처리할 페이지 수
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# OCR 작업용 프로세스 풀 (프로세스당 한 번만 생성해 재사용)
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _page_cache_path(pdf_hash, page_no):
+    return os.path.join(PAGE_CACHE_DIR, pdf_hash, f"{page_no:05d}.txt")
+
+
+# (파일 해시, 페이지 번호) 단위 캐시 읽기
+def load_cached_page(pdf_hash, page_no):
+    path = _page_cache_path(pdf_hash, page_no)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def save_cached_page(pdf_hash, page_no, text):
+    path = _page_cache_path(pdf_hash, page_no)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# 워커 프로세스: PDF를 한 번 열어 여러 페이지를 이미지로 렌더링해 OCR 수행
+def ocr_pages(pdf_path, page_nos, lang=OCR_LANG, resolution=OCR_RESOLUTION):
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_no in page_nos:
+            image = pdf.pages[page_no - 1].to_image(resolution=resolution).original
+            results.append((page_no, pytesseract.image_to_string(image, lang=lang)))
+    return results
+
+
+# 워커가 열 수 있도록 PDF 원본을 캐시 디렉터리에 한 번 저장
+def _source_path(pdf_hash, data):
+    path = os.path.join(PAGE_CACHE_DIR, pdf_hash, "source.pdf")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+# 페이지를 완료되는 순서대로 (페이지 번호, 텍스트)로 반환
+# 텍스트 레이어가 있는 페이지는 바로, 스캔 페이지는 OCR_BATCH_PAGES개씩 묶어 OCR 워커에서 처리
+# 텍스트 페이지를 읽는 중에도 끝난 OCR 결과를 바로 내보내 뒤 단계가 기다리지 않도록 함
+def iter_pages(pdf_file, pool=None):
+    data = read_pdf_bytes(pdf_file)
+    pdf_hash = hashlib.sha256(data).hexdigest()
+    source = _source_path(pdf_hash, data)
+    try:
+        os.utime(os.path.dirname(source), None)  # 최근 사용 시각 갱신 (캐시 정리 기준)
+    except OSError:
+        pass
+    pending = set()
+    batch = []
+    saved = False
+
+    def submit():
+        nonlocal pool
+        pool = pool or get_pool()
+        pending.add(pool.submit(ocr_pages, source, list(batch)))
+        batch.clear()
+
+    def finished(future):
+        pending.discard(future)
+        for page_no, page_text in future.result():
+            page_text = page_text or ""
+            save_cached_page(pdf_hash, page_no, page_text)
+            yield page_no, page_text
+
+    with pdfplumber.open(source) as pdf:
+        for page_no, page in enumerate(pdf.pages, start=1):
+            for future in [f for f in pending if f.done()]:
+                yield from finished(future)
+            cached = load_cached_page(pdf_hash, page_no)
+            if cached is not None:
+                yield page_no, cached
+                continue
+            saved = True
+            page_text = page.extract_text()
+            if page_text:
+                save_cached_page(pdf_hash, page_no, page_text)
+                yield page_no, page_text
+            else:
+                # 스캔 페이지는 모아서 워커에 넘기고 다음 페이지 계속 처리
+                batch.append(page_no)
+                if len(batch) >= OCR_BATCH_PAGES:
+                    submit()
+    if batch:
+        submit()
+
+    for future in as_completed(list(pending)):
+        yield from finished(future)
+    if saved:
+        index_cache.evict()
+
+
+# 완료 순서로 들어오는 페이지를 페이지 순서대로 다시 맞춰 스트림으로 반환
+# (청크 분할처럼 순서가 필요한 다음 단계가 마지막 페이지를 기다리지 않고 시작 가능)
+def iter_pages_in_order(pdf_file, pool=None):
+    waiting = {}
+    next_page = 1
+    for page_no, page_text in iter_pages(pdf_file, pool=pool):
+        waiting[page_no] = page_text
+        while next_page in waiting:
+            yield next_page, waiting.pop(next_page)
+            next_page += 1
+
+
+# 전체 페이지를 페이지 순서대로 정렬한 리스트
+def extract_pages(pdf_file, pool=None):
+    return sorted(iter_pages(pdf_file, pool=pool))
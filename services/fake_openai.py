@@ -0,0 +1,113 @@
+# 테스트·벤치마크용 로컬 가짜 OpenAI 서버 (채팅 스트리밍·임베딩)
+# 실행 예: python -m services.fake_openai --port 8765
+#         OPENAI_API_BASE=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test streamlit run main.py
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.embeddings import HashingBackend
+
+_QUESTION = re.compile(r"Question:\s*(.*?)\n", re.S)
+_PAGES = re.compile(r"\[(p\.\d+(?:-\d+)?)\]")
+
+
+# 요청 내용으로 결정적인 답변 생성 (질문과 문맥의 페이지 표시를 그대로 인용)
+def fake_answer(messages):
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    match = _QUESTION.search(user)
+    question = match.group(1).strip() if match else user.strip()[:80]
+    pages = list(dict.fromkeys(_PAGES.findall(user)))
+    cite = f" ({', '.join(pages)})" if pages else ""
+    return f"'{question}'에 대한 매뉴얼 기반 답변입니다{cite}."
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    # 서버 인스턴스에 붙는 설정: first_token_delay, token_delay, embedder
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+        if self.path.endswith("/chat/completions"):
+            self._chat(request)
+        elif self.path.endswith("/embeddings"):
+            self._embeddings(request)
+        else:
+            self._json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+    def _chat(self, request):
+        answer = fake_answer(request.get("messages", []))
+        model = request.get("model", "fake")
+        if not request.get("stream"):
+            time.sleep(self.server.first_token_delay)
+            self._json({
+                "id": "fake", "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                             "finish_reason": "stop"}],
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        time.sleep(self.server.first_token_delay)
+        for i, token in enumerate(re.findall(r"\S+\s*", answer)):
+            if i:
+                time.sleep(self.server.token_delay)
+            chunk = {"id": "fake", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _embeddings(self, request):
+        texts = request.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        vectors = self.server.embedder.embed(texts)
+        self._json({
+            "object": "list", "model": request.get("model", "fake"),
+            "data": [{"object": "embedding", "index": i, "embedding": vec.tolist()} for i, vec in enumerate(vectors)],
+        })
+
+
+# 백그라운드 스레드에서 서버 시작 → (서버, api_base). 종료: server.shutdown()
+def start_server(port=0, first_token_delay=0.0, token_delay=0.0, dim=1536):
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.first_token_delay = first_token_delay
+    server.token_delay = token_delay
+    server.embedder = HashingBackend(dim=dim)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 OpenAI 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    server, api_base = start_server(args.port, args.first_token_delay, args.token_delay)
+    print(f"fake OpenAI server: {api_base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import faiss
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+# 캐시 설정 (환경 변수로 조정 가능)
+CACHE_DIR = os.getenv("MANUPILOT_CACHE_DIR", os.path.join(".cache", "manupilot"))
+INDEX_CACHE_DIR = os.path.join(CACHE_DIR, "indexes")
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")  # 페이지별 추출 텍스트 (services.extraction)
+INDEX_CACHE_MAX_MB = float(os.getenv("MANUPILOT_INDEX_CACHE_MB", "2048"))
+MEMORY_CACHE_SIZE = int(os.getenv("MANUPILOT_INDEX_MEMORY_ITEMS", "8"))
+
+# 청크 분할·임베딩 방식이 바뀌면 올려서 기존 캐시를 무효화
+INDEX_VERSION = "v3"
+
+_memory_cache = OrderedDict()
+_lock = threading.Lock()
+_build_locks = {}  # 캐시 키별 생성 잠금 (같은 PDF를 여러 세션이 동시에 올려도 한 번만 생성)
+
+
+# 프로세스 간 배타 잠금 (Streamlit·백엔드 프로세스가 같은 파일을 동시에 고치지 않도록)
+@contextmanager
+def file_lock(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# 프로세스 간 소유 잠금 시도 (잡으면 열린 파일을 돌려주고 닫을 때까지 유지, 다른 프로세스가 잡고 있으면 None)
+def try_file_lock(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "a+")
+    if fcntl is not None:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return None
+    return f
+
+
+# 업로드 파일(UploadedFile, 파일 객체, 경로)에서 바이트 읽기
+def read_pdf_bytes(pdf_file):
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    pos = pdf_file.tell()
+    pdf_file.seek(0)
+    data = pdf_file.read()
+    pdf_file.seek(pos)
+    return data
+
+
+# PDF 내용 기반 해시 (파일 이름이 달라도 같은 내용이면 같은 키)
+def file_hash(pdf_file):
+    return hashlib.sha256(read_pdf_bytes(pdf_file)).hexdigest()
+
+
+# 캐시 키 = 내용 해시 + 인덱스 버전 (+ 임베딩 모델 등 변형 구분자)
+def cache_key(pdf_hash, variant=""):
+    key = f"{pdf_hash}-{INDEX_VERSION}"
+    if variant:
+        key += "-" + hashlib.sha1(variant.encode("utf-8")).hexdigest()[:8]
+    return key
+
+
+def _entry_dir(key):
+    return os.path.join(INDEX_CACHE_DIR, key)
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        total += os.path.getsize(os.path.join(path, name))
+    return total
+
+
+# 캐시된 인덱스와 청크 불러오기 (없으면 None)
+def load_index(key):
+    with _lock:
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            _memory_cache.move_to_end(key)
+    if cached is not None:
+        try:
+            os.utime(_entry_dir(key), None)
+        except OSError:
+            pass
+        return cached
+
+    path = _entry_dir(key)
+    index_path = os.path.join(path, "index.faiss")
+    chunks_path = os.path.join(path, "chunks.json")
+    if not (os.path.exists(index_path) and os.path.exists(chunks_path)):
+        return None
+    try:
+        index = faiss.read_index(index_path)
+        with open(chunks_path, encoding="utf-8") as f:
+            chunks = json.load(f)
+    except (OSError, RuntimeError, ValueError):
+        # 손상된 항목은 지우고 다시 생성하도록 함
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+
+    # 최근 사용 시각 갱신 (LRU 제거 기준)
+    os.utime(path, None)
+    _remember(key, (index, chunks))
+    return index, chunks
+
+
+# 인덱스와 청크를 디스크에 저장 (임시 디렉터리에 쓴 뒤 교체)
+def save_index(key, index, chunks):
+    os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+    path = _entry_dir(key)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    faiss.write_index(index, os.path.join(tmp_path, "index.faiss"))
+    with open(os.path.join(tmp_path, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False)
+
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # 다른 프로세스가 먼저 저장한 경우
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    _remember(key, (index, chunks))
+    evict()
+
+
+def _key_lock(key):
+    with _lock:
+        lock = _build_locks.get(key)
+        if lock is None:
+            lock = _build_locks[key] = threading.Lock()
+        return lock
+
+
+def _forget(name):
+    # 인덱스 항목과 그 옆 보조 파일(key/name) 메모리 캐시를 함께 제거
+    with _lock:
+        for memory_key in [k for k in _memory_cache if k == name or k.startswith(name + "/")]:
+            del _memory_cache[memory_key]
+
+
+def _remember(key, value):
+    with _lock:
+        _memory_cache[key] = value
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+# 디스크 캐시(인덱스 + 페이지 텍스트)가 최대 용량을 넘으면 오래 사용하지 않은 항목부터 삭제
+def evict(max_mb=None):
+    max_bytes = (INDEX_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+
+    entries = []
+    for root in (INDEX_CACHE_DIR, PAGE_CACHE_DIR):
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if not os.path.isdir(path) or ".tmp-" in name:
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _dir_size(path), root, name))
+            except OSError:
+                continue
+
+    total = sum(size for _, size, _, _ in entries)
+    removed = []
+    for _, size, root, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        _forget(name)
+        total -= size
+        removed.append(name)
+    return removed
+
+
+# 캐시가 있으면 재사용하고, 없으면 build_fn으로 생성 후 저장
+def get_or_build(pdf_file, build_fn, variant=""):
+    key = cache_key(file_hash(pdf_file), variant)
+    cached = load_index(key)
+    if cached is not None:
+        return cached
+
+    with _key_lock(key):
+        # 기다리는 동안 다른 세션이 만들었으면 그대로 사용
+        cached = load_index(key)
+        if cached is not None:
+            return cached
+        index, chunks = build_fn(pdf_file)
+        save_index(key, index, chunks)
+        return index, chunks
+
+
+# 같은 캐시 항목 옆에 보조 파일(예: BM25 역색인)을 저장·재사용
+def get_or_build_sidecar(pdf_file, name, build_fn, load_fn, save_fn, variant=""):
+    key = cache_key(file_hash(pdf_file), variant)
+    memory_key = f"{key}/{name}"
+    with _lock:
+        cached = _memory_cache.get(memory_key)
+        if cached is not None:
+            _memory_cache.move_to_end(memory_key)
+            return cached
+
+    with _key_lock(memory_key):
+        with _lock:
+            cached = _memory_cache.get(memory_key)
+        if cached is not None:
+            return cached
+
+        path = os.path.join(_entry_dir(key), name)
+        value = None
+        if os.path.exists(path):
+            try:
+                value = load_fn(path)
+            except (OSError, ValueError, KeyError):
+                value = None
+        if value is None:
+            value = build_fn()
+            os.makedirs(_entry_dir(key), exist_ok=True)
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            save_fn(value, tmp_path)
+            os.replace(tmp_path, path)
+
+        _remember(memory_key, value)
+        return value
@@ -0,0 +1,150 @@
+import json
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 순위 융합(RRF) 상수와 후보 수
+RRF_K = 60
+CANDIDATES = 30
+
+# 영문·숫자 코드(E-203, AB12/3 등)와 한글 단어
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*|[가-힣]+")
+_HANGUL_WORD = re.compile(r"[가-힣]+")
+_SPLIT = re.compile(r"[-_./]")
+
+
+# 한국어 매뉴얼용 토큰화
+# - 오류 코드·부품 번호는 통째로 하나의 토큰 (+ 구분자로 나눈 부분)
+# - 한글은 조사·어미가 붙어도 맞도록 글자 2-gram (한 글자 단어는 그대로)
+def tokenize(text):
+    tokens = []
+    for match in _TOKEN.finditer(text.lower()):
+        word = match.group()
+        if _HANGUL_WORD.fullmatch(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+            parts = _SPLIT.split(word)
+            if len(parts) > 1:
+                tokens.extend(p for p in parts if len(p) > 1 or p.isdigit())
+    return tokens
+
+
+# 청크 목록 위의 BM25 역색인 (토큰별 문서 ID·빈도를 연속 배열로 보관)
+class BM25Index:
+    def __init__(self, vocab, offsets, doc_ids, tfs, doc_lens):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lens = doc_lens
+        self.avgdl = float(doc_lens.mean()) if len(doc_lens) else 0.0
+
+    @classmethod
+    def build(cls, texts):
+        postings = {}
+        doc_lens = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lens.append(sum(counts.values()))
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((doc_id, tf))
+
+        vocab = {}
+        offsets = [0]
+        doc_ids, tfs = [], []
+        for token_id, (token, plist) in enumerate(postings.items()):
+            vocab[token] = token_id
+            doc_ids.extend(d for d, _ in plist)
+            tfs.extend(tf for _, tf in plist)
+            offsets.append(len(doc_ids))
+        return cls(
+            vocab,
+            np.array(offsets, dtype="int64"),
+            np.array(doc_ids, dtype="int32"),
+            np.array(tfs, dtype="float32"),
+            np.array(doc_lens, dtype="float32"),
+        )
+
+    def __len__(self):
+        return len(self.doc_lens)
+
+    # 질의 BM25 점수 상위 top_k → [(문서 ID, 점수), ...]
+    def search(self, query, top_k=CANDIDATES):
+        n_docs = len(self.doc_lens)
+        if n_docs == 0:
+            return []
+        scores = np.zeros(n_docs, dtype="float32")
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lens / max(self.avgdl, 1e-6))
+        for token in set(tokenize(query)):
+            token_id = self.vocab.get(token)
+            if token_id is None:
+                continue
+            start, end = self.offsets[token_id], self.offsets[token_id + 1]
+            docs, tf = self.doc_ids[start:end], self.tfs[start:end]
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm[docs])
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k)[:top_k]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [(int(i), float(scores[i])) for i in hits]
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, vocab=np.array(json.dumps(self.vocab, ensure_ascii=False)), offsets=self.offsets,
+                     doc_ids=self.doc_ids, tfs=self.tfs, doc_lens=self.doc_lens)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(json.loads(str(data["vocab"])), data["offsets"], data["doc_ids"],
+                       data["tfs"], data["doc_lens"])
+
+
+def _fts_quote(token):
+    return '"' + token.replace('"', '""') + '"'
+
+
+# FTS5 MATCH 질의문 (토큰을 따옴표로 감싸 OR 결합, 순위 검색용)
+def fts_query(text):
+    tokens = sorted(set(tokenize(text)))
+    return " OR ".join(_fts_quote(t) for t in tokens)
+
+
+# 게시판 검색용 FTS5 질의 (부분 문자열 검색처럼 모든 검색어를 포함한 글만 찾음)
+# - 공백으로 나눈 검색어의 단어마다 조건 하나, 모든 조건을 AND
+# - 한글 단어: 2-gram을 모두 AND / 영문·숫자 코드: 접두사 검색 (valv, valv* → valve)
+# - 2글자 미만 단어는 FTS 토큰으로 찾을 수 없어 like_terms로 돌려 LIKE 검색
+# 반환: (MATCH 식 또는 "", like_terms)
+def fts_search_query(text):
+    clauses, like_terms = [], []
+    for match in _TOKEN.finditer(text.lower()):
+        word = match.group()
+        if len(word) < 2:
+            like_terms.append(word)
+        elif _HANGUL_WORD.fullmatch(word):
+            bigrams = dict.fromkeys(word[i:i + 2] for i in range(len(word) - 1))
+            clauses.append(" AND ".join(_fts_quote(b) for b in bigrams))
+        else:
+            clauses.append(_fts_quote(word) + " *")
+    return " AND ".join(f"({c})" for c in clauses), list(dict.fromkeys(like_terms))
+
+
+# 여러 순위 목록을 RRF(Reciprocal Rank Fusion)로 합침 → [(ID, 점수), ...]
+def reciprocal_rank_fusion(rankings, k=RRF_K, weights=None):
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+
+import numpy as np
+
+from services.lexical import tokenize
+
+# MinHash/LSH 설정
+NUM_PERM = 128
+LSH_BANDS = 32  # 밴드 32개 × 4행 → 자카드 유사도 약 0.4부터 후보로 잡힘
+DUPLICATE_THRESHOLD = 0.6  # 추정 자카드 유사도가 이 이상이면 유사 항목으로 표시
+_PRIME = (1 << 61) - 1
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _permutations(num_perm, seed=1):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+# 텍스트의 토큰 집합 (한글은 2-gram이라 조사·어미가 달라도 겹침)
+def shingles(text):
+    return set(tokenize(text))
+
+
+def _token_hashes(tokens):
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens],
+        dtype=np.uint64,
+    )
+
+
+# 게시글 근접 중복 색인 (MinHash 서명 + LSH 버킷)
+# 항목을 저장할 때 한 번만 서명을 만들어 버킷에 넣고, 유사 항목은 같은 버킷 후보만 비교
+class DuplicateIndex:
+    def __init__(self, num_perm=NUM_PERM, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._a, self._b = _permutations(num_perm)
+        self.signatures = {}
+        self._buckets = [dict() for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def signature(self, text):
+        hashes = _token_hashes(shingles(text))
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        permuted = (hashes[:, None] * self._a + self._b) % np.uint64(_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)  # 32비트만 써서 항목당 서명 512바이트
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    # 같은 버킷에 한 번이라도 들어간 항목 → 서명으로 유사도 추정 → 임계값 이상만 반환
+    def _query_signature(self, signature, exclude=None):
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(exclude)
+        results = []
+        for other in candidates:
+            similarity = float(np.mean(self.signatures[other] == signature))
+            if similarity >= self.threshold:
+                results.append((other, similarity))
+        return sorted(results, key=lambda r: r[1], reverse=True)
+
+    def query(self, text=None, signature=None):
+        signature = signature if signature is not None else self.signature(text)
+        with self._lock:
+            return self._query_signature(signature)
+
+    # 색인에 있는 항목과 유사한 다른 항목 [(entry_id, 유사도)] (먼저·나중에 추가된 항목 모두)
+    def similar(self, entry_id):
+        with self._lock:
+            signature = self.signatures.get(entry_id)
+            if signature is None:
+                return []
+            return self._query_signature(signature, exclude=entry_id)
+
+    # 항목 추가 후 유사 항목 [(entry_id, 유사도)] 반환
+    def add(self, entry_id, text=None, signature=None):
+        signature = signature if signature is not None else self.signature(text)
+        with self._lock:
+            if entry_id in self.signatures:
+                self._remove(entry_id)
+            similar = self._query_signature(signature, exclude=entry_id)
+            self.signatures[entry_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(entry_id)
+        return similar
+
+    def _remove(self, entry_id):
+        signature = self.signatures.pop(entry_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def remove(self, entry_id):
+        with self._lock:
+            if entry_id in self.signatures:
+                self._remove(entry_id)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
+
+FONT_NAME = "HYSMyeongJo-Medium"
+PDF_CACHE_SIZE = 128
+
+_styles = None
+_styles_lock = threading.Lock()
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+# 폰트 등록과 스타일 정의는 프로세스당 한 번만
+def get_styles():
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            # 폰트 등록 (한글 지원)
+            pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+            _styles = {
+                "title": ParagraphStyle(
+                    name="Title",
+                    fontName=FONT_NAME,
+                    fontSize=18,
+                    leading=24,
+                    spaceAfter=10,
+                    alignment=1,  # center
+                    textColor=colors.HexColor("#2E4053"),
+                ),
+                "heading": ParagraphStyle(
+                    name="Heading",
+                    fontName=FONT_NAME,
+                    fontSize=13,
+                    leading=20,
+                    spaceBefore=6,
+                    spaceAfter=6,
+                    textColor=colors.HexColor("#2E4053"),
+                ),
+                "body": ParagraphStyle(
+                    name="Body",
+                    fontName=FONT_NAME,
+                    fontSize=11,
+                    leading=18,
+                    spaceAfter=6,
+                ),
+                "source": ParagraphStyle(
+                    name="Source",
+                    fontName=FONT_NAME,
+                    fontSize=9,
+                    leading=13,
+                    leftIndent=10,
+                    textColor=colors.HexColor("#5D6D7E"),
+                ),
+            }
+        return _styles
+
+
+# Paragraph 마크업으로 해석되지 않도록 이스케이프 (줄바꿈은 유지)
+def _text(value):
+    return escape(str(value)).replace("\n", "<br/>")
+
+
+def _page_label(source):
+    if source.get("page") is None:
+        return ""
+    if source.get("end_page") in (None, source["page"]):
+        return f"p.{source['page']}"
+    return f"p.{source['page']}-{source['end_page']}"
+
+
+# 질문 하나에 대한 스토리 조각 (질문·답변·근거)
+def _qa_story(question, answer, sources, styles, number=None):
+    prefix = f"{number}. " if number is not None else ""
+    story = [
+        Paragraph(f"{prefix}질문: {_text(question)}", styles["body"]),
+        Spacer(1, 12),
+        HRFlowable(width="100%", thickness=1, color=colors.grey, spaceBefore=6, spaceAfter=10),
+        Paragraph(f"답변: {_text(answer)}", styles["body"]),
+    ]
+    if sources:
+        story.append(Spacer(1, 6))
+        story.append(Paragraph("근거", styles["body"]))
+        for source in sources:
+            title = f"{source['title']} · " if source.get("title") else ""
+            snippet = source.get("text", "")[:200]
+            story.append(Paragraph(f"[{_text(title)}{_page_label(source)}] {_text(snippet)}", styles["source"]))
+    story += [
+        Spacer(1, 12),
+        HRFlowable(width="100%", thickness=0.5, color=colors.lightgrey, spaceBefore=6),
+    ]
+    return story
+
+
+def _build(story):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            leftMargin=20, rightMargin=20,
+                            topMargin=20, bottomMargin=20)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _cache_key(*parts):
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cached(key, render):
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+    data = render()
+    with _pdf_cache_lock:
+        _pdf_cache[key] = data
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return data
+
+
+def _source_refs(sources):
+    return [(s.get("title"), s.get("page"), s.get("end_page"), s.get("text", "")[:200]) for s in sources or []]
+
+
+# 질문·답변 PDF (같은 질문·답변·근거면 렌더링된 바이트를 재사용)
+def render_answer_pdf(question, answer, sources=None):
+    key = _cache_key("answer", question, answer, _source_refs(sources))
+
+    def render():
+        styles = get_styles()
+        story = [Paragraph("질문과 답변", styles["title"]), Spacer(1, 12)]
+        story += _qa_story(question, answer, sources, styles)
+        return _build(story)
+
+    return _cached(key, render)
+
+
+# 세션의 질문·답변 기록 전체를 한 번에 렌더링한 보고서 PDF
+# items: [{"question", "answer", "sources"(선택)}, ...]
+def render_report(items, title="매뉴얼 질의응답 보고서"):
+    key = _cache_key("report", title, [(i["question"], i["answer"], _source_refs(i.get("sources"))) for i in items])
+
+    def render():
+        styles = get_styles()
+        story = [
+            Paragraph(_text(title), styles["title"]),
+            Paragraph(f"{datetime.now():%Y-%m-%d %H:%M} · 질문 {len(items)}건", styles["source"]),
+            Spacer(1, 12),
+        ]
+        for number, item in enumerate(items, start=1):
+            story += _qa_story(item["question"], item["answer"], item.get("sources"), styles, number=number)
+        return _build(story)
+
+    return _cached(key, render)
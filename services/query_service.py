@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from services import rag
+from services.answer_cache import normalize_question
+from services.corpus import FILTER_FIELDS
+from services.index_cache import CACHE_DIR
+from services.summarize import summarize_manual
+
+# 백엔드 설정 (환경 변수로 조정 가능)
+MANUAL_DIR = os.path.join(CACHE_DIR, "manuals")
+QUERY_WORKERS = int(os.getenv("MANUPILOT_QUERY_WORKERS", str(os.cpu_count() or 4)))
+# 추출·청크 분할·토큰화·BM25·벡터 색인처럼 GIL에 묶이는 작업용 프로세스 수 (0이면 스레드 풀에서 실행)
+INDEX_WORKERS = int(os.getenv("MANUPILOT_INDEX_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PDF_HASH_PATTERN = re.compile(r"[0-9a-f]{64}")  # 매뉴얼 ID = PDF 원본의 sha256 (16진수 소문자)
+
+
+# 프로세스 풀 작업: 매뉴얼 하나를 색인해 디스크 캐시에 저장 (질의 시에는 캐시에서 바로 읽음)
+def index_manual_job(path):
+    started = time.perf_counter()
+    index, chunks = rag.load_vectorstore(path)
+    rag.load_lexical_index(path, chunks)
+    return {"chunks": len(chunks), "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+
+# 프로세스 풀 작업: 매뉴얼 라이브러리에 추가 (샤드 파일은 파일 잠금으로 보호, 다른 프로세스는 변경을 감지해 다시 읽음)
+def library_add_job(path, line, equipment_id=None, version=None, language="ko", title=None):
+    started = time.perf_counter()
+    added = rag.get_corpus().add_manual(path, line, equipment_id, version, language, title=title)
+    return {"chunks": added, "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+
+# 필터 키 검사 (알 수 없는 키는 ValueError → 백엔드에서 400)
+def validate_filters(filters):
+    unknown = sorted(set(filters) - set(FILTER_FIELDS))
+    if unknown:
+        raise ValueError(f"unknown filter: {', '.join(unknown)} (choose from {', '.join(FILTER_FIELDS)})")
+    return filters
+
+
+# 매뉴얼 해시 검사 (sha256 형식이 아니면 ValueError → 백엔드에서 400, 해시가 파일 경로에 들어가므로 다른 값은 받지 않음)
+def validate_pdf_hash(pdf_hash):
+    if not isinstance(pdf_hash, str) or not PDF_HASH_PATTERN.fullmatch(pdf_hash):
+        raise ValueError("pdf_hash must be a 64-character lowercase hex sha256 digest")
+    return pdf_hash
+
+
+# 여러 세션의 요청을 한곳에서 처리하는 질의 서비스
+# - asyncio 요청 계층 + 크기가 제한된 워커 풀
+#   · CPU 작업(매뉴얼 색인·라이브러리 추가)은 프로세스 풀, LLM 호출처럼 기다리는 작업은 스레드 풀
+# - 같은 작업(같은 매뉴얼 색인, 같은 매뉴얼에 대한 같은 질문)이 진행 중이면 새로 실행하지 않고 결과를 공유
+class QueryService:
+    def __init__(self, max_workers=QUERY_WORKERS, manual_dir=MANUAL_DIR, index_workers=INDEX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        # spawn: 스레드가 도는 프로세스를 fork하지 않도록 새 인터프리터로 시작
+        self.cpu_executor = ProcessPoolExecutor(
+            max_workers=index_workers, mp_context=multiprocessing.get_context("spawn")
+        ) if index_workers > 0 else self.executor
+        self.manual_dir = manual_dir
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "executed": 0, "coalesced": 0, "errors": 0}
+        os.makedirs(manual_dir, exist_ok=True)
+
+    async def _run(self, fn, *args, executor=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self.executor, partial(fn, *args, **kwargs))
+
+    # 같은 key의 작업이 진행 중이면 그 결과를 기다리고, 없으면 새로 실행
+    async def _coalesce(self, key, fn, *args, executor=None, **kwargs):
+        self.stats["requests"] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["executed"] += 1
+            task = asyncio.ensure_future(self._run(fn, *args, executor=executor, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            # 한 요청이 취소돼도 공유 중인 작업은 계속 진행
+            return await asyncio.shield(task)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    def manual_path(self, pdf_hash):
+        return os.path.join(self.manual_dir, f"{validate_pdf_hash(pdf_hash)}.pdf")
+
+    def has_manual(self, pdf_hash):
+        return os.path.exists(self.manual_path(pdf_hash))
+
+    def _store_manual(self, data):
+        pdf_hash = hashlib.sha256(data).hexdigest()
+        path = self.manual_path(pdf_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return pdf_hash
+
+    async def _index(self, pdf_hash):
+        result = await self._coalesce(("index", pdf_hash), index_manual_job, self.manual_path(pdf_hash),
+                                      executor=self.cpu_executor)
+        return {"pdf_hash": pdf_hash, **result}
+
+    def _require(self, pdf_hash):
+        if not self.has_manual(pdf_hash):
+            raise KeyError(pdf_hash)
+        return self.manual_path(pdf_hash)
+
+    # PDF 등록 + 색인 (이미 색인된 매뉴얼은 캐시에서 바로 반환)
+    async def add_manual(self, data):
+        pdf_hash = await self._run(self._store_manual, data)
+        return await self._index(pdf_hash)
+
+    # 등록된 PDF를 매뉴얼 라이브러리에 추가
+    async def add_to_library(self, pdf_hash, line, **meta):
+        path = self._require(pdf_hash)
+        key = ("library", pdf_hash, line, tuple(sorted(meta.items())))
+        return await self._coalesce(key, library_add_job, path, line, executor=self.cpu_executor, **meta)
+
+    async def library(self):
+        return await self._run(lambda: rag.get_corpus().manuals())
+
+    # 등록된 PDF 요약 카드 (부분 요약은 요약 캐시에서 재사용, LLM 호출 위주라 스레드 풀)
+    async def summarize(self, pdf_hash):
+        path = self._require(pdf_hash)
+        return await self._coalesce(("summary", pdf_hash), summarize_manual, path)
+
+    # 질문 처리: pdf_hash가 있으면 해당 매뉴얼, 없으면 매뉴얼 라이브러리(filters 적용)
+    async def ask(self, question, pdf_hash=None, filters=None):
+        filters = validate_filters({k: v for k, v in (filters or {}).items() if v})
+        if pdf_hash is not None:
+            path = self._require(pdf_hash)
+            # 색인이 진행 중이면 그 작업에 합류
+            await self._index(pdf_hash)
+            target = ("pdf", pdf_hash)
+            kwargs = {"pdf_file": path}
+        else:
+            target = ("corpus", repr(sorted((k, sorted(v) if isinstance(v, list) else v) for k, v in filters.items())))
+            kwargs = {"filters": filters}
+        key = ("ask", target, normalize_question(question))
+        return await self._coalesce(key, rag.answer_question, question, **kwargs)
+
+    def snapshot(self):
+        cpu_workers = self.cpu_executor._max_workers if self.cpu_executor is not self.executor else 0
+        return {**self.stats, "inflight": len(self._inflight), "workers": self.executor._max_workers,
+                "index_workers": cpu_workers}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.cpu_executor is not self.executor:
+            self.cpu_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+
+import openai
+from dotenv import load_dotenv
+
+from services import ann, chat, index_cache
+from services.answer_cache import AnswerCache
+from services.chunking import iter_chunks, CHUNK_CHARS
+from services.context import assemble_context, CANDIDATE_K
+from services.corpus import CorpusIndex
+from services.embeddings import embed_texts, default_backend
+from services.extraction import extract_pages, iter_pages_in_order
+from services.lexical import BM25Index, reciprocal_rank_fusion, CANDIDATES
+
+# .env 파일 로드
+load_dotenv()
+openai.api_key = os.getenv("OPENAI_API_KEY")
+
+_corpus = None
+_answer_cache = None
+_singleton_lock = threading.Lock()
+
+
+# OCR을 통해 PDF 페이지에서 텍스트 추출 (스캔 페이지는 프로세스 풀에서 병렬 OCR, 페이지 단위 캐시)
+def extract_text_with_ocr(pdf_file):
+    return "\n".join(page_text for _, page_text in extract_pages(pdf_file))
+
+
+# 텍스트를 청크로 나누기 (글자 수 예산 + 겹침, 문장 경계 우선)
+def chunk_text(text, chunk_size=CHUNK_CHARS):
+    return [chunk["text"] for chunk in iter_chunks([(1, text)], max_chars=chunk_size)]
+
+
+# OpenAI API를 사용해 텍스트 임베딩 생성 (배치·중복 제거·로컬 저장소 재사용)
+def get_openai_embeddings(texts, backend=None):
+    return embed_texts(texts, backend=backend)
+
+
+# PDF 파일을 열어 텍스트를 추출하고 벡터 데이터베이스 생성
+# 페이지 스트림을 바로 청크로 나누고, 각 청크에 페이지 번호와 위치를 기록
+def build_vectorstore(pdf_file, backend=None):
+    chunks = list(iter_chunks(iter_pages_in_order(pdf_file)))
+    embeddings = get_openai_embeddings([chunk["text"] for chunk in chunks], backend=backend)
+
+    # FAISS 인덱스 생성 (MANUPILOT_INDEX_TYPE: 기본 코사인 flat, 대용량은 IVF/HNSW, 학습 데이터가 부족하면 flat)
+    index = ann.build_index(embeddings, ann.INDEX_TYPE)
+
+    return index, chunks
+
+
+# 캐시 구분자 (임베딩 모델·인덱스 종류가 바뀌면 다시 생성)
+def _index_variant(backend=None):
+    return f"{(backend or default_backend()).model}:{ann.INDEX_TYPE}"
+
+
+# PDF 내용 해시로 캐시된 벡터 데이터베이스를 재사용 (없으면 생성 후 디스크에 저장)
+# backend: 임베딩 백엔드 (기본은 환경 변수 설정, 일괄 실행은 속도 제한을 건 백엔드를 넘김)
+def load_vectorstore(pdf_file, backend=None):
+    return index_cache.get_or_build(pdf_file, lambda f: build_vectorstore(f, backend=backend),
+                                    variant=_index_variant(backend))
+
+
+# 같은 청크로 만든 BM25 역색인 (벡터 인덱스 옆에 함께 캐시)
+def load_lexical_index(pdf_file, chunks):
+    return index_cache.get_or_build_sidecar(
+        pdf_file, "bm25.npz",
+        build_fn=lambda: BM25Index.build([chunk["text"] for chunk in chunks]),
+        load_fn=BM25Index.load,
+        save_fn=lambda lexical, path: lexical.save(path),
+        variant=_index_variant(),
+    )
+
+
+# 가장 유사한 문서 검색 (lexical을 주면 벡터·BM25 결과를 RRF로 융합)
+def search_documents(index, chunks, query, top_k=3, lexical=None, backend=None):
+    query_embedding = get_openai_embeddings([query], backend=backend)
+    n_candidates = max(top_k, CANDIDATES) if lexical is not None else top_k
+    distances, indices = ann.search(index, query_embedding, n_candidates)
+    dense = [int(i) for i in indices[0] if i >= 0]
+    if lexical is None:
+        return [chunks[i] for i in dense]
+    sparse = [doc_id for doc_id, _ in lexical.search(query, n_candidates)]
+    fused = reciprocal_rank_fusion([dense, sparse])[:top_k]
+    return [chunks[i] for i, _ in fused]
+
+
+# 질문에 맞는 청크 검색 (pdf_file이 없으면 매뉴얼 라이브러리에서 필터 적용)
+def retrieve(question, pdf_file=None, filters=None, top_k=3):
+    if pdf_file is None:
+        return get_corpus().search(question, top_k=top_k, **(filters or {}))
+    index, chunks = load_vectorstore(pdf_file)
+    lexical = load_lexical_index(pdf_file, chunks)
+    return search_documents(index, chunks, question, top_k=top_k, lexical=lexical)
+
+
+# 후보를 넉넉히 검색한 뒤 재정렬·중복 제거·토큰 예산 적용 → {"docs", "context", "tokens", "candidates"}
+def retrieve_context(question, pdf_file=None, filters=None, candidates=CANDIDATE_K):
+    return assemble_context(question, retrieve(question, pdf_file, filters, top_k=candidates))
+
+
+# RAG 체인 정의
+def rag_chain(pdf_file, question):
+    context = retrieve_context(question, pdf_file)
+    return chat.complete(chat.build_messages(question, context["context"]))
+
+
+# 매뉴얼 라이브러리(여러 매뉴얼) 대상 RAG 체인 (필터: line, equipment_id, version, language)
+def corpus_rag_chain(question, **filters):
+    context = retrieve_context(question, filters=filters)
+    return chat.complete(chat.build_messages(question, context["context"]))
+
+
+# 검색된 청크를 문맥으로 LLM 답변 생성 (토큰 예산 안으로 정리해서 사용)
+def answer_with_context(question, relevant_docs):
+    context = assemble_context(question, relevant_docs)
+    return chat.complete(chat.build_messages(question, context["context"]))
+
+
+# 스트리밍 RAG 체인: 문맥(근거 청크·토큰 수)을 먼저 돌려주고, 답변은 토큰 단위 스트림(TimedStream)으로 반환
+def stream_rag_chain(question, pdf_file=None, filters=None):
+    started = time.perf_counter()
+    context = retrieve_context(question, pdf_file, filters)
+    messages = chat.build_messages(question, context["context"])
+    return context, chat.TimedStream(chat.stream(messages), started=started)
+
+
+# 매뉴얼 라이브러리 (프로세스당 하나를 모든 세션·요청이 공유)
+def get_corpus():
+    global _corpus
+    with _singleton_lock:
+        if _corpus is None:
+            _corpus = CorpusIndex()
+        return _corpus
+
+
+# 반복·유사 질문 답변 캐시 (프로세스당 하나를 모든 세션·요청이 공유)
+def get_answer_cache():
+    global _answer_cache
+    with _singleton_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
+
+
+# 답변 캐시의 매뉴얼 키
+def answer_cache_key(pdf_file=None, filters=None):
+    if pdf_file is not None:
+        return index_cache.cache_key(index_cache.file_hash(pdf_file), _index_variant())
+    return get_corpus().signature(**(filters or {}))
+
+
+# 질문 임베딩을 처음 필요할 때 한 번만 계산 (답변 캐시 조회·저장에서 함께 사용)
+class QuestionEmbedding:
+    def __init__(self, question):
+        self.question = question
+        self.vector = None
+
+    def __call__(self):
+        if self.vector is None:
+            self.vector = get_openai_embeddings([self.question])[0]
+        return self.vector
+
+
+# 답변 캐시를 거쳐 질문에 답하기 → {"answer", "sources", "cached", "elapsed_ms", "context_tokens"}
+# 캐시 키의 매뉴얼 부분은 PDF 내용 해시(라이브러리는 매뉴얼 구성 지문)라 매뉴얼이 바뀌면 자동으로 무효화
+def answer_question(question, pdf_file=None, filters=None):
+    started = time.perf_counter()
+    cache = get_answer_cache()
+    filters = filters or {}
+    manual_key = answer_cache_key(pdf_file, filters)
+
+    # 정확히 같은 질문이 캐시에 없을 때만 질문을 임베딩
+    embed = QuestionEmbedding(question)
+    hit = cache.get(manual_key, question, embed)
+    if hit is not None:
+        answer, sources, tokens, cached = hit["answer"], hit.get("sources", []), hit.get("context_tokens"), True
+    else:
+        context = retrieve_context(question, pdf_file, filters)
+        answer = chat.complete(chat.build_messages(question, context["context"]))
+        sources, tokens, cached = context["docs"], context["tokens"], False
+        cache.put(manual_key, question, answer, embed(), sources=sources, context_tokens=tokens)
+    return {"answer": answer, "sources": sources, "cached": cached, "context_tokens": tokens,
+            "elapsed_ms": (time.perf_counter() - started) * 1000, "ttft_ms": None}
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+# 센서 로그 생성 설정
+START_TIME = pd.Timestamp("2024-11-01 00:00:00")
+BLOCK_ROWS = 65_536  # 난수 블록 크기 (블록마다 시드가 정해져 있어 배치 크기와 무관하게 같은 결과)
+ALERT_THRESHOLD = 80.0  # 온도(센서값1)가 이 값 이상이면 ALERT / 이상 여부 1
+JOB_ROWS = 2000  # 작업ID가 바뀌는 행 수
+NUM_OPERATORS = 3
+
+# 센서 이름 → (최소, 최대) 정상 범위
+PATTERN_SENSORS = {
+    "온도": (20.0, 100.0),
+    "진동": (0.0, 1.0),
+    "압력": (0.0, 50.0),
+    "유량": (0.0, 5.0),
+    "전력": (0.0, 500.0),
+}
+LOG_SENSORS = {
+    "센서값1": (20.0, 100.0),  # 예: 온도
+    "센서값2": (0.0, 1.0),  # 예: 진동
+}
+FAULT_KINDS = ("spike", "ramp", "stuck")
+
+
+def equipment_ids(n_equipment):
+    return [f"EQP{i + 1:03d}" for i in range(n_equipment)]
+
+
+# 블록 하나에 설비별 고장 구간 주입 (구간 수만큼만 반복, 행 단위 반복 없음)
+# spike: 정상 범위 위로 튐 / ramp: 구간 동안 서서히 상승 / stuck: 구간 시작 값에 고정
+def _inject_faults(rng, values, ranges, equipment, n_equipment, seconds, fault_rate, fault_seconds):
+    sensor_names = list(ranges)
+    span = float(seconds[-1] - seconds[0] + 1) if len(seconds) else 0.0
+    n_faults = rng.poisson(fault_rate * n_equipment * span / 3600)
+    for _ in range(n_faults):
+        eqp = rng.integers(n_equipment)
+        start = seconds[0] + rng.uniform(0, span)
+        length = fault_seconds * rng.uniform(0.5, 1.5)
+        sensor = sensor_names[rng.integers(len(sensor_names))]
+        kind = FAULT_KINDS[rng.integers(len(FAULT_KINDS))]
+        lo, hi = np.searchsorted(seconds, [start, start + length])
+        rows = lo + np.flatnonzero(equipment[lo:hi] == eqp)
+        if not len(rows):
+            continue
+        low, high = ranges[sensor]
+        column = values[sensor]
+        if kind == "spike":
+            column[rows] = high + (high - low) * rng.uniform(0.05, 0.3, size=len(rows))
+        elif kind == "ramp":
+            progress = (seconds[rows] - start) / length
+            column[rows] = column[rows] + progress * (high - low) * 0.6
+        else:
+            column[rows] = column[rows[0]]
+
+
+# 블록 하나 생성 (block: 블록 번호, rows: 이 블록의 행 수)
+def _make_block(block, rows, n_equipment, sensors, start, freq_seconds, total_seconds, seed, drift,
+                fault_rate, fault_seconds, schema, job_ids):
+    rng = np.random.default_rng([seed, block])
+    first = block * BLOCK_ROWS
+    index = np.arange(first, first + rows, dtype=np.int64)
+    seconds = index * freq_seconds
+    equipment = rng.integers(0, n_equipment, size=rows)
+
+    values = {}
+    for name, (low, high) in sensors.items():
+        values[name] = rng.uniform(low, high, size=rows)
+    if drift:
+        # 설비마다 방향이 다른 선형 드리프트 (전체 기간 동안 범위의 drift 비율만큼)
+        direction = np.random.default_rng([seed, 2 ** 31]).choice([-1.0, 1.0], size=n_equipment)
+        for name, (low, high) in sensors.items():
+            values[name] += direction[equipment] * drift * (high - low) * (seconds / max(total_seconds, 1))
+    if fault_rate:
+        _inject_faults(rng, values, sensors, equipment, n_equipment, seconds, fault_rate, fault_seconds)
+
+    primary = values[next(iter(sensors))]
+    alert = primary >= ALERT_THRESHOLD
+    ids = equipment_ids(n_equipment)
+    frame = {
+        "설비ID": pd.Categorical.from_codes(equipment, categories=ids),
+        "시간": start + pd.to_timedelta(seconds, unit="s"),
+        **values,
+        "상태코드": pd.Categorical.from_codes(alert.astype(np.int8), categories=["NORMAL", "ALERT"]),
+        "이상 여부": alert.astype(np.int64),
+    }
+    if schema == "log":
+        frame["주기"] = np.ones(rows, dtype=np.int64)
+        frame["작업ID"] = pd.Categorical.from_codes(index // JOB_ROWS, categories=job_ids)
+        frame["운영자"] = pd.Categorical.from_codes(
+            index % NUM_OPERATORS, categories=[f"operator_{k + 1:02d}" for k in range(NUM_OPERATORS)]
+        )
+    return pd.DataFrame(frame)
+
+
+# 센서 로그를 배치(DataFrame) 단위로 생성
+# - schema="pattern": 이상 패턴 분석 탭 컬럼 (설비ID, 시간, 온도, 진동, 압력, 유량, 전력, 상태코드, 이상 여부)
+# - schema="log": mock_equipment_data.csv 컬럼 (설비ID, 시간, 센서값1, 센서값2, 상태코드, 이상 여부, 주기, 작업ID, 운영자)
+# - 같은 seed면 batch_size와 상관없이 같은 데이터 (배치는 BLOCK_ROWS 단위로 맞춤)
+# - drift: 전체 기간 동안 센서 기준값이 움직이는 비율, fault_rate: 설비·시간당 고장 구간 수
+def generate_batches(n_records=10_000, n_equipment=5, sensors=None, start=START_TIME, freq_seconds=1, seed=42,
+                     drift=0.0, fault_rate=0.0, fault_seconds=300, schema="pattern", batch_size=1_048_576):
+    if schema not in ("pattern", "log"):
+        raise ValueError(f"unknown schema: {schema}")
+    sensors = sensors or (LOG_SENSORS if schema == "log" else PATTERN_SENSORS)
+    start = pd.Timestamp(start)
+    blocks_per_batch = max(1, -(-batch_size // BLOCK_ROWS))
+    n_blocks = -(-n_records // BLOCK_ROWS)
+    total_seconds = n_records * freq_seconds
+    # 범주 사전은 전체 데이터에 하나 (배치끼리 같아야 Arrow/Parquet 스키마가 일치)
+    job_ids = pd.Index([f"JOB{j + 1:05d}" for j in range(-(-n_records // JOB_ROWS))]) if schema == "log" else None
+    for first_block in range(0, n_blocks, blocks_per_batch):
+        frames = []
+        for block in range(first_block, min(first_block + blocks_per_batch, n_blocks)):
+            rows = min(BLOCK_ROWS, n_records - block * BLOCK_ROWS)
+            frames.append(_make_block(block, rows, n_equipment, sensors, start, freq_seconds, total_seconds, seed,
+                                      drift, fault_rate, fault_seconds, schema, job_ids))
+        yield pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+# 한 번에 DataFrame 하나로 (작은 데이터·탭 초기화용)
+def generate_frame(n_records=10_000, **kwargs):
+    batches = list(generate_batches(n_records, **kwargs))
+    if not batches:
+        return pd.DataFrame()
+    return pd.concat(batches, ignore_index=True) if len(batches) > 1 else batches[0]
+
+
+# 배치 단위로 파일에 기록 (메모리에는 배치 하나만 올라감)
+# fmt: "parquet" / "arrow"(IPC 파일) / "csv" (기존 mock_equipment_data.csv와 같은 형식)
+def write_dataset(path, fmt="parquet", **kwargs):
+    rows = 0
+    if fmt == "csv":
+        for i, batch in enumerate(generate_batches(**kwargs)):
+            batch.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False,
+                         encoding="utf-8-sig" if i == 0 else "utf-8")
+            rows += len(batch)
+        return rows
+
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for batch in generate_batches(**kwargs):
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                if fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                elif fmt == "arrow":
+                    writer = pa.ipc.new_file(path, table.schema)
+                else:
+                    raise ValueError(f"unknown format: {fmt}")
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,166 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# 압축 센서 프레임 스키마
+# - 문자열 ID(설비ID, 작업ID, 운영자 …) → 범주형(사전 인코딩, 코드는 가장 작은 정수형)
+# - 센서값 → float32
+# - 상태코드·이상 여부(같은 불리언의 중복) → 비트 플래그 열 하나 (uint8, FLAG_* 비트)
+# - 시간 → int64 epoch 밀리초 (Vega-Lite의 시간형 축이 그대로 읽는 단위)
+TIME_COLUMN = "시간"
+FLAGS_COLUMN = "플래그"
+FLAG_ALERT = 1  # 상태코드 ALERT / 이상 여부 1
+FLAG_SOURCE_COLUMNS = ["상태코드", "이상 여부"]
+STATUS_NORMAL, STATUS_ALERT = "NORMAL", "ALERT"
+
+
+def _smallest_int(low, high):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+# Arrow 테이블 → 압축 스키마 Arrow 테이블 (열 단위 변환, 파이썬 객체 문자열을 만들지 않음)
+def compact_table(table):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns, names = [], []
+    alert = None
+    for name in table.column_names:
+        column = table[name]
+        kind = column.type
+        if name == "이상 여부":
+            alert = pc.not_equal(column, 0)
+            continue
+        if name == "상태코드":
+            if alert is None and "이상 여부" not in table.column_names:
+                alert = pc.equal(column.cast(pa.string()), STATUS_ALERT)
+            continue
+        if name == TIME_COLUMN and pa.types.is_timestamp(kind):
+            column = column.cast(pa.timestamp("ms")).cast(pa.int64())
+        elif pa.types.is_floating(kind):
+            column = column.cast(pa.float32())
+        elif pa.types.is_string(kind) or pa.types.is_large_string(kind) or pa.types.is_dictionary(kind):
+            if not pa.types.is_dictionary(kind):
+                column = column.dictionary_encode()
+            column = column.unify_dictionaries() if column.num_chunks > 1 else column
+            size = len(column.chunk(0).dictionary) if column.num_chunks else 0
+            index_type = pa.from_numpy_dtype(_smallest_int(0, max(size - 1, 0)))
+            column = column.cast(pa.dictionary(index_type, pa.string()))
+        elif pa.types.is_integer(kind) and len(column):
+            bounds = pc.min_max(column)
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if low is not None:
+                column = column.cast(pa.from_numpy_dtype(_smallest_int(low, high)))
+        columns.append(column)
+        names.append(name)
+    if alert is not None:
+        flags = pc.if_else(alert, pa.scalar(FLAG_ALERT, pa.uint8()), pa.scalar(0, pa.uint8()))
+        columns.append(flags)
+        names.append(FLAGS_COLUMN)
+    return pa.table(columns, names=names)
+
+
+def _to_pandas(table):
+    # split_blocks + self_destruct: 변환하면서 Arrow 버퍼를 풀어 최대 메모리를 줄임
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+# 이미 메모리에 있는 DataFrame(생성기 출력 등)을 압축 스키마로
+def compact_frame(frame):
+    import pyarrow as pa
+
+    return _to_pandas(compact_table(pa.Table.from_pandas(frame, preserve_index=False)))
+
+
+# 센서 로그 파일 → 압축 프레임 (.csv / .parquet / .arrow·.feather)
+# CSV도 Arrow CSV 리더로 바로 사전 인코딩해 읽으므로 중간에 object 문자열 프레임이 생기지 않음
+def read_compact(path):
+    import pyarrow as pa
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        import pyarrow.csv as pv
+        table = pv.read_csv(
+            path,
+            convert_options=pv.ConvertOptions(
+                column_types={TIME_COLUMN: pa.timestamp("ms")},
+                auto_dict_encode=True,
+                auto_dict_max_cardinality=1 << 20,
+            ),
+        )
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, memory_map=True)
+    elif ext in (".arrow", ".feather"):
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        raise ValueError(f"지원하지 않는 센서 데이터 형식: {path}")
+    return _to_pandas(compact_table(table))
+
+
+# 플래그 열에서 이상 여부 (불리언 배열)
+def is_alert(frame):
+    return (frame[FLAGS_COLUMN].to_numpy() & FLAG_ALERT) != 0
+
+
+# 화면 표시용: 시간 열을 datetime으로, 플래그를 상태코드·이상 여부로 되돌림 (보여 줄 일부 행에만 사용)
+def expand_frame(frame):
+    frame = frame.copy(deep=False)
+    if TIME_COLUMN in frame and pd.api.types.is_integer_dtype(frame[TIME_COLUMN]):
+        frame[TIME_COLUMN] = pd.to_datetime(frame[TIME_COLUMN], unit="ms")
+    if FLAGS_COLUMN in frame:
+        alert = is_alert(frame)
+        frame["상태코드"] = np.where(alert, STATUS_ALERT, STATUS_NORMAL)
+        frame["이상 여부"] = alert.astype(np.int64)
+        frame = frame.drop(columns=FLAGS_COLUMN)
+    return frame
+
+
+# 열별 메모리 절감 보고 (legacy: 기존 방식 프레임, compact: 압축 프레임)
+# 플래그 열은 상태코드+이상 여부 두 열과 비교
+def memory_report(legacy, compact):
+    before = legacy.memory_usage(index=False, deep=True)
+    after = compact.memory_usage(index=False, deep=True)
+    rows = []
+    for name in compact.columns:
+        sources = [c for c in FLAG_SOURCE_COLUMNS if c in before] if name == FLAGS_COLUMN else [name]
+        if not sources or any(c not in before for c in sources):
+            continue
+        rows.append({
+            "열": "+".join(sources) if name == FLAGS_COLUMN else name,
+            "기존 형식": str(legacy[sources[0]].dtype) if len(sources) == 1 else "object+int64",
+            "압축 형식": str(compact[name].dtype),
+            "기존 바이트": int(sum(before[c] for c in sources)),
+            "압축 바이트": int(after[name]),
+        })
+    report = pd.DataFrame(rows)
+    total = {"열": "합계", "기존 형식": "", "압축 형식": "",
+             "기존 바이트": int(before.sum()), "압축 바이트": int(after.sum())}
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report["절감률(%)"] = (100 * (1 - report["압축 바이트"] / report["기존 바이트"])).round(1)
+    return report
+
+
+# 기존 방식(pandas 기본 CSV 읽기)으로 읽은 프레임 (보고서 비교용)
+def read_legacy(path):
+    return pd.read_csv(path, encoding="utf-8-sig", parse_dates=[TIME_COLUMN])
+
+
+# 실행 예: python -m services.sensor_frame mock_equipment_data.csv
+def main():
+    parser = argparse.ArgumentParser(description="센서 로그 압축 프레임 메모리 보고")
+    parser.add_argument("path", nargs="?", default="mock_equipment_data.csv")
+    args = parser.parse_args()
+    report = memory_report(read_legacy(args.path), read_compact(args.path))
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
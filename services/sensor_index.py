@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from services.sensor_frame import TIME_COLUMN
+
+EQUIPMENT_COLUMN = "설비ID"
+
+
+# 설비별 파티션 + 시간 색인
+# - 불러올 때 한 번 (설비, 시간) 순으로 정렬하고 설비마다 [시작, 끝) 행 범위를 기록
+# - "설비 X · 센서 Y · 시간 구간 Z" 조회는 설비 범위 안에서 시간 열을 이진 탐색해 iloc 슬라이스(복사 없음)로 답함
+# - 조회 비용은 O(log 설비 행 수) + 결과 행 수로, 설비·기간이 늘어도 거의 그대로
+class PartitionIndex:
+    def __init__(self, frame):
+        equipment = frame[EQUIPMENT_COLUMN]
+        if not isinstance(equipment.dtype, pd.CategoricalDtype):
+            equipment = equipment.astype("category")
+        codes = equipment.cat.codes.to_numpy()
+        times = frame[TIME_COLUMN].to_numpy()
+        if len(times) < 2 or (times[1:] >= times[:-1]).all():
+            order = np.argsort(codes, kind="stable")  # 이미 시간순이면 설비 코드로만 안정 정렬
+        else:
+            order = np.lexsort((times, codes))
+        if (order == np.arange(len(order))).all():
+            self.frame = frame
+        else:
+            self.frame = frame.take(order).reset_index(drop=True)
+        self.names = list(equipment.cat.categories)
+        sorted_codes = codes[order]
+        self.offsets = np.searchsorted(sorted_codes, np.arange(len(self.names) + 1), side="left")
+        self.times = self.frame[TIME_COLUMN].to_numpy()
+        self._position = {name: i for i, name in enumerate(self.names)}
+
+    # 행이 있는 설비 목록 (이름순)
+    def equipment(self):
+        return sorted(name for i, name in enumerate(self.names) if self.offsets[i + 1] > self.offsets[i])
+
+    def _bounds(self, equipment):
+        i = self._position.get(equipment)
+        if i is None:
+            return 0, 0
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def rows(self, equipment):
+        lo, hi = self._bounds(equipment)
+        return hi - lo
+
+    # 설비의 (첫 시간, 마지막 시간) — 행이 없으면 None
+    def time_range(self, equipment):
+        lo, hi = self._bounds(equipment)
+        if lo == hi:
+            return None
+        return int(self.times[lo]), int(self.times[hi - 1])
+
+    # 설비의 [start, end] 시간 구간 행 위치 (양 끝 포함, None이면 열린 구간)
+    def locate(self, equipment, start=None, end=None):
+        lo, hi = self._bounds(equipment)
+        times = self.times[lo:hi]
+        first = lo + (np.searchsorted(times, start, side="left") if start is not None else 0)
+        last = lo + (np.searchsorted(times, end, side="right") if end is not None else len(times))
+        return int(first), int(last)
+
+    # 설비·시간 구간 조회 (columns를 주면 그 열만)
+    def slice(self, equipment, start=None, end=None, columns=None):
+        first, last = self.locate(equipment, start, end)
+        frame = self.frame if columns is None else self.frame[columns]
+        return frame.iloc[first:last]
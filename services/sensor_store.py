@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import time
+
+from services.sensor_data import PATTERN_SENSORS, generate_frame
+from services.sensor_frame import compact_frame, read_compact
+from services.sensor_index import PartitionIndex
+
+# 공유 센서 데이터 설정 (환경 변수로 조정 가능)
+# 파일을 지정하지 않으면 기존 패턴 분석 탭과 같은 목업 데이터(온도·진동·압력·유량·전력)를 생성해 씀
+# (mock_equipment_data.csv는 센서값1/센서값2만 있는 로그 형식이라 기본값으로 쓰지 않음)
+SENSOR_DATA_PATH = os.getenv("MANUPILOT_SENSOR_DATA", "")
+RELOAD_CHECK_SECONDS = float(os.getenv("MANUPILOT_SENSOR_RELOAD_SECONDS", "2"))  # 파일 변경 확인 간격
+
+logger = logging.getLogger(__name__)
+
+
+# 프로세스 전체가 공유하는 읽기 전용 센서 데이터
+# - 파일은 프로세스당 한 번만 압축 스키마(services.sensor_frame)로 읽고, 세션에는 얕은 복사(데이터 공유, Copy-on-Write)만 넘김
+# - 읽은 뒤 설비·시간 순으로 정렬해 설비별 파티션 색인(services.sensor_index)을 함께 만듦
+# - 파일 수정 시각·크기가 바뀌면 다음 조회 때 다시 읽음 (확인은 RELOAD_CHECK_SECONDS마다 한 번)
+# - 파일을 지정하지 않았으면 고정 시드 목업 데이터(패턴 스키마)를 한 번 생성해 공유
+# - 지정한 파일이 없거나 읽지 못하면(쓰는 중·손상) 경고를 남기고 마지막으로 읽은 데이터를 계속 씀
+#   (처음부터 읽지 못하면 예외를 그대로 올림)
+class SharedSensorData:
+    def __init__(self, path=SENSOR_DATA_PATH, check_seconds=RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.frame = None
+        self.index = None
+        self.version = 0
+        self.loaded_at = None
+        self.load_seconds = 0.0
+        self.error = None  # 마지막 다시 읽기 실패 내용 (성공하면 None)
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, stamp):
+        started = time.perf_counter()
+        if not self.path:
+            frame = compact_frame(generate_frame(10000, n_equipment=5, seed=42, schema="pattern"))
+        elif stamp is None:
+            raise FileNotFoundError(f"센서 데이터 파일이 없습니다: {self.path}")
+        else:
+            frame = read_compact(self.path)
+        self.index = PartitionIndex(frame)
+        self.frame = self.index.frame
+        self._stamp = stamp
+        self.version += 1
+        self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - started
+        self.error = None
+
+    # 파일이 바뀌었으면 다시 읽음 (잠금을 잡은 상태에서 호출)
+    def _refresh(self):
+        now = time.monotonic()
+        if self.frame is None or now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            stamp = self._file_stamp()
+            if self.frame is None or stamp != self._stamp:
+                try:
+                    self._load(stamp)
+                except (OSError, ValueError, KeyError) as e:
+                    if self.frame is None:
+                        raise
+                    # 같은 상태의 파일은 다시 시도하지 않음 (다 쓰이거나 고쳐져 수정 시각·크기가 바뀌면 다시 읽음)
+                    logger.warning("센서 데이터를 다시 읽지 못해 이전 데이터를 씁니다: %s (%s)", self.path, e)
+                    self._stamp = stamp
+                    self.error = str(e)
+
+    # 최신 데이터 (필요하면 다시 읽음)
+    def current(self):
+        with self._lock:
+            self._refresh()
+            return self.frame
+
+    # 최신 데이터의 설비별 파티션 색인 (색인의 frame이 current()와 같은 정렬된 데이터)
+    def partitions(self):
+        with self._lock:
+            self._refresh()
+            return self.index
+
+    # 세션용 뷰: 열 데이터는 복사하지 않고 공유, 세션에서 값을 바꾸면 그 세션 쪽만 복사됨
+    def view(self):
+        return self.current().copy(deep=False)
+
+    # 기본 센서(온도·진동·압력·유량·전력) 중 현재 데이터에 없는 것
+    def missing_sensors(self):
+        columns = set(self.current().columns)
+        return [name for name in PATTERN_SENSORS if name not in columns]
+
+    # 메모리 사용량 (열별 바이트, 문자열·범주 사전 포함)
+    def memory_usage(self):
+        frame = self.current()
+        per_column = frame.memory_usage(index=True, deep=True)
+        return {
+            "rows": len(frame),
+            "bytes": int(per_column.sum()),
+            "columns": {str(name): int(size) for name, size in per_column.items()},
+            "version": self.version,
+            "source": self.path or "generated",
+            "load_seconds": self.load_seconds,
+        }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+# 센서 데이터 (프로세스당 하나를 모든 세션이 공유)
+def get_sensor_data():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedSensorData()
+        return _shared
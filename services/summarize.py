@@ -0,0 +1,155 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services import chat
+from services.chunking import iter_chunks
+from services.extraction import iter_pages_in_order
+from services.index_cache import CACHE_DIR
+
+# 요약 설정 (환경 변수로 조정 가능)
+SUMMARY_DB = os.path.join(CACHE_DIR, "summaries.sqlite3")
+SUMMARY_CONCURRENCY = int(os.getenv("MANUPILOT_SUMMARY_CONCURRENCY", "4"))
+SECTION_PAGES = 10  # 섹션 요약 단위 (페이지 범위가 고정이라 수정된 페이지의 섹션만 다시 요약)
+REDUCE_FAN_IN = 8  # 상위 단계에서 한 번에 합치는 요약 수
+CHUNK_SUMMARY_TOKENS = 200
+SECTION_SUMMARY_TOKENS = 400
+CARD_TOKENS = 800
+
+# 프롬프트가 바뀌면 올려서 기존 요약 캐시를 무효화
+PROMPT_VERSION = "v1"
+CHUNK_PROMPT = (
+    "다음은 제조 설비 매뉴얼의 일부입니다. 작업 절차, 안전 수칙, 오류 코드와 조치 방법을 빠짐없이 "
+    "3~5줄로 요약하세요. 페이지 표시는 그대로 유지하세요."
+)
+SECTION_PROMPT = (
+    "다음은 매뉴얼 여러 부분의 요약입니다. 중복을 합쳐 하나의 섹션 요약으로 정리하세요. "
+    "절차·안전 수칙·오류 코드는 빠뜨리지 말고 페이지 표시를 유지하세요."
+)
+CARD_PROMPT = (
+    "다음은 매뉴얼 섹션별 요약입니다. 아래 형식의 요약 카드로 정리하세요.\n"
+    "## 핵심 절차\n- ...\n## 안전 수칙\n- ...\n## FAQ\n- Q: ... / A: ...\n"
+    "각 항목 끝에 근거 페이지를 (p.N) 형식으로 표시하세요."
+)
+
+
+# 요약 캐시 (키: 프롬프트 버전 + 모델 + 입력 텍스트 해시)
+class SummaryCache:
+    def __init__(self, path=SUMMARY_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        self._connect().commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute("SELECT text FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, text):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO summaries (key, text) VALUES (?, ?)", (key, text))
+
+
+def summary_key(level, text, model=chat.CHAT_MODEL):
+    return hashlib.sha256(f"{PROMPT_VERSION}\x00{model}\x00{level}\x00{text}".encode("utf-8")).hexdigest()
+
+
+# 계층형(map-reduce) 매뉴얼 요약기
+# 1) 페이지별 청크 요약 (동시 실행 수 제한, 청크 해시로 캐시)
+# 2) 고정 페이지 범위별 섹션 요약 → 3) REDUCE_FAN_IN개씩 단계적으로 합쳐 문서 요약 카드
+class Summarizer:
+    def __init__(self, cache=None, complete=None, max_workers=SUMMARY_CONCURRENCY):
+        self.cache = cache or SummaryCache()
+        self.complete = complete or chat.complete
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+
+    # stats: 호출마다 따로 만든 집계 (여러 세션이 같은 요약기를 공유해도 서로 덮어쓰지 않음)
+    def _summarize(self, level, prompt, text, max_tokens, stats):
+        key = summary_key(level, text)
+        cached = self.cache.get(key)
+        with self._stats_lock:
+            stats["cached" if cached is not None else "generated"] += 1
+        if cached is not None:
+            return cached
+        messages = [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text},
+        ]
+        summary = self.complete(messages, max_tokens=max_tokens)
+        self.cache.put(key, summary)
+        return summary
+
+    def _map(self, level, prompt, texts, max_tokens, stats):
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            return list(pool.map(lambda text: self._summarize(level, prompt, text, max_tokens, stats), texts))
+
+    # 페이지마다 따로 청크를 나눔 → 한 페이지를 고쳐도 다른 페이지의 청크(와 캐시 키)는 그대로
+    @staticmethod
+    def page_chunks(pdf_file):
+        for page_no, page_text in iter_pages_in_order(pdf_file):
+            for chunk in iter_chunks([(page_no, page_text)]):
+                yield chunk
+
+    def summarize_pdf(self, pdf_file):
+        return self.summarize_chunks(list(self.page_chunks(pdf_file)))
+
+    # 반환: {"card", "sections": [{"pages", "summary"}], "stats": {"chunks", "generated", "cached"}}
+    def summarize_chunks(self, chunks):
+        stats = {"generated": 0, "cached": 0}
+        if not chunks:
+            return {"card": "", "sections": [], "stats": {"chunks": 0, **stats}}
+
+        texts = [f"[p.{c['page']}] {c['text']}" for c in chunks]
+        chunk_summaries = self._map("chunk", CHUNK_PROMPT, texts, CHUNK_SUMMARY_TOKENS, stats)
+
+        # 고정 페이지 범위로 섹션 묶기
+        groups = {}
+        for chunk, summary in zip(chunks, chunk_summaries):
+            groups.setdefault((chunk["page"] - 1) // SECTION_PAGES, []).append(summary)
+        section_ids = sorted(groups)
+        section_texts = ["\n".join(groups[s]) for s in section_ids]
+        section_summaries = self._map("section", SECTION_PROMPT, section_texts, SECTION_SUMMARY_TOKENS, stats)
+        sections = [
+            {"pages": (s * SECTION_PAGES + 1, (s + 1) * SECTION_PAGES), "summary": summary}
+            for s, summary in zip(section_ids, section_summaries)
+        ]
+
+        # 섹션 요약이 많으면 단계적으로 합침
+        level, summaries = 0, section_summaries
+        while len(summaries) > REDUCE_FAN_IN:
+            level += 1
+            batches = ["\n\n".join(summaries[i:i + REDUCE_FAN_IN]) for i in range(0, len(summaries), REDUCE_FAN_IN)]
+            summaries = self._map(f"reduce-{level}", SECTION_PROMPT, batches, SECTION_SUMMARY_TOKENS, stats)
+
+        card = self._summarize("card", CARD_PROMPT, "\n\n".join(summaries), CARD_TOKENS, stats)
+        return {"card": card, "sections": sections, "stats": {"chunks": len(chunks), **stats}}
+
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+
+def get_summarizer():
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            _summarizer = Summarizer()
+        return _summarizer
+
+
+# 매뉴얼 요약 카드 생성 (바뀌지 않은 청크·섹션은 캐시된 요약을 재사용)
+def summarize_manual(pdf_file):
+    return get_summarizer().summarize_pdf(pdf_file)
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from services.categories import CategoryWorker
+from services.index_cache import CACHE_DIR
+from services.lexical import tokenize, fts_search_query
+from services.near_duplicate import DuplicateIndex
+
+# 게시판 저장소 설정 (환경 변수로 조정 가능)
+WIKI_DB = os.getenv("MANUPILOT_WIKI_DB", os.path.join(CACHE_DIR, "wiki.sqlite3"))
+PAGE_SIZE = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    signature BLOB,
+    similar TEXT,
+    category INTEGER
+);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (entry_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_entry_tags_posting ON entry_tags(tag, entry_id);
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tag_counts_count ON tag_counts(count DESC);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS category_removals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category INTEGER NOT NULL,
+    tags TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_author ON entries(author);
+CREATE INDEX IF NOT EXISTS idx_entries_category ON entries(category, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS wiki_fts USING fts5(tokens, author, tags);
+"""
+
+
+# 작성자·태그를 FTS 토큰 하나로 (공백·기호가 있어도 정확히 일치하는 값만 걸리도록 해시)
+def _facet_token(prefix, value):
+    return prefix + hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+
+def _facet_query(column, prefix, values, mode="any"):
+    joiner = " AND " if mode == "all" else " OR "
+    return f"{column}:({joiner.join(_facet_token(prefix, v) for v in values)})"
+
+
+# 협업 게시판 저장소
+# - 본문·태그는 SQLite에, 검색용 토큰(한글 2-gram)·작성자·태그는 FTS5 색인에 함께 저장
+# - 유사 항목 색인(MinHash/LSH)은 서명을 DB에 두고 프로세스마다 메모리에 올림
+# - 세션·프로세스가 여러 개여도 WAL 모드에서 동시에 쓰기 가능
+# - 저장 후 subscribe로 등록한 함수(예: 자동 분류 작업자)에 새 항목을 넘김
+class WikiStore:
+    def __init__(self, path=WIKI_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db_path = path
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self.duplicates = DuplicateIndex()
+        self._synced_id = 0
+        self._listeners = []
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._sync_duplicates()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # 다른 세션·프로세스가 추가한 항목의 서명을 유사 항목 색인에 반영
+    def _sync_duplicates(self):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, signature FROM entries WHERE id > ? AND signature IS NOT NULL ORDER BY id",
+                (self._synced_id,),
+            ).fetchall()
+            for row in rows:
+                self.duplicates.add(row["id"], signature=np.frombuffer(row["signature"], dtype=np.uint32))
+                self._synced_id = row["id"]
+
+    def _row_to_entry(self, row, tags):
+        return {
+            "id": row["id"],
+            "author": row["author"],
+            "tags": tags,
+            "content": row["content"],
+            "created_at": row["created_at"],
+            "version": row["version"],
+            "similar": [tuple(pair) for pair in json.loads(row["similar"] or "[]")],
+            "category": row["category"],
+        }
+
+    def _tags_for(self, ids):
+        tags = {entry_id: [] for entry_id in ids}
+        if ids:
+            sql = f"SELECT entry_id, tag FROM entry_tags WHERE entry_id IN ({', '.join('?' * len(ids))}) ORDER BY rowid"
+            for row in self._connect().execute(sql, ids):
+                tags[row["entry_id"]].append(row["tag"])
+        return tags
+
+    def _fetch(self, ids):
+        if not ids:
+            return []
+        sql = f"SELECT * FROM entries WHERE id IN ({', '.join('?' * len(ids))})"
+        rows = {row["id"]: row for row in self._connect().execute(sql, ids)}
+        tags = self._tags_for([i for i in ids if i in rows])
+        return [self._row_to_entry(rows[i], tags[i]) for i in ids if i in rows]
+
+    # 항목 저장 → 유사 항목까지 채운 항목 dict 반환
+    def add_entry(self, author, tags, content):
+        tags = list(dict.fromkeys(t.strip() for t in tags if t and t.strip()))
+        signature = self.duplicates.signature(content)
+        self._sync_duplicates()
+        with self._lock:
+            similar = self.duplicates.query(signature=signature)
+            conn = self._connect()
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO entries (author, content, created_at, signature, similar) VALUES (?, ?, ?, ?, ?)",
+                    (author, content, time.time(), signature.tobytes(), json.dumps(similar)),
+                )
+                entry_id = cur.lastrowid
+                conn.executemany("INSERT INTO entry_tags (entry_id, tag) VALUES (?, ?)",
+                                 [(entry_id, tag) for tag in tags])
+                conn.executemany(
+                    "INSERT INTO tag_counts (tag, count) VALUES (?, 1) "
+                    "ON CONFLICT(tag) DO UPDATE SET count = count + 1",
+                    [(tag,) for tag in tags],
+                )
+                conn.execute(
+                    "INSERT INTO wiki_fts (rowid, tokens, author, tags) VALUES (?, ?, ?, ?)",
+                    (entry_id, " ".join(tokenize(f"{author} {content}")),
+                     _facet_token("a", author), " ".join(_facet_token("t", tag) for tag in tags)),
+                )
+            self.duplicates.add(entry_id, signature=signature)
+            self._synced_id = max(self._synced_id, entry_id)
+        entry = self.get(entry_id)
+        for listener in self._listeners:
+            listener(entry)
+        return entry
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def get(self, entry_id):
+        entries = self._fetch([entry_id])
+        return entries[0] if entries else None
+
+    # 주어진 항목들의 유사 항목 쌍 [(먼저 쓴 항목, 나중 항목, 유사도)]
+    # 상대 항목이 검색 결과의 다른 페이지에 있어도 LSH 색인에서 바로 찾음 (같은 쌍은 한 번만)
+    def similar_pairs(self, entry_ids):
+        self._sync_duplicates()
+        pairs = {}
+        for entry_id in entry_ids:
+            for other, similarity in self.duplicates.similar(entry_id):
+                pairs.setdefault((min(entry_id, other), max(entry_id, other)), similarity)
+        entries = {entry["id"]: entry for entry in self._fetch(sorted({i for pair in pairs for i in pair}))}
+        return [(entries[a], entries[b], similarity) for (a, b), similarity in pairs.items()
+                if a in entries and b in entries]
+
+    # 항목 삭제 (분류된 항목이면 자동 분류 모델에서도 빼도록 category_removals에 남김)
+    def delete_entry(self, entry_id):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                tags = [row[0] for row in conn.execute("SELECT tag FROM entry_tags WHERE entry_id = ?", (entry_id,))]
+                conn.executemany("UPDATE tag_counts SET count = count - 1 WHERE tag = ?", [(tag,) for tag in tags])
+                conn.execute("DELETE FROM tag_counts WHERE count <= 0")
+                row = conn.execute("SELECT category, content FROM entries WHERE id = ?", (entry_id,)).fetchone()
+                if row is not None and row["category"] is not None:
+                    conn.execute("UPDATE categories SET count = count - 1 WHERE id = ?", (row["category"],))
+                    conn.execute("INSERT INTO category_removals (category, tags, content) VALUES (?, ?, ?)",
+                                 (row["category"], json.dumps(tags, ensure_ascii=False), row["content"]))
+                conn.execute("DELETE FROM wiki_fts WHERE rowid = ?", (entry_id,))
+                deleted = conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,)).rowcount
+            self.duplicates.remove(entry_id)
+        return bool(deleted)
+
+    # 검색어(순위)·작성자·태그 필터를 모두 FTS 색인 안에서 처리하고 페이지 단위로 반환
+    # (태그 필터만 있으면 태그 게시 목록으로 바로 조회, 2글자 미만 검색어는 본문·작성자 LIKE로 확인)
+    # tag_mode: "any"(태그 중 하나라도) / "all"(모든 태그), category: 자동 분류 카테고리 번호
+    # 반환: {"entries", "total", "page", "page_size"}
+    def search(self, query="", authors=None, tags=None, tag_mode="any", category=None, page=1,
+               page_size=PAGE_SIZE):
+        page = max(1, int(page))
+        offset = (page - 1) * page_size
+        parts = []
+        text_match, like_terms = fts_search_query(query) if query else ("", [])
+        if text_match:
+            parts.append(f"tokens:({text_match})")
+        if authors:
+            parts.append(_facet_query("author", "a", authors))
+        if tags:
+            parts.append(_facet_query("tags", "t", tags, tag_mode))
+
+        # entries 테이블에서 확인할 조건 (카테고리, 짧은 검색어)
+        conditions, condition_params = [], []
+        if category is not None:
+            conditions.append("category = ?")
+            condition_params.append(category)
+        for term in like_terms:  # 한글·영문·숫자 한 글자라 LIKE 특수 문자가 없음
+            conditions.append("(content LIKE ? OR author LIKE ?)")
+            condition_params += [f"%{term}%", f"%{term}%"]
+
+        conn = self._connect()
+        if query and not text_match and not like_terms:
+            return {"entries": [], "total": 0, "page": page, "page_size": page_size}
+        if tags and not query and not authors and category is None:
+            total, ids = self.filter_by_tags(tags, tag_mode, limit=page_size, offset=offset)
+        elif parts:
+            where, params = "wiki_fts MATCH ?", [" AND ".join(parts)]
+            if conditions:
+                where += f" AND rowid IN (SELECT id FROM entries WHERE {' AND '.join(conditions)})"
+                params += condition_params
+            total = conn.execute(f"SELECT COUNT(*) FROM wiki_fts WHERE {where}", params).fetchone()[0]
+            order = "bm25(wiki_fts), rowid DESC" if text_match else "rowid DESC"
+            ids = [row[0] for row in conn.execute(
+                f"SELECT rowid FROM wiki_fts WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                (*params, page_size, offset),
+            )]
+        else:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            total = conn.execute(f"SELECT COUNT(*) FROM entries {where}", condition_params).fetchone()[0]
+            ids = [row[0] for row in conn.execute(
+                f"SELECT id FROM entries {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*condition_params, page_size, offset),
+            )]
+        return {"entries": self._fetch(ids), "total": total, "page": page, "page_size": page_size}
+
+    def authors(self):
+        return [row[0] for row in self._connect().execute("SELECT DISTINCT author FROM entries ORDER BY author")]
+
+    # 태그별 항목 수 {태그: 개수} (저장·삭제할 때 갱신해 둔 집계를 읽기만 함)
+    def tag_counts(self):
+        return {row[0]: row[1] for row in self._connect().execute("SELECT tag, count FROM tag_counts")}
+
+    # 많이 쓰인 태그 상위 n개 [(태그, 개수)]
+    def top_tags(self, n=5):
+        sql = "SELECT tag, count FROM tag_counts ORDER BY count DESC, tag LIMIT ?"
+        return [(row[0], row[1]) for row in self._connect().execute(sql, (n,))]
+
+    # 태그 게시 목록(posting list)으로 AND/OR 필터 → (전체 개수, 최신순 항목 ID 한 페이지)
+    # 비용은 선택한 태그의 목록 길이에 비례 (전체 게시글 수와 무관)
+    def filter_by_tags(self, tags, mode="any", limit=PAGE_SIZE, offset=0):
+        tags = list(dict.fromkeys(tags))
+        conn = self._connect()
+        counts = {tag: 0 for tag in tags}
+        placeholders = ", ".join("?" * len(tags))
+        for row in conn.execute(f"SELECT tag, count FROM tag_counts WHERE tag IN ({placeholders})", tags):
+            counts[row[0]] = row[1]
+
+        if len(tags) == 1:
+            total = counts[tags[0]]
+            sql = "SELECT entry_id FROM entry_tags WHERE tag = ? ORDER BY entry_id DESC LIMIT ? OFFSET ?"
+            return total, [row[0] for row in conn.execute(sql, (tags[0], limit, offset))]
+
+        if mode == "all":
+            if min(counts.values()) == 0:
+                return 0, []
+            # 가장 짧은 목록에서 시작해 나머지 태그 목록에 있는지 확인
+            rarest, *others = sorted(tags, key=counts.get)
+            joins = "".join(
+                f" JOIN entry_tags t{i} ON t{i}.entry_id = t.entry_id AND t{i}.tag = ?" for i in range(len(others))
+            )
+            base = f"FROM entry_tags t{joins} WHERE t.tag = ?"
+            params = [*others, rarest]
+        else:
+            base = f"FROM entry_tags t WHERE t.tag IN ({placeholders})"
+            params = tags
+        total = conn.execute(f"SELECT COUNT(DISTINCT t.entry_id) {base}", params).fetchone()[0]
+        sql = f"SELECT DISTINCT t.entry_id {base} ORDER BY t.entry_id DESC LIMIT ? OFFSET ?"
+        return total, [row[0] for row in conn.execute(sql, [*params, limit, offset])]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # 자동 분류 결과 기록 (카테고리 이름·글 수도 함께 갱신)
+    def set_category(self, entry_id, category, label):
+        conn = self._connect()
+        with conn:
+            previous = conn.execute("SELECT category FROM entries WHERE id = ?", (entry_id,)).fetchone()
+            if previous is None or previous[0] == category:
+                return
+            if previous[0] is not None:
+                conn.execute("UPDATE categories SET count = count - 1 WHERE id = ?", (previous[0],))
+            conn.execute("UPDATE entries SET category = ? WHERE id = ?", (category, entry_id))
+            conn.execute(
+                "INSERT INTO categories (id, label, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(id) DO UPDATE SET label = excluded.label, count = count + 1",
+                (category, label),
+            )
+
+    # 아직 분류되지 않은 항목을 batch개씩 (자동 분류 작업자가 시작할 때 처리)
+    def uncategorized(self, batch=500):
+        last_id = 0
+        while True:
+            ids = [row[0] for row in self._connect().execute(
+                "SELECT id FROM entries WHERE category IS NULL AND id > ? ORDER BY id LIMIT ?", (last_id, batch)
+            )]
+            if not ids:
+                return
+            yield from self._fetch(ids)
+            last_id = ids[-1]
+
+    # 삭제된 분류 항목을 꺼내 목록에서 지움 (자동 분류 모델을 가진 작업자가 모델에서 뺄 때 사용)
+    def take_category_removals(self):
+        conn = self._connect()
+        with conn:
+            rows = conn.execute("SELECT id, category, tags, content FROM category_removals ORDER BY id").fetchall()
+            if rows:
+                conn.execute("DELETE FROM category_removals WHERE id <= ?", (rows[-1]["id"],))
+        return [{"category": row["category"], "tags": json.loads(row["tags"]), "content": row["content"]}
+                for row in rows]
+
+    # [(카테고리 번호, 이름, 글 수)] 글이 많은 순
+    def categories(self):
+        sql = "SELECT id, label, count FROM categories WHERE count > 0 ORDER BY count DESC, id"
+        return [(row[0], row[1], row[2]) for row in self._connect().execute(sql)]
+
+
+_store = None
+_category_worker = None
+_store_lock = threading.Lock()
+
+
+# 게시판 저장소 (프로세스당 하나를 모든 세션이 공유, 자동 분류 작업자도 함께 시작)
+def get_wiki_store():
+    global _store, _category_worker
+    with _store_lock:
+        if _store is None:
+            _store = WikiStore()
+            _category_worker = CategoryWorker(_store)
+            _store.subscribe(_category_worker.submit)
+        return _store
@@ -2,70 +2,99 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
-from datetime import datetime
-
-
-# 목업 데이터 생성
-def create_mock_data():
-    num_records = 10000
-    num_equipment = 5
-    equipment_ids = [f"EQP{i+1:03d}" for i in range(num_equipment)]
-    start_time = pd.Timestamp("2024-11-01 00:00:00")
-
-    np.random.seed(42)
-    data = []
-    for i in range(num_records):
-        equipment_id = np.random.choice(equipment_ids)
-        timestamp = start_time + pd.Timedelta(seconds=i)
-        sensor_values = {
-            "온도": np.random.uniform(20, 100),
-            "진동": np.random.uniform(0, 1),
-            "압력": np.random.uniform(0, 50),
-            "유량": np.random.uniform(0, 5),
-            "전력": np.random.uniform(0, 500),
-        }
-        status_code = "NORMAL" if sensor_values["온도"] < 80 else "ALERT"
-        is_anomaly = 1 if sensor_values["온도"] >= 80 else 0
-        data.append(
-            {
-                "설비ID": equipment_id,
-                "시간": timestamp,
-                **sensor_values,
-                "상태코드": status_code,
-                "이상 여부": is_anomaly,
-            }
-        )
-    return pd.DataFrame(data)
+from datetime import datetime, timedelta
+from services.downsample import CHART_WIDTH, downsample
+from services.sensor_frame import expand_frame
+from services.sensor_store import get_sensor_data
+
+
+DEFAULT_WINDOW_HOURS = 6
+
 
+def _to_datetime(epoch_ms):
+    return pd.Timestamp(epoch_ms, unit="ms").to_pydatetime()
 
-# 세션 상태 초기화
-if "data" not in st.session_state:
-    st.session_state["data"] = create_mock_data()
 
-if "saved_records" not in st.session_state:
-    st.session_state["saved_records"] = []
+def _to_epoch_ms(value):
+    if isinstance(value, (int, float)):
+        return int(value)  # Vega-Lite 시간형 값 (UTC epoch 밀리초)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.value // 1_000_000
+
+
+# 차트 구간 선택 이벤트 → (시작, 끝) epoch 밀리초, 선택이 없으면 None
+def _selection_range(event):
+    try:
+        values = event["selection"]["zoom"]["시간"]
+    except (KeyError, TypeError):
+        return None
+    if not values or len(values) < 2:
+        return None
+    start, end = sorted(_to_epoch_ms(v) for v in values[:2])
+    return (start, end) if end > start else None
 
 
 # Streamlit 앱
 def show_pattern():
     st.header("📊 이상 패턴 분석")
 
-    # --- 안전 장치: 데이터 확인 ---
-    if "data" not in st.session_state:
+    # 세션 상태 초기화 (모듈은 프로세스에서 한 번만 import되므로 세션마다 여기서 확인)
+    if "saved_records" not in st.session_state:
+        st.session_state["saved_records"] = []
+
+    # 공유 센서 데이터 (프로세스당 한 번만 읽고 파일이 바뀌면 다시 읽음)
+    # 설비별로 나뉘어 시간순 정렬된 색인에서 필요한 구간만 슬라이스로 꺼내 씀
+    shared = get_sensor_data()
+    try:
+        index = shared.partitions()
+    except (OSError, ValueError, KeyError) as e:
+        st.error(f"센서 데이터를 읽지 못했습니다: {e}")
+        return
+    if shared.error:
+        st.warning(f"센서 데이터 파일을 다시 읽지 못해 이전 데이터를 표시합니다: {shared.error}")
+    data = index.frame
+    if data.empty:
         st.warning("데이터가 아직 준비되지 않았습니다. 먼저 데이터를 업로드하거나 초기화하세요.")
         return
+    usage = shared.memory_usage()
+    st.caption(
+        f"공유 데이터: {usage['rows']:,}행 · {usage['bytes'] / 1024 ** 2:.1f} MB "
+        f"(원본: {usage['source']}, 버전 {usage['version']})"
+    )
+    missing = shared.missing_sensors()
+    if missing:
+        st.info(f"불러온 데이터에 기본 센서({', '.join(missing)})가 없어 데이터에 있는 센서만 선택할 수 있습니다.")
 
     # 데이터 미리보기
     st.subheader("데이터 미리보기")
-    st.dataframe(st.session_state["data"].head())
+    st.dataframe(expand_frame(data.head()))
 
-    # 설비 ID와 센서 선택
+    # 설비 ID와 센서 선택 (센서는 데이터의 실수형 열)
     st.subheader("설비 및 센서 선택")
-    selected_equipment = st.selectbox("설비 ID", st.session_state["data"]["설비ID"].unique())
-    selected_sensor = st.selectbox("센서값 선택", ["온도", "진동", "압력", "유량", "전력"])
+    sensors = [c for c in data.columns if pd.api.types.is_float_dtype(data[c])]
+    selected_equipment = st.selectbox("설비 ID", index.equipment())
+    selected_sensor = st.selectbox("센서값 선택", sensors)
+
+    # 시간 구간 선택 (기본: 마지막 DEFAULT_WINDOW_HOURS시간)
+    first_ms, last_ms = index.time_range(selected_equipment)
+    start_ms, end_ms = first_ms, last_ms
+    if last_ms > first_ms:
+        first_time, last_time = _to_datetime(first_ms), _to_datetime(last_ms)
+        default_start = max(first_time, last_time - timedelta(hours=DEFAULT_WINDOW_HOURS))
+        window = st.slider(
+            "시간 구간",
+            min_value=first_time,
+            max_value=last_time,
+            value=(default_start, last_time),
+            step=timedelta(seconds=1),
+            format="MM/DD HH:mm:ss",
+        )
+        start_ms, end_ms = _to_epoch_ms(window[0]), _to_epoch_ms(window[1])
 
-    # 선택한 설비와 센서 데이터 필터링
-    filtered_data = st.session_state["data"][st.session_state["data"]["설비ID"] == selected_equipment]
+    # 선택한 설비·센서·시간 구간 데이터 (이진 탐색 슬라이스, 전체 스캔 없음)
+    filtered_data = index.slice(selected_equipment, start_ms, end_ms, columns=["시간", selected_sensor])
 
     # 센서별 색상 지정
     sensor_colors = {
@@ -74,22 +103,53 @@ def show_pattern():
         "압력": "#1f77b4",
         "유량": "#d62728",
         "전력": "#9467bd",
+        "센서값1": "#ff7f0e",
+        "센서값2": "#2ca02c",
     }
 
-    # 시각화
+    # 확대 상태 (차트에서 드래그한 구간, 설비·센서·시간 구간이 바뀌면 초기화)
+    context = (selected_equipment, selected_sensor, start_ms, end_ms)
+    zoom = st.session_state.get("pattern_zoom")
+    if zoom is None or zoom["context"] != context:
+        zoom = {"context": context, "range": None, "level": zoom["level"] + 1 if zoom else 0}
+        st.session_state["pattern_zoom"] = zoom
+    view_data = filtered_data
+    if zoom["range"] is not None:
+        view_data = index.slice(selected_equipment, *zoom["range"], columns=["시간", selected_sensor])
+
+    # 시각화 (차트 폭에 맞춰 최소/최대 버킷으로 줄인 점만 전송, 스파이크는 유지)
     st.subheader(f"{selected_equipment}의 {selected_sensor} 시계열 그래프")
+    chart_data = downsample(view_data, selected_sensor, CHART_WIDTH).copy()
+    chart_data["시각"] = pd.to_datetime(chart_data["시간"], unit="ms").dt.strftime("%Y-%m-%d %H:%M:%S")
+    st.caption(
+        f"표시 {len(chart_data):,}점 / 구간 원본 {len(view_data):,}행"
+        + (" · 확대 중 (차트에서 구간을 드래그하면 더 확대)" if zoom["range"] else " · 차트에서 구간을 드래그하면 확대")
+    )
+    brush = alt.selection_interval(name="zoom", encodings=["x"])
     chart = (
-        alt.Chart(filtered_data)
-        .mark_line(color=sensor_colors[selected_sensor])
+        alt.Chart(chart_data)
+        .mark_line(color=sensor_colors.get(selected_sensor, "#1f77b4"))
         .encode(
-            x="시간:T",
+            x=alt.X("시간:T", title="시간", scale=alt.Scale(type="utc")),
             y=alt.Y(selected_sensor, title=selected_sensor),
-            tooltip=["시간:T", selected_sensor],
+            tooltip=["시각", selected_sensor],
         )
-        .properties(width=800, height=400)
-        .interactive()
+        .properties(width=CHART_WIDTH, height=400)
+        .add_params(brush)
     )
-    st.altair_chart(chart, use_container_width=True)
+    event = st.altair_chart(chart, use_container_width=True, on_select="rerun",
+                            key=f"pattern_chart_{zoom['level']}")
+
+    # 드래그한 구간을 원본 해상도로 다시 조회 (차트 위젯 키를 바꿔 선택 표시는 지움)
+    selected = _selection_range(event)
+    if selected is not None:
+        zoom["range"] = selected
+        zoom["level"] += 1
+        st.rerun()
+    if zoom["range"] is not None and st.button("🔍 확대 초기화"):
+        zoom["range"] = None
+        zoom["level"] += 1
+        st.rerun()
 
     # --- 2. 공정 지원 기능 ---
     st.subheader("유사 불량 패턴 탐색 및 공정 지원")
@@ -100,11 +160,12 @@ def show_pattern():
 
     # 유사 불량 패턴 탐색
     st.subheader("유사 불량 패턴 탐색 결과")
-    if pd.api.types.is_numeric_dtype(st.session_state["data"][selected_sensor]):
+    if pd.api.types.is_numeric_dtype(data[selected_sensor]):
+        # 선택한 시간 구간 안에서만 임계치 비교
         anomalies = filtered_data[filtered_data[selected_sensor] > threshold]
         if not anomalies.empty:
             st.write(f"임계치를 벗어난 구간이 {len(anomalies)}건 발견되었습니다.")
-            st.dataframe(anomalies[["시간", selected_sensor]])
+            st.dataframe(expand_frame(anomalies))
 
             # 이메일 발송 버튼 (실제 발송은 하지 않음)
             if st.button("이상 알림 이메일 발송"):
@@ -1,135 +1,73 @@
 import streamlit as st
-import pdfplumber
-import pytesseract
-from PIL import Image
-import openai
-import os
-import faiss
-import numpy as np
-from dotenv import load_dotenv
+import time
 from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+# 검색 파이프라인 (services/rag.py, 기존 함수 이름 그대로 사용 가능)
+from services.rag import (
+    extract_text_with_ocr, chunk_text, get_openai_embeddings, build_vectorstore, load_vectorstore,
+    search_documents, rag_chain, corpus_rag_chain, stream_rag_chain, get_corpus, get_answer_cache,
+    answer_cache_key, answer_question, QuestionEmbedding,
+)
+from services.backend_client import BackendClient, BackendError, BACKEND_URL
+from services.pdf_export import render_answer_pdf, render_report
+from services.context import page_label
+from services.summarize import summarize_manual
+from services.index_cache import file_hash
 
-# .env 파일 로드
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# 답변 근거(청크와 페이지) 표시
+def show_sources(docs):
+    with st.expander(f"📑 근거 문단 {len(docs)}개", expanded=False):
+        for doc in docs:
+            title = f"{doc['title']} · " if doc.get("title") else ""
+            st.markdown(f"**{title}{page_label(doc)}**")
+            st.caption(doc["text"][:500])
 
-# OCR을 통해 PDF 페이지에서 텍스트 추출
-def extract_text_with_ocr(pdf_file):
-    text = ""
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if not page_text:
-                image = page.to_image().original
-                page_text = pytesseract.image_to_string(Image.fromarray(image), lang='kor')
-            text += page_text
-    return text
+# 스트리밍으로 질문에 답하기: 캐시 확인 → 근거 표시 → 토큰을 받는 대로 출력 → 캐시 저장
+def answer_question_streaming(question, pdf_file=None, filters=None):
+    started = time.perf_counter()
+    cache = get_answer_cache()
+    manual_key = answer_cache_key(pdf_file, filters)
+    embed = QuestionEmbedding(question)  # 정확히 같은 질문이 캐시에 없을 때만 임베딩
+    hit = cache.get(manual_key, question, embed)
+    if hit is not None:
+        return {"answer": hit["answer"], "sources": hit.get("sources", []), "cached": True,
+                "context_tokens": hit.get("context_tokens"),
+                "elapsed_ms": (time.perf_counter() - started) * 1000, "ttft_ms": None}
 
-# 텍스트를 청크로 나누기
-def chunk_text(text, chunk_size=500):
-    words = text.split()
-    chunks = [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size)]
-    return chunks
+    with st.spinner("관련 문단 검색 중..."):
+        context, tokens = stream_rag_chain(question, pdf_file, filters)
+    show_sources(context["docs"])
+    st.write(f"질문: {question}")
+    st.write_stream(tokens)
+    st.caption(f"첫 토큰까지 {tokens.ttft_ms or 0:.0f} ms · 전체 {tokens.total_ms / 1000:.1f}초"
+               f" · 문맥 {context['tokens']} 토큰")
+    cache.put(manual_key, question, tokens.text, embed(), sources=context["docs"], context_tokens=context["tokens"])
+    return {"answer": tokens.text, "sources": context["docs"], "cached": False, "context_tokens": context["tokens"],
+            "elapsed_ms": tokens.total_ms, "ttft_ms": tokens.ttft_ms, "streamed": True}
 
-# OpenAI API를 사용해 텍스트 임베딩 생성
-def get_openai_embeddings(texts):
-    response = openai.Embedding.create(
-        model="text-embedding-ada-002",
-        input=texts
-    )
-    embeddings = [item['embedding'] for item in response['data']]
-    return np.array(embeddings).astype('float32')
+# 백엔드 서비스로 질문하기 (MANUPILOT_BACKEND_URL이 설정된 경우, 탭은 얇은 클라이언트)
+def answer_question_remote(question, pdf_file=None, filters=None):
+    client = BackendClient()
+    if pdf_file is None:
+        return client.ask(question, filters=filters)
+    try:
+        return client.ask(question, pdf_hash=remote_manual(client, pdf_file))
+    except BackendError as e:
+        if e.status != 404:
+            raise
+        # 백엔드가 매뉴얼을 잃었으면(재시작·다른 저장소 등) 다시 올리고 한 번 더 질문
+        return client.ask(question, pdf_hash=remote_manual(client, pdf_file, refresh=True))
 
-# PDF 파일을 열어 텍스트를 추출하고 벡터 데이터베이스 생성
-def build_vectorstore(pdf_file):
-    text = extract_text_with_ocr(pdf_file)
-    chunks = chunk_text(text)
-    embeddings = get_openai_embeddings(chunks)
-    
-    # FAISS 인덱스 생성
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
-    
-    return index, chunks
+# 업로드한 PDF의 백엔드 해시 (세션에 기록해 두고 같은 PDF는 다시 올리지 않음)
+def remote_manual(client, pdf_file, refresh=False):
+    known = st.session_state.setdefault("backend_manuals", set())
+    data = pdf_file.getvalue()
+    if refresh:
+        known.clear()
+    return client.ensure_manual(data, known)
 
-# 가장 유사한 문서 검색
-def search_documents(index, chunks, query, top_k=3):
-    query_embedding = get_openai_embeddings([query])
-    distances, indices = index.search(query_embedding, top_k)
-    return [chunks[i] for i in indices[0]]
-
-# RAG 체인 정의
-def rag_chain(pdf_file, question):
-    index, chunks = build_vectorstore(pdf_file)
-    relevant_docs = search_documents(index, chunks, question)
-    context = "\n\n".join(relevant_docs)
-    
-    messages = [
-        {"role": "system", "content": "You are a helpful assistant. Check the pdf content and answer the question."},
-        {"role": "user", "content": f"Question: {question}\n\nContext: {context}\n\nAnswer:"}
-    ]
-    
-    response = openai.ChatCompletion.create(
-        model="gpt-4o",
-        messages=messages,
-        max_tokens=150
-    )
-    return response['choices'][0]['message']['content'].strip()
-
-# PDF 생성 함수
-def create_pdf(question, answer):
-    buffer = BytesIO()
-    
-    # 폰트 등록 (한글 지원)
-    pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-    
-    # 스타일 정의
-    styles = getSampleStyleSheet()
-    style_title = ParagraphStyle(
-        name="Title",
-        fontName='HYSMyeongJo-Medium',
-        fontSize=18,
-        leading=24,
-        spaceAfter=10,
-        alignment=1,  # center
-        textColor=colors.HexColor("#2E4053")
-    )
-    style_body = ParagraphStyle(
-        name="Body",
-        fontName='HYSMyeongJo-Medium',
-        fontSize=11,
-        leading=18,
-        spaceAfter=6
-    )
-    
-    # PDF 파일 설정
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                            leftMargin=20, rightMargin=20,
-                            topMargin=20, bottomMargin=20)
-    
-    # 스토리 구성
-    story = [
-        Paragraph("질문과 답변", style_title),
-        Spacer(1, 12),
-        Paragraph(f"질문: {question}", style_body),
-        Spacer(1, 12),
-        HRFlowable(width="100%", thickness=1, color=colors.grey, spaceBefore=6, spaceAfter=10),
-        Paragraph(f"답변: {answer}", style_body),
-        Spacer(1, 12),
-        HRFlowable(width="100%", thickness=0.5, color=colors.lightgrey, spaceBefore=6)
-    ]
-    
-    # 문서 생성
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+# PDF 생성 함수 (폰트·스타일은 프로세스당 한 번 등록, 같은 질문·답변은 렌더링 결과 재사용)
+def create_pdf(question, answer, sources=None):
+    return BytesIO(render_answer_pdf(question, answer, sources))
 
 # Streamlit 탭에서 호출할 함수
 def show_search():
@@ -139,6 +77,74 @@ def show_search():
     
     if pdf_file:
         st.success("PDF 업로드 완료!")
+
+    # 매뉴얼 라이브러리 등록 및 검색 범위 선택 (백엔드가 설정되어 있으면 색인·조회 모두 백엔드에서)
+    client = BackendClient() if BACKEND_URL else None
+    with st.expander("📚 매뉴얼 라이브러리"):
+        if pdf_file:
+            col1, col2, col3, col4 = st.columns(4)
+            line = col1.text_input("설비 라인", value="default")
+            equipment_id = col2.text_input("설비 ID")
+            version = col3.text_input("매뉴얼 버전")
+            language = col4.selectbox("언어", ["ko", "en"])
+            if st.button("라이브러리에 추가"):
+                with st.spinner("매뉴얼 색인 중..."):
+                    try:
+                        if client is not None:
+                            added = client.add_to_library(remote_manual(client, pdf_file), line, equipment_id or None,
+                                                          version or None, language, title=pdf_file.name)["chunks"]
+                        else:
+                            added = get_corpus().add_manual(pdf_file, line, equipment_id or None, version or None,
+                                                            language, title=pdf_file.name)
+                        st.success(f"{added}개 청크를 라이브러리에 추가했습니다.")
+                    except BackendError as e:
+                        st.error(f"백엔드 오류: {e}")
+        try:
+            manuals = client.library() if client is not None else get_corpus().manuals()
+        except BackendError as e:
+            st.error(f"백엔드 오류: {e}")
+            manuals = []
+        if manuals:
+            st.dataframe([{k: m[k] for k in ("title", "line", "equipment_id", "version", "language")} for m in manuals])
+        else:
+            st.info("라이브러리에 등록된 매뉴얼이 없습니다.")
+
+    # 매뉴얼 요약 카드 (청크 요약 → 섹션 요약 → 문서 카드, 부분 요약은 캐시)
+    if pdf_file and st.button("📝 매뉴얼 요약 카드 생성"):
+        with st.spinner("매뉴얼 요약 중..."):
+            try:
+                if client is not None:
+                    summary = client.summarize(remote_manual(client, pdf_file))
+                else:
+                    summary = summarize_manual(pdf_file)
+                # 요약한 PDF의 해시와 함께 저장 → 다른 PDF를 올리면 이전 요약 카드를 보여 주지 않음
+                st.session_state.summary_card = {**summary, "pdf_hash": file_hash(pdf_file)}
+            except BackendError as e:
+                st.error(f"백엔드 오류: {e}")
+    summary = st.session_state.get("summary_card")
+    if summary and (not pdf_file or summary["pdf_hash"] != file_hash(pdf_file)):
+        summary = None
+    if summary and summary["card"]:
+        with st.expander("📝 매뉴얼 요약 카드", expanded=True):
+            st.markdown(summary["card"])
+            for section in summary["sections"]:
+                st.caption(f"p.{section['pages'][0]}-{section['pages'][1]}: {section['summary']}")
+            stats = summary["stats"]
+            st.caption(f"청크 {stats['chunks']}개 · 새로 요약 {stats['generated']}건 · 캐시 재사용 {stats['cached']}건")
+            st.download_button(
+                label="📥 요약 카드 PDF 다운로드",
+                data=lambda: render_answer_pdf("매뉴얼 요약 카드", summary["card"]),
+                file_name="요약_카드.pdf",
+                mime="application/pdf"
+            )
+
+    scope = st.radio("검색 범위", ["업로드한 PDF", "매뉴얼 라이브러리"], horizontal=True)
+    filters = {}
+    if scope == "매뉴얼 라이브러리":
+        col1, col2, col3 = st.columns(3)
+        filters["line"] = col1.multiselect("설비 라인", sorted({m["line"] for m in manuals})) or None
+        filters["equipment_id"] = col2.multiselect("설비 ID", sorted({m["equipment_id"] for m in manuals if m["equipment_id"]})) or None
+        filters["language"] = col3.multiselect("언어", sorted({m["language"] for m in manuals if m["language"]})) or None
     
     st.subheader("🔍 자연어 질문")
     # 사용자 지정 예시 질문 사전
@@ -166,25 +172,73 @@ def show_search():
     if "search_result" not in st.session_state:
         st.session_state.search_result = None
     
+    streaming = not BACKEND_URL and st.toggle("실시간 답변 스트리밍", value=True)
+    just_streamed = False
     if st.button("검색 결과 불러오기"):
-        if pdf_file and query:
-            with st.spinner("검색 중..."):
-                st.session_state.search_result = rag_chain(pdf_file, query)
+        target = None
+        if not query:
+            st.warning("질문을 입력해 주세요.")
+        elif scope == "매뉴얼 라이브러리":
+            target = {"filters": filters}
         elif not pdf_file:
             st.warning("PDF 파일을 업로드해 주세요.")
         else:
-            st.warning("질문을 입력해 주세요.")
-    
-    # 세션 상태에 저장된 검색 결과 표시
+            target = {"pdf_file": pdf_file}
+
+        if target is not None and streaming:
+            st.session_state.search_result = answer_question_streaming(query, **target)
+            just_streamed = st.session_state.search_result.get("streamed", False)
+        elif target is not None and BACKEND_URL:
+            with st.spinner("검색 중..."):
+                try:
+                    st.session_state.search_result = answer_question_remote(query, **target)
+                except BackendError as e:
+                    st.error(f"백엔드 오류: {e}")
+        elif target is not None:
+            with st.spinner("검색 중..."):
+                st.session_state.search_result = answer_question(query, **target)
+
+        # 세션 질의응답 기록 (보고서 PDF용)
+        if target is not None and st.session_state.search_result:
+            st.session_state.search_result["question"] = query
+            st.session_state.setdefault("qa_history", []).append({
+                "question": query,
+                "answer": st.session_state.search_result["answer"],
+                "sources": st.session_state.search_result.get("sources", []),
+            })
+    
+    # 세션 상태에 저장된 검색 결과 표시 (방금 스트리밍으로 출력한 답변은 다시 그리지 않음)
     if st.session_state.search_result:
-        st.write(f"질문: {query}")
-        st.write(f"답변: {st.session_state.search_result}")
+        result = st.session_state.search_result
+        if not just_streamed:
+            if result.get("sources"):
+                show_sources(result["sources"])
+            st.write(f"질문: {result.get('question', query)}")
+            st.write(f"답변: {result['answer']}")
+            if result["cached"]:
+                st.caption(f"⚡ 캐시된 답변 ({result['elapsed_ms']:.0f} ms)")
+            elif result.get("ttft_ms") is not None:
+                st.caption(f"첫 토큰까지 {result['ttft_ms']:.0f} ms · 전체 {result['elapsed_ms'] / 1000:.1f}초")
+            else:
+                st.caption(f"응답 시간: {result['elapsed_ms'] / 1000:.1f}초")
+            if result.get("context_tokens"):
+                st.caption(f"문맥 {result['context_tokens']} 토큰 · 근거 {len(result.get('sources', []))}개")
 
-        # PDF 다운로드 버튼
-        pdf_buffer = create_pdf(query, st.session_state.search_result)
+        # PDF 다운로드 버튼 (클릭했을 때만 생성)
+        question = result.get("question", query)
         st.download_button(
             label="📥 답변 PDF 다운로드",
-            data=pdf_buffer,
+            data=lambda: render_answer_pdf(question, result["answer"], result.get("sources")),
             file_name="답변.pdf",
             mime="application/pdf"
+        )
+
+    # 세션 전체 질의응답 보고서 (한 번에 렌더링)
+    history = st.session_state.get("qa_history", [])
+    if len(history) > 1:
+        st.download_button(
+            label=f"📚 세션 질의응답 보고서 PDF 다운로드 ({len(history)}건)",
+            data=lambda: render_report(history),
+            file_name="질의응답_보고서.pdf",
+            mime="application/pdf"
         )
\ No newline at end of file
@@ -1,22 +1,63 @@
 import streamlit as st
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import html
+import threading
+from collections import OrderedDict
+from services.wiki_store import get_wiki_store, PAGE_SIZE
+
+RENDER_CACHE_SIZE = 2048
+PAGE_SIZES = [10, 20, 50]
+
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+# 사용자 입력을 HTML에 넣기 전에 이스케이프 (저장된 글이 모든 사용자에게 보이므로 스크립트·태그가 실행되지 않게)
+# 줄바꿈은 이스케이프한 뒤에 <br />로 바꿈
+def escape_text(text):
+    return html.escape(text).replace("\r\n", "\n").replace("\n", "<br />")
+
+# 게시글 카드 HTML (항목 ID·버전별로 한 번만 만들고 모든 세션이 재사용, 캐시에는 이스케이프한 HTML만 저장)
+def render_entry_html(entry):
+    key = (entry['id'], entry['version'])
+    with _render_cache_lock:
+        if key in _render_cache:
+            _render_cache.move_to_end(key)
+            return _render_cache[key]
+    card = f"""
+                <div style="border: 1px solid #ddd; padding: 15px; border-radius: 5px; margin-bottom: 10px;">
+                    <strong>작성자</strong>: {escape_text(entry['author'])}<br />
+                    <strong>태그</strong>: {', '.join(escape_text(tag) for tag in entry['tags'])}<br />
+                    <strong>내용</strong>:<br />{escape_text(entry['content'])}
+                </div>
+                """
+    with _render_cache_lock:
+        _render_cache[key] = card
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return card
+
+# 유사 항목 병합 제안 (저장하거나 보여 주는 항목마다 LSH 색인에서 찾으므로 상대 항목의 페이지와 무관)
+def show_similar(store, entries):
+    similar_pairs = store.similar_pairs([entry['id'] for entry in entries])
+    if similar_pairs:
+        st.warning("유사도가 높은 항목이 있습니다. 병합을 고려해 보세요.")
+        for earlier, later, similarity in similar_pairs:
+            st.write(f"유사 항목: [{earlier['author']}]와 [{later['author']}] (유사도: {similarity:.2f})")
 
 def show_wiki():
     st.header("📚 협업 게시판")
+    store = get_wiki_store()
     
     # 세션 상태에 초기 태그 목록이 없으면 빈 리스트로 초기화
     if 'all_tags' not in st.session_state:
         st.session_state.all_tags = []
     
-    # 태그 추천 (빈도 기반)
-    tag_frequencies = {tag: 0 for tag in st.session_state.all_tags}
-    for entry in st.session_state.get('wiki', []):
-        for tag in entry['tags']:
-            if tag in tag_frequencies:
-                tag_frequencies[tag] += 1
-    recommended_tags = sorted(tag_frequencies, key=tag_frequencies.get, reverse=True)[:5]
+    # 저장소에 쌓인 태그를 선택지에 합침
+    for tag in store.tag_counts():
+        if tag not in st.session_state.all_tags:
+            st.session_state.all_tags.append(tag)
+    
+    # 태그 추천 (빈도 기반, 저장할 때 갱신되는 태그 집계에서 상위 5개)
+    recommended_tags = [tag for tag, _ in store.top_tags(5)]
     
     # 새 태그 입력 필드
     st.subheader("🔖 새 태그 입력")
@@ -66,12 +107,12 @@ def show_wiki():
     )
     content = st.text_area("위키 내용", value=example_template, height=200)
     
-    # 위키 저장
+    # 위키 저장 (유사 항목 색인도 저장할 때 함께 갱신)
     if st.button("저장"):
         if author and tags and content:
-            new_entry = {'author': author, 'tags': tags, 'content': content}
-            st.session_state.setdefault('wiki', []).append(new_entry)
+            entry = store.add_entry(author, tags, content)
             st.success("위키 저장 완료")
+            show_similar(store, [entry])
         else:
             st.warning("작성자 이름, 태그, 내용을 모두 입력하세요.")
     
@@ -81,42 +122,52 @@ def show_wiki():
     st.subheader("🔍 게시판 검색")
     search_query = st.text_input("검색어 입력")
     
-    # 필터 태그
-    filter_tags = st.multiselect("필터 태그", options=st.session_state.all_tags)
-    
-    # 검색 및 필터 적용
-    wiki_data = st.session_state.get('wiki', [])
-    if search_query:
-        wiki_data = [w for w in wiki_data if search_query.lower() in w['content'].lower() or search_query.lower() in w['author'].lower()]
-    if filter_tags:
-        wiki_data = [w for w in wiki_data if any(tag in w['tags'] for tag in filter_tags)]
-    
-    # 유사 항목 병합 제안
-    if len(wiki_data) > 1:
-        contents = [entry['content'] for entry in wiki_data]
-        vectorizer = TfidfVectorizer().fit_transform(contents)
-        similarities = cosine_similarity(vectorizer)
-        np.fill_diagonal(similarities, 0)
-        similar_pairs = np.argwhere(similarities > 0.8)
-        
-        if similar_pairs.size > 0:
-            st.warning("유사도가 높은 항목이 있습니다. 병합을 고려해 보세요.")
-            for i, j in similar_pairs:
-                st.write(f"유사 항목: [{wiki_data[i]['author']}]와 [{wiki_data[j]['author']}] (유사도: {similarities[i, j]:.2f})")
+    # 필터 태그·작성자
+    col1, col2, col3 = st.columns([2, 1, 2])
+    filter_tags = col1.multiselect("필터 태그", options=st.session_state.all_tags)
+    tag_mode = col2.radio("태그 조건", ["하나라도 포함", "모두 포함"])
+    filter_authors = col3.multiselect("작성자", options=store.authors())
+    
+    # 자동 분류 카테고리별 보기 (저장할 때 백그라운드에서 배정된 카테고리)
+    categories = {f"{label} ({count})": category for category, label, count in store.categories()}
+    category_label = st.selectbox("카테고리", ["전체"] + list(categories))
+    category = categories.get(category_label)
+    
+    # 검색 조건이 바뀌면 첫 페이지로
+    page_size = st.session_state.get('wiki_page_size', PAGE_SIZE)
+    conditions = (search_query, tuple(filter_tags), tag_mode, tuple(filter_authors), category, page_size)
+    if st.session_state.get('wiki_conditions') != conditions:
+        st.session_state.wiki_conditions = conditions
+        st.session_state.wiki_page = 1
+    
+    # 검색 및 필터 적용 (저장소 색인에서 순위·현재 페이지 항목만 조회, 전체 개수는 색인에서 COUNT)
+    page = st.session_state.wiki_page
+    result = store.search(search_query, authors=filter_authors, tags=filter_tags,
+                          tag_mode="all" if tag_mode == "모두 포함" else "any", category=category,
+                          page=page, page_size=page_size)
+    wiki_data = result['entries']
+    last_page = max(1, -(-result['total'] // page_size))
+    
+    # 현재 페이지 항목의 유사 항목 (다른 페이지에 있는 항목과의 쌍도 포함)
+    show_similar(store, wiki_data)
     
     # 게시판 표시
     st.subheader("📂 게시판 목록")
     if wiki_data:
-        for entry in wiki_data:
-            st.markdown(
-                f"""
-                <div style="border: 1px solid #ddd; padding: 15px; border-radius: 5px; margin-bottom: 10px;">
-                    <strong>작성자</strong>: {entry['author']}<br />
-                    <strong>태그</strong>: {', '.join(entry['tags'])}<br />
-                    <strong>내용</strong>:<br />{entry['content']}
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+        start = (page - 1) * page_size
+        st.caption(f"전체 {result['total']}건 중 {start + 1}-{start + len(wiki_data)}번째 · 페이지 {page}/{last_page}")
+        # 현재 페이지 항목만 한 번에 그림 (캐시된 카드 HTML을 이어 붙임)
+        st.markdown("".join(render_entry_html(entry) for entry in wiki_data), unsafe_allow_html=True)
+        
+        # 페이지 이동
+        col1, col2, col3 = st.columns([1, 1, 2])
+        if col1.button("◀ 이전", disabled=page <= 1):
+            st.session_state.wiki_page = page - 1
+            st.rerun()
+        if col2.button("다음 ▶", disabled=page >= last_page):
+            st.session_state.wiki_page = page + 1
+            st.rerun()
+        col3.selectbox("페이지당 항목 수", PAGE_SIZES, key='wiki_page_size',
+                       index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1)
     else:
         st.info("등록된 항목이 없습니다.")
\ No newline at end of file
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# 테스트는 저장소 캐시·게시판 DB를 건드리지 않도록 임시 디렉터리에서 실행
+os.environ.setdefault("MANUPILOT_CACHE_DIR", tempfile.mkdtemp(prefix="manupilot-test-"))
+os.environ.setdefault("MANUPILOT_EMBEDDING_BACKEND", "local")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+import io
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen import canvas
+
+pdfmetrics.registerFont(UnicodeCIDFont("HYSMyeongJo-Medium"))
+
+
+# 페이지마다 주어진 문장을 적은 PDF 바이트 (테스트용 매뉴얼)
+def make_pdf(pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in pages:
+        pdf.setFont("HYSMyeongJo-Medium", 11)
+        y = 780
+        for line in text.split("\n"):
+            pdf.drawString(40, y, line)
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def pdf_file(pages):
+    return io.BytesIO(make_pdf(pages))
@@ -0,0 +1,53 @@
+import numpy as np
+
+from services import rag
+from services.answer_cache import AnswerCache, normalize_question
+
+
+def test_normalize_question():
+    assert normalize_question("  펌프 압력은？ ") == normalize_question("펌프   압력은?")
+
+
+def test_exact_hit_does_not_embed():
+    cache = AnswerCache()
+    cache.put("m", "펌프 압력은?", "답", np.ones(4))
+    calls = []
+    hit = cache.get("m", "펌프 압력은", lambda: calls.append(1) or np.ones(4))
+    assert hit["answer"] == "답" and not calls
+
+
+def test_similar_question_and_manual_scope():
+    cache = AnswerCache(threshold=0.9)
+    cache.put("m", "펌프 압력", "답", np.array([1.0, 0.0]))
+    assert cache.get("m", "다른 질문", np.array([0.99, 0.05]))["answer"] == "답"
+    assert cache.get("m", "다른 질문", np.array([0.0, 1.0])) is None
+    assert cache.get("other", "다른 질문", np.array([1.0, 0.0])) is None
+
+
+def test_ttl_lru_and_invalidate():
+    cache = AnswerCache(max_items=2, ttl=None)
+    cache.put("m", "a", 1)
+    cache.put("m", "b", 2)
+    cache.get("m", "a")
+    cache.put("m", "c", 3)
+    assert cache.get("m", "b") is None and cache.get("m", "a") is not None
+    cache.invalidate("m")
+    assert len(cache) == 0
+
+    expired = AnswerCache(ttl=-1)
+    expired.put("m", "a", 1)
+    assert expired.get("m", "a") is None
+
+
+def test_answer_question_skips_embedding_on_exact_hit(monkeypatch):
+    embeds = []
+    monkeypatch.setattr(rag, "_answer_cache", AnswerCache())
+    monkeypatch.setattr(rag, "answer_cache_key", lambda pdf_file=None, filters=None: "manual")
+    monkeypatch.setattr(rag, "get_openai_embeddings", lambda texts: embeds.append(texts) or np.ones((1, 4)))
+    monkeypatch.setattr(rag, "retrieve_context", lambda q, p, f: {"context": "", "docs": [], "tokens": 0})
+    monkeypatch.setattr(rag.chat, "complete", lambda messages: "답변")
+
+    assert rag.answer_question("펌프 압력은?")["cached"] is False
+    assert len(embeds) == 1
+    assert rag.answer_question("펌프 압력은?")["cached"] is True
+    assert len(embeds) == 1
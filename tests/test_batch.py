@@ -0,0 +1,54 @@
+import json
+import threading
+import time
+
+from services import batch
+from services.embeddings import HashingBackend
+from tests.helpers import make_pdf
+
+
+class CountingBackend(HashingBackend):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.model = "counting-64"
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return super().embed(texts)
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            self.waits += 1
+
+
+def test_run_records_failures_and_limits_embeddings(monkeypatch, tmp_path):
+    def complete(messages):
+        time.sleep(0.3 if messages[-1]["content"].startswith("Question: 펌프") else 0)
+        return "답변"
+
+    monkeypatch.setattr(batch.chat, "complete", complete)
+    manual = tmp_path / "pump.pdf"
+    manual.write_bytes(make_pdf(["펌프 압력이 떨어지면 흡입 밸브를 점검합니다.", "베어링 온도가 높으면 정지합니다."]))
+    questions = [{"id": "1", "question": "펌프 압력 점검은?"}, {"id": "2", "question": "베어링 온도는?"}]
+
+    backend = CountingBackend()
+    runner = batch.BatchRunner(str(tmp_path / "out.jsonl"), workers=2, backend=backend)
+    runner.limiter = runner.backend.limiter = CountingLimiter()
+    stats = runner.run([{"path": str(tmp_path / "missing.pdf"), "name": "missing"},
+                        {"path": str(manual), "name": "pump"}], questions)
+
+    rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert stats == {"answered": 2, "skipped": 0, "failed": 2}
+    assert [r["manual"] for r in rows[:2]] == ["missing", "missing"]
+    assert all("FileNotFoundError" in r["error"] for r in rows[:2])
+    # 느린 질문(1)보다 먼저 끝난 질문(2)이 먼저 기록됨
+    assert [r["question_id"] for r in rows[2:]] == ["2", "1"]
+    # 모든 임베딩 요청(색인 + 질문)과 LLM 요청이 속도 제한을 거침
+    assert backend.calls > 0 and runner.limiter.waits == backend.calls + len(questions)
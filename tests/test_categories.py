@@ -0,0 +1,65 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from services.categories import CategoryModel, CategoryWorker
+from services.index_cache import try_file_lock
+from services.wiki_store import WikiStore
+
+PUMP = ["펌프 압력이 떨어지면 흡입 밸브를 점검합니다.", "펌프 진동이 크면 베어링을 점검합니다."]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WikiStore(str(tmp_path / "wiki.sqlite3"))
+
+
+def test_model_saves_only_on_flush(tmp_path):
+    model = CategoryModel(str(tmp_path / "model.npz"))
+    for text in PUMP:
+        model.assign(text, ["펌프"])
+    assert not os.path.exists(model.path)
+    assert model.flush() and not model.flush()
+    assert CategoryModel(model.path).n_docs == 2
+
+
+def test_remove_reverts_assign(tmp_path):
+    model = CategoryModel(str(tmp_path / "model.npz"))
+    category = model.assign(PUMP[0], ["펌프"])
+    before = model.centroids[category].copy(), model.doc_freq.copy()
+    model.assign(PUMP[1], ["펌프", "베어링"])
+    model.remove(PUMP[1], ["펌프", "베어링"], category)
+    assert model.counts[category] == 1 and model.n_docs == 1
+    assert dict(model.tag_counts[category]) == {"펌프": 1}
+    assert np.allclose(model.centroids[category], before[0]) and (model.doc_freq == before[1]).all()
+
+
+def test_worker_owns_model_and_applies_deletes(store, tmp_path):
+    path = str(tmp_path / "model.npz")
+    worker = CategoryWorker(store, CategoryModel(path), poll_seconds=0.05)
+    store.subscribe(worker.submit)
+    entries = [store.add_entry("김", ["펌프"], text) for text in PUMP]
+    worker.join()
+    assert worker.owner
+    assert all(store.get(e["id"])["category"] is not None for e in entries)
+    assert CategoryModel(path).n_docs == 2  # 대기열을 비운 뒤 한 번 저장
+
+    # 같은 모델 파일을 쓰는 다른 작업자(다른 프로세스의 작업자와 같음)는 소유하지 못함
+    assert try_file_lock(f"{path}.owner") is None
+    other = CategoryWorker(store, CategoryModel(path), poll_seconds=0.05)
+    other.submit(entries[0])
+    other.join()
+    assert not other.owner
+
+    store.delete_entry(entries[1]["id"])
+    assert store.categories()[0][2] == 1
+    model = worker.model
+    # 소유 작업자가 다음 확인 때 삭제를 모델에 반영하고 저장
+    deadline = time.monotonic() + 5
+    while (model.n_docs != 1 or model.dirty) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert model.n_docs == 1 and model.counts.sum() == 1
+    assert CategoryModel(path).n_docs == 1
+    assert store.take_category_removals() == []
@@ -0,0 +1,37 @@
+import pytest
+
+from services.chunking import iter_chunks
+
+PAGES = [
+    (1, ("펌프 압력이 떨어지면 흡입 밸브를 점검합니다. " * 30).strip()),
+    (2, ""),
+    (3, ("베어링 온도가 높으면 설비를 정지하고 윤활유를 보충합니다. " * 30).strip()),
+]
+
+
+def test_offsets_point_at_chunk_text():
+    texts = dict(PAGES)
+    chunks = list(iter_chunks(PAGES, max_chars=200, overlap=40))
+    assert len(chunks) > 4
+    for chunk in chunks:
+        assert len(chunk["text"]) <= 200
+        assert chunk["page"] <= chunk["end_page"]
+        # 청크가 시작 페이지의 offset 위치에서 시작 (페이지를 넘는 청크는 시작 페이지 부분만 비교)
+        head = chunk["text"].split("\n")[0]
+        page_text = texts[chunk["page"]]
+        assert page_text[chunk["offset"]:chunk["offset"] + len(head)] == head
+    assert {c["page"] for c in chunks} == {1, 3}
+    assert any(c["page"] == 1 and c["end_page"] == 3 for c in chunks)
+
+
+def test_chunks_overlap_and_cover_text():
+    chunks = list(iter_chunks([(1, " ".join(f"w{i}" for i in range(300)))], max_chars=120, overlap=30))
+    for prev, chunk in zip(chunks, chunks[1:]):
+        assert chunk["offset"] < prev["offset"] + len(prev["text"])  # 겹침
+        assert not chunk["text"].startswith(("0", "1", "2", "3", "4", "5", "6", "7", "8", "9"))  # 단어 중간 X
+    assert chunks[-1]["text"].endswith("w299")
+
+
+def test_overlap_must_fit_budget():
+    with pytest.raises(ValueError):
+        list(iter_chunks(PAGES, max_chars=100, overlap=60))
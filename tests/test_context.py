@@ -0,0 +1,29 @@
+import random
+
+from services.chunking import CHUNK_CHARS, estimate_tokens
+from services.context import CONTEXT_TOP_K, assemble_context, trim_to_tokens
+
+
+def _hangul_text(seed, length):
+    rng = random.Random(seed)
+    return "".join(chr(rng.randrange(0xAC00, 0xD7A4)) for _ in range(length))
+
+
+def test_trim_stays_within_budget():
+    text = "펌프 압력을 확인한다. " * 200 + "a" * 400
+    for budget in (5, 37, 60, 250):
+        trimmed = trim_to_tokens(text, budget)
+        assert trimmed.endswith(" …")
+        assert estimate_tokens(trimmed) <= budget
+    assert trim_to_tokens("짧은 문장", 100) == "짧은 문장"
+
+
+def test_budget_keeps_top_k_full_chunks():
+    # 최대 크기 한글 청크(글자당 1토큰)도 상위 k개가 잘리지 않고 모두 들어가야 함
+    candidates = [{"text": _hangul_text(i, CHUNK_CHARS), "page": i + 100, "end_page": i + 101}
+                  for i in range(CONTEXT_TOP_K + 2)]
+    assert all(estimate_tokens(c["text"]) == CHUNK_CHARS for c in candidates)
+
+    context = assemble_context("펌프 점검", candidates)
+    full = [doc for doc in context["docs"] if not doc.get("trimmed")]
+    assert len(full) >= CONTEXT_TOP_K
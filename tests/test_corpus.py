@@ -0,0 +1,133 @@
+import io
+import threading
+
+import pytest
+
+from services.corpus import CorpusIndex
+from services.embeddings import HashingBackend
+from tests.helpers import make_pdf, pdf_file
+
+PUMP = ["펌프 압력이 떨어지면 흡입 밸브를 점검하고 필터를 교체합니다.", "펌프 베어링 온도가 80도를 넘으면 정지합니다."]
+PRESS = ["프레스 금형 교체 전에는 전원을 차단하고 잠금 장치를 겁니다.", "프레스 유압 오일은 매월 점검합니다."]
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "corpus")
+
+
+def _corpus(root):
+    return CorpusIndex(root=root, backend=HashingBackend())
+
+
+def test_filters_restrict_results(root):
+    corpus = _corpus(root)
+    corpus.add_manual(pdf_file(PUMP), "A", equipment_id="P-1", manual_id="pump")
+    corpus.add_manual(pdf_file(PRESS), "B", equipment_id="PR-1", manual_id="press")
+    results = corpus.search("점검", top_k=5, line="B")
+    assert results and {r["manual_id"] for r in results} == {"press"}
+    with pytest.raises(ValueError):
+        corpus.search("점검", unknown="x")
+
+
+def test_other_process_writes_are_seen(root):
+    writer, reader = _corpus(root), _corpus(root)
+    writer.add_manual(pdf_file(PUMP), "A", manual_id="pump")
+    assert {r["manual_id"] for r in reader.dense_search("금형 교체", top_k=5)} == {"pump"}
+
+    # 읽는 쪽이 샤드를 메모리에 올린 뒤 다른 인스턴스가 같은 샤드에 추가
+    writer.add_manual(pdf_file(PRESS), "A", manual_id="press")
+    assert "press" in {r["manual_id"] for r in reader.dense_search("금형 교체", top_k=5)}
+
+    writer.remove_manual("press")
+    assert {r["manual_id"] for r in reader.dense_search("금형 교체", top_k=5)} == {"pump"}
+
+
+def test_search_during_add_is_safe(root):
+    corpus = _corpus(root)
+    corpus.add_manual(pdf_file(PUMP), "A", manual_id="pump")
+    errors = []
+    stop = threading.Event()
+
+    def search_loop():
+        try:
+            while not stop.is_set():
+                assert corpus.dense_search("펌프", top_k=3)
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=search_loop) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for i in range(5):
+        corpus.add_manual(pdf_file([f"{i}번 설비 {text}" for text in PRESS]), "A", manual_id=f"press{i}")
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_shard_upgrades_to_configured_index_type(root):
+    import faiss
+    import numpy as np
+    from services import ann
+
+    corpus = CorpusIndex(root=root, backend=HashingBackend(), index_type="ivf_flat")
+    index = corpus._new_index(32)
+    assert ann.is_flat(index)
+    vectors = ann.normalize(np.random.default_rng(0).standard_normal((3000, 32)))
+    index.add_with_ids(vectors, np.arange(3000, dtype="int64") * 7)
+    index = corpus._maybe_upgrade(index)
+    assert isinstance(ann.base_index(index), faiss.IndexIVFFlat)
+
+    selector = faiss.IDSelectorBatch(np.arange(100, dtype="int64") * 7)
+    _, labels = ann.search(index, vectors[:1], 5, params=ann.search_params(index, selector))
+    assert labels[0][0] == 0 and all(i % 7 == 0 and i < 700 for i in labels[0] if i >= 0)
+
+
+def test_hnsw_shard_supports_remove(root):
+    corpus = CorpusIndex(root=root, backend=HashingBackend(), index_type="hnsw")
+    corpus.add_manual(pdf_file(PUMP), "A", manual_id="pump")
+    corpus.add_manual(pdf_file(PRESS), "A", manual_id="press")
+    corpus.remove_manual("pump")
+    assert {r["manual_id"] for r in corpus.dense_search("펌프", top_k=5)} == {"press"}
+
+
+def test_filter_selector_is_cached_until_shard_changes(root):
+    corpus = _corpus(root)
+    corpus.add_manual(pdf_file(PUMP), "A", equipment_id="P-1", manual_id="pump")
+    corpus.add_manual(pdf_file(PRESS), "A", equipment_id="PR-1", manual_id="press")
+    first = corpus._targets({"equipment_id": "P-1"})["A"]
+    assert first is corpus._targets({"equipment_id": "P-1"})["A"]
+    assert corpus._targets({"line": "A"}) == {"A": None}  # 샤드 전체면 선택기 없이
+
+    corpus.add_manual(pdf_file(["펌프 추가 문서"]), "A", equipment_id="P-1", manual_id="pump2")
+    assert corpus._targets({"equipment_id": "P-1"})["A"] is not first
+    assert {r["manual_id"] for r in corpus.search("펌프", top_k=5, equipment_id="P-1")} <= {"pump", "pump2"}
+
+
+def test_concurrent_adds_of_same_manual(root):
+    corpus = _corpus(root)
+    errors, results = [], []
+    start = threading.Barrier(4)
+    data = make_pdf(PUMP)  # 모든 스레드가 같은 PDF (같은 manual_id)
+
+    def add(line):
+        try:
+            start.wait()
+            results.append(corpus.add_manual(io.BytesIO(data), line))
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(line,)) for line in ("A", "A", "A", "B")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    manuals = corpus.manuals()
+    assert len(manuals) == 1
+    # 남은 매뉴얼의 청크만 색인에 있음 (교체된 쪽의 벡터·FTS 행이 남지 않음)
+    total = sum(corpus._load_shard(line).ntotal for line in ("A", "B") if corpus._load_shard(line) is not None)
+    assert total == corpus._connect().execute("SELECT COUNT(*) FROM chunks").fetchone()[0] > 0
+    assert corpus._connect().execute("SELECT COUNT(*) FROM chunks_fts").fetchone()[0] == total
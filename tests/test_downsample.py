@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from services.downsample import downsample, minmax_indices
+
+
+def test_keeps_spikes_and_bounds_size():
+    values = np.sin(np.linspace(0, 20, 100_000))
+    values[54_321] = 50.0
+    values[12_345] = -50.0
+    keep = minmax_indices(values, buckets=100)
+    assert len(keep) <= 2 * 100 + 2
+    assert {0, 12_345, 54_321, len(values) - 1} <= set(keep)
+    assert (np.diff(keep) > 0).all()
+
+
+def test_small_input_is_unchanged():
+    frame = pd.DataFrame({"v": np.arange(10.0)})
+    assert downsample(frame, "v", buckets=10) is frame
+
+
+def test_nan_values_are_not_picked():
+    values = np.arange(1000, dtype=np.float64)
+    values[:500] = np.nan  # 앞쪽 구간은 모두 결측
+    values[700] = np.nan
+    values[750] = 5000.0
+    keep = minmax_indices(values, buckets=10)
+    assert 750 in keep and 700 not in keep
+    assert set(keep[(keep > 0) & (keep < 500)]) == set()
+    frame = downsample(pd.DataFrame({"v": values}), "v", buckets=10)
+    assert frame["v"].iloc[1:].notna().all()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from services import embeddings
+from services.embeddings import EmbeddingStore, HashingBackend, embed_texts
+
+
+class CountingBackend(HashingBackend):
+    def __init__(self):
+        super().__init__(dim=16)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+def _store(tmp_path, **kwargs):
+    return EmbeddingStore("test-model", path=str(tmp_path / "emb.sqlite3"), **kwargs)
+
+
+def test_embed_texts_deduplicates_and_reuses_store(tmp_path):
+    backend = CountingBackend()
+    store = _store(tmp_path)
+    first = embed_texts(["a", "b", "a"], backend=backend, store=store)
+    assert sum(len(c) for c in backend.calls) == 2
+    assert np.array_equal(first[0], first[2])
+
+    again = embed_texts(["b", "a"], backend=backend, store=store)
+    assert sum(len(c) for c in backend.calls) == 2
+    assert np.array_equal(again[1], first[0])
+
+
+def test_store_is_single_file_and_reopens_lazily(tmp_path):
+    store = _store(tmp_path)
+    for i in range(5):
+        store.put_many([f"k{i}"], np.ones((1, 4)) * i)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".sqlite3"] == ["emb.sqlite3"]
+
+    reopened = _store(tmp_path)
+    assert len(reopened) == 5
+    assert reopened.get("k3").tolist() == [3.0] * 4
+    assert reopened.get("missing") is None
+
+
+def test_store_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "TOUCH_SECONDS", 0)
+    store = _store(tmp_path, max_items=3)
+    store.put_many(["a", "b", "c"], np.zeros((3, 4)))
+    store.get("a")  # a를 최근 사용으로
+    store.put_many(["d"], np.zeros((1, 4)))
+    assert len(store) == 3
+    assert "a" in store and "d" in store
+    assert ("b" in store) + ("c" in store) == 1
+
@@ -0,0 +1,70 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from services import extraction, index_cache
+
+
+def _pdf_bytes(scanned_pages, total_pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page_no in range(1, total_pages + 1):
+        if page_no not in scanned_pages:
+            pdf.drawString(72, 720, f"page {page_no} text")
+        else:
+            pdf.rect(72, 600, 100, 100, fill=1)  # 텍스트 레이어 없는 페이지
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def page_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_cache, "PAGE_CACHE_DIR", str(tmp_path / "pages"))
+    monkeypatch.setattr(index_cache, "INDEX_CACHE_DIR", str(tmp_path / "indexes"))
+    monkeypatch.setattr(extraction, "PAGE_CACHE_DIR", str(tmp_path / "pages"))
+    return tmp_path
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    batches = []
+
+    def ocr_pages(pdf_path, page_nos, lang=None, resolution=None):
+        batches.append(list(page_nos))
+        return [(page_no, f"ocr {page_no}") for page_no in page_nos]
+
+    monkeypatch.setattr(extraction, "ocr_pages", ocr_pages)
+    return batches
+
+
+def test_ocr_results_are_yielded_before_text_pages_finish(page_cache, fake_ocr, monkeypatch):
+    monkeypatch.setattr(extraction, "OCR_BATCH_PAGES", 1)
+    data = _pdf_bytes({1}, 30)
+    with ThreadPoolExecutor(1) as pool:
+        order = [page_no for page_no, _ in extraction.iter_pages(io.BytesIO(data), pool=pool)]
+    assert sorted(order) == list(range(1, 31))
+    assert order.index(1) < order.index(30)
+
+
+def test_in_order_stream_and_page_batches(page_cache, fake_ocr, monkeypatch):
+    monkeypatch.setattr(extraction, "OCR_BATCH_PAGES", 2)
+    data = _pdf_bytes({2, 3, 5}, 6)
+    with ThreadPoolExecutor(2) as pool:
+        pages = list(extraction.iter_pages_in_order(io.BytesIO(data), pool=pool))
+    assert [page_no for page_no, _ in pages] == [1, 2, 3, 4, 5, 6]
+    assert pages[1][1] == "ocr 2"
+    assert fake_ocr == [[2, 3], [5]]
+
+    # 두 번째 실행은 페이지 캐시에서 (OCR 없이)
+    assert extraction.extract_pages(io.BytesIO(data)) == pages
+    assert len(fake_ocr) == 2
+
+
+def test_page_cache_is_evicted_with_index_cache(page_cache, fake_ocr):
+    extraction.extract_pages(io.BytesIO(_pdf_bytes(set(), 2)))
+    assert list((page_cache / "pages").iterdir())
+    index_cache.evict(max_mb=0)
+    assert not list((page_cache / "pages").iterdir())
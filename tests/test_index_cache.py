@@ -0,0 +1,83 @@
+import threading
+import time
+
+import faiss
+import pytest
+
+from services import index_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_cache, "INDEX_CACHE_DIR", str(tmp_path / "indexes"))
+    index_cache._memory_cache.clear()
+    yield tmp_path
+    index_cache._memory_cache.clear()
+
+
+def _pdf(tmp_path, data=b"%PDF-1.4 test"):
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(data)
+    return str(path)
+
+
+def _save_text(value, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(value)
+
+
+def _load_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_same_content_same_key(cache_dir, tmp_path):
+    a = tmp_path / "a.pdf"
+    b = tmp_path / "b.pdf"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    assert index_cache.file_hash(str(a)) == index_cache.file_hash(str(b))
+    assert index_cache.cache_key("h", "m1") != index_cache.cache_key("h", "m2")
+
+
+def test_get_or_build_reuses_disk_cache(cache_dir, tmp_path):
+    pdf = _pdf(tmp_path)
+    calls = []
+
+    def build(_):
+        calls.append(1)
+        return faiss.IndexFlatIP(4), ["chunk"]
+
+    index_cache.get_or_build(pdf, build)
+    index_cache._memory_cache.clear()
+    _, chunks = index_cache.get_or_build(pdf, build)
+    assert chunks == ["chunk"]
+    assert len(calls) == 1
+
+
+def test_concurrent_builds_of_same_pdf_run_once(cache_dir, tmp_path):
+    pdf = _pdf(tmp_path)
+    calls = []
+
+    def build(_):
+        calls.append(1)
+        time.sleep(0.2)
+        return faiss.IndexFlatIP(4), ["chunk"]
+
+    threads = [threading.Thread(target=index_cache.get_or_build, args=(pdf, build)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_evict_drops_sidecar_memory_entries(cache_dir, tmp_path):
+    pdf = _pdf(tmp_path)
+    index_cache.get_or_build(pdf, lambda _: (faiss.IndexFlatIP(4), ["chunk"]))
+    index_cache.get_or_build_sidecar(pdf, "bm25.json", lambda: "sidecar", _load_text, _save_text)
+    assert any("/" in key for key in index_cache._memory_cache)
+
+    removed = index_cache.evict(max_mb=0)
+    assert removed
+    assert not any(key.startswith(removed[0]) for key in index_cache._memory_cache)
@@ -0,0 +1,42 @@
+from services import ann
+from services.embeddings import HashingBackend
+from services.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from services.rag import search_documents
+
+CODES = [f"오류 코드 E-20{i} 발생 시 {part}를 점검하고 조치합니다." for i, part in
+         enumerate(["모터", "센서", "밸브", "펌프", "필터", "배선", "냉각팬", "벨트", "유압호스", "전원부"])]
+
+
+def test_tokenize_keeps_codes_and_hangul_bigrams():
+    tokens = tokenize("오류 코드 E-203, 펌프를 점검")
+    assert "e-203" in tokens and "203" in tokens
+    assert {"오류", "펌프", "프를", "점검"} <= set(tokens)
+    assert tokenize("밸브") == ["밸브"] and tokenize("펌") == ["펌"]
+
+
+def test_bm25_scores_rarer_terms_higher():
+    index = BM25Index.build(CODES)
+    hits = index.search("E-203 펌프")
+    assert hits[0][0] == 3
+    assert all(score > 0 for _, score in hits)
+    assert [doc for doc, _ in index.search("E-209")] == [9]
+    assert index.search("없는단어") == []
+
+
+def test_exact_error_code_ranks_first_with_hybrid_search():
+    backend = HashingBackend(dim=64)
+    chunks = [{"text": text, "page": i + 1} for i, text in enumerate(CODES)]
+    index = ann.build_index(backend.embed(CODES), "flat_ip")
+    lexical = BM25Index.build(CODES)
+    # 해시 임베딩만으로는 E-203 질문에 다른 코드 청크가 1위 (코드 토큰이 정확히 맞는 BM25 순위로 끌어올림)
+    for code in ("E-203", "E-207"):
+        docs = search_documents(index, chunks, f"{code} 오류 조치 방법", top_k=3, lexical=lexical, backend=backend)
+        assert code in docs[0]["text"]
+
+
+def test_reciprocal_rank_fusion_order():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert [doc for doc, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+    # 가중치를 주면 그 순위가 더 크게 반영
+    assert [doc for doc, _ in reciprocal_rank_fusion([["a", "b"], ["b", "a"]], weights=[1.0, 2.0])][0] == "b"
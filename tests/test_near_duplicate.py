@@ -0,0 +1,25 @@
+from services.near_duplicate import DuplicateIndex
+
+BASE = "펌프 압력이 떨어지면 흡입 밸브를 점검하고 필터 카트리지를 교체한 뒤 시운전으로 진동 값을 기록합니다."
+
+
+def test_near_duplicates_found_both_ways():
+    index = DuplicateIndex()
+    assert index.add(1, BASE) == []
+    assert index.add(2, "컨베이어 벨트 장력을 조정하고 윤활유를 보충합니다.") == []
+    similar = index.add(3, BASE + " 작업 후 보고합니다.")
+    assert [entry_id for entry_id, _ in similar] == [1]
+    assert similar[0][1] >= index.threshold
+
+    # 먼저 추가된 항목에서도 나중 항목이 보임
+    assert [entry_id for entry_id, _ in index.similar(1)] == [3]
+    assert index.similar(2) == [] and index.similar(99) == []
+
+
+def test_remove_and_readd():
+    index = DuplicateIndex()
+    index.add(1, BASE)
+    index.add(2, BASE)
+    index.remove(1)
+    assert index.similar(2) == [] and len(index) == 1
+    assert [entry_id for entry_id, _ in index.add(1, BASE)] == [2]
@@ -0,0 +1,49 @@
+import io
+
+import pdfplumber
+import pytest
+
+from services import pdf_export
+
+SOURCES = [{"title": "펌프 매뉴얼", "page": 3, "end_page": 4, "text": "흡입 밸브를 점검합니다."}]
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    registered, builds = [], []
+    build = pdf_export._build
+    register = pdf_export.pdfmetrics.registerFont
+    monkeypatch.setattr(pdf_export, "_styles", None)
+    monkeypatch.setattr(pdf_export, "_pdf_cache", type(pdf_export._pdf_cache)())
+    monkeypatch.setattr(pdf_export.pdfmetrics, "registerFont", lambda font: (registered.append(font), register(font)))
+    monkeypatch.setattr(pdf_export, "_build", lambda story: (builds.append(story), build(story))[1])
+    return registered, builds
+
+
+def test_fonts_and_styles_are_set_up_once(fresh):
+    registered, _ = fresh
+    styles = pdf_export.get_styles()
+    pdf_export.render_answer_pdf("질문", "답변")
+    pdf_export.render_answer_pdf("다른 질문", "답변")
+    assert pdf_export.get_styles() is styles
+    assert [font.fontName for font in registered].count(pdf_export.FONT_NAME) == 1
+
+
+def test_same_answer_reuses_rendered_pdf(fresh):
+    _, builds = fresh
+    first = pdf_export.render_answer_pdf("펌프 압력은?", "0.3MPa 이상 (p.3)", SOURCES)
+    second = pdf_export.render_answer_pdf("펌프 압력은?", "0.3MPa 이상 (p.3)", [dict(SOURCES[0])])
+    assert second is first and len(builds) == 1
+    other = pdf_export.render_answer_pdf("펌프 압력은?", "다른 답변", SOURCES)
+    assert other != first and len(builds) == 2
+
+
+def test_report_is_valid_pdf(fresh):
+    items = [{"question": f"질문 {i} <b>&", "answer": f"답변 {i}\n둘째 줄", "sources": SOURCES} for i in range(1, 13)]
+    data = pdf_export.render_report(items)
+    assert data.startswith(b"%PDF") and data.rstrip().endswith(b"%%EOF")
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        assert len(pdf.pages) >= 2
+        text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+    assert "질문 12 <b>&" in text and "p.3-4" in text
+    assert pdf_export.render_report(items) is data
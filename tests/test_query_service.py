@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from services import query_service
+from services.backend_client import BackendClient, BackendError
+from services.query_service import QueryService, validate_filters
+
+
+def test_same_question_runs_once(monkeypatch, tmp_path):
+    calls = []
+    release = threading.Event()
+
+    def answer(question, filters=None):
+        calls.append(question)
+        release.wait(5)
+        return {"answer": "답"}
+
+    monkeypatch.setattr(query_service.rag, "answer_question", answer)
+    service = QueryService(max_workers=4, manual_dir=str(tmp_path), index_workers=0)
+
+    async def run():
+        tasks = [asyncio.ensure_future(service.ask(q)) for q in ("펌프 압력은?", "펌프  압력은", "밸브는?")]
+        await asyncio.sleep(0.1)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        service.shutdown()
+    assert [r["answer"] for r in results] == ["답"] * 3
+    assert sorted(calls) == ["밸브는?", "펌프 압력은?"]
+    assert service.snapshot()["coalesced"] == 1
+
+
+def test_unknown_filter_and_manual(tmp_path):
+    service = QueryService(max_workers=1, manual_dir=str(tmp_path), index_workers=0)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(service.ask("질문", filters={"site": "A"}))
+        with pytest.raises(KeyError):
+            asyncio.run(service.ask("질문", pdf_hash="0" * 64))
+    finally:
+        service.shutdown()
+    assert validate_filters({"line": ["A"]}) == {"line": ["A"]}
+
+
+def test_backend_rejects_unknown_filter():
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+
+    with TestClient(app) as client:
+        response = client.post("/ask", json={"question": "질문", "filters": {"site": "A"}})
+        assert response.status_code == 400
+        assert client.get(f"/manuals/{'0' * 64}").status_code == 404
+
+
+def test_backend_rejects_malformed_hash(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+
+    service = QueryService(max_workers=1, manual_dir=str(tmp_path), index_workers=0)
+    try:
+        with pytest.raises(ValueError):
+            service.manual_path("../../x/secret")
+    finally:
+        service.shutdown()
+    with TestClient(app) as client:
+        for bad in ("../../x/secret", "A" * 64, "0" * 63):
+            assert client.post("/ask", json={"question": "질문", "pdf_hash": bad}).status_code == 400
+            assert client.post("/library", json={"pdf_hash": bad}).status_code == 400
+        assert client.post("/manuals/..%2Fsecret/summary").status_code in (400, 404)
+        assert client.post(f"/manuals/{'g' * 64}/summary").status_code == 400
+        assert client.post("/ask", json={"question": "질문", "pdf_hash": "0" * 64}).status_code == 404
+
+
+class RecordingClient(BackendClient):
+    def __init__(self):
+        super().__init__("http://backend")
+        self.stored = set()
+        self.requests = []
+
+    def _request(self, method, path, body=None, content_type="application/json"):
+        self.requests.append((method, path))
+        if method == "GET" and path.startswith("/manuals/"):
+            if path.rsplit("/", 1)[1] not in self.stored:
+                raise BackendError("404: missing", status=404)
+            return {}
+        if path == "/manuals":
+            self.stored.add(hashlib.sha256(body).hexdigest())
+            return {"pdf_hash": hashlib.sha256(body).hexdigest()}
+        return {}
+
+
+def test_manual_uploaded_once():
+    client, known = RecordingClient(), set()
+    first = client.ensure_manual(b"%PDF-1 test", known)
+    second = client.ensure_manual(b"%PDF-1 test", known)
+    assert first == second == hashlib.sha256(b"%PDF-1 test").hexdigest()
+    assert [r for r in client.requests if r[1] == "/manuals"] == [("POST", "/manuals")]
+
+    # 다른 세션(known 없음)은 해시만 확인하고 업로드하지 않음
+    other = client.ensure_manual(b"%PDF-1 test")
+    assert other == first and client.requests[-1] == ("GET", f"/manuals/{first}")
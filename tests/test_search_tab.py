@@ -0,0 +1,22 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+SCRIPT = "from tabs.search import show_search\nshow_search()\n"
+
+
+def _warnings(scope, query):
+    at = AppTest.from_string(SCRIPT, default_timeout=60).run()
+    next(r for r in at.radio if r.label == "검색 범위").set_value(scope).run()
+    next(t for t in at.text_input if t.label == "질문 입력").input(query).run()
+    next(b for b in at.button if b.label == "검색 결과 불러오기").click().run()
+    assert not at.exception
+    return [w.value for w in at.warning]
+
+
+@pytest.mark.parametrize("scope, query, expected", [
+    ("매뉴얼 라이브러리", "", "질문을 입력해 주세요."),
+    ("업로드한 PDF", "", "질문을 입력해 주세요."),
+    ("업로드한 PDF", "펌프 압력은?", "PDF 파일을 업로드해 주세요."),
+])
+def test_missing_input_warnings(scope, query, expected):
+    assert expected in _warnings(scope, query)
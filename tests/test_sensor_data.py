@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from services import sensor_data
+from services.sensor_data import generate_batches
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(sensor_data, "BLOCK_ROWS", 1000)
+
+
+@pytest.mark.parametrize("schema", ["pattern", "log"])
+def test_same_seed_same_rows_for_any_batch_size(schema):
+    kwargs = dict(n_equipment=4, seed=7, drift=0.1, fault_rate=2.0, schema=schema)
+    frames = [pd.concat(generate_batches(5500, batch_size=size, **kwargs), ignore_index=True)
+              for size in (1, 1000, 2500, 10_000)]
+    assert len(frames[0]) == 5500
+    for frame in frames[1:]:
+        pd.testing.assert_frame_equal(frame, frames[0])
+    other = pd.concat(generate_batches(5500, **{**kwargs, "seed": 8}), ignore_index=True)
+    assert not other.equals(frames[0])
+
+
+def test_batches_are_generated_lazily(monkeypatch):
+    made = []
+    make_block = sensor_data._make_block
+
+    def counting(block, *args):
+        made.append(block)
+        return make_block(block, *args)
+
+    monkeypatch.setattr(sensor_data, "_make_block", counting)
+    batches = generate_batches(10 ** 12, batch_size=2000)  # 전체를 만들면 메모리에 올릴 수 없는 크기
+    first = next(batches)
+    assert len(first) == 2000 and made == [0, 1]
+    second = next(batches)
+    assert made == [0, 1, 2, 3]
+    assert second["시간"].iloc[0] == first["시간"].iloc[-1] + pd.Timedelta(seconds=1)
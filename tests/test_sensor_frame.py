@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sensor_data import generate_frame, write_dataset
+from services.sensor_frame import (FLAG_ALERT, FLAGS_COLUMN, TIME_COLUMN, compact_frame, expand_frame, is_alert,
+                                   read_compact)
+
+KWARGS = dict(n_records=3000, n_equipment=5, seed=3, fault_rate=5.0, schema="log")
+
+
+def test_compact_dtypes_and_flags():
+    source = generate_frame(**KWARGS)
+    frame = compact_frame(source)
+    assert FLAGS_COLUMN in frame and "상태코드" not in frame and "이상 여부" not in frame
+    assert frame["센서값1"].dtype == np.float32 and frame["센서값2"].dtype == np.float32
+    assert frame[TIME_COLUMN].dtype == np.int64
+    assert isinstance(frame["설비ID"].dtype, pd.CategoricalDtype)
+    assert frame["설비ID"].cat.codes.dtype == np.int8
+    assert frame["주기"].dtype.itemsize < source["주기"].dtype.itemsize
+    assert frame[FLAGS_COLUMN].dtype == np.uint8 and set(frame[FLAGS_COLUMN]) <= {0, FLAG_ALERT}
+    assert (is_alert(frame) == (source["이상 여부"] == 1).to_numpy()).all()
+    assert frame.memory_usage(deep=True).sum() < source.memory_usage(deep=True).sum() / 2
+
+
+@pytest.mark.parametrize("fmt, ext", [("csv", "csv"), ("parquet", "parquet"), ("arrow", "arrow")])
+def test_write_read_round_trip(tmp_path, fmt, ext):
+    source = generate_frame(**KWARGS)
+    path = str(tmp_path / f"log.{ext}")
+    write_dataset(path, fmt=fmt, **KWARGS)
+    restored = expand_frame(read_compact(path))
+    assert list(restored.columns) == [c for c in source.columns if c not in ("상태코드", "이상 여부")] \
+        + ["상태코드", "이상 여부"]
+    assert (restored[TIME_COLUMN] == source[TIME_COLUMN]).all()
+    for column in ("설비ID", "작업ID", "운영자", "상태코드"):
+        assert (restored[column].astype(str) == source[column].astype(str)).all()
+    assert (restored["이상 여부"] == source["이상 여부"]).all()
+    assert (restored["주기"] == source["주기"]).all()
+    # 센서값은 float32로 줄이므로 float32 정밀도 안에서 같음
+    np.testing.assert_allclose(restored["센서값1"], source["센서값1"].astype(np.float32), rtol=1e-6)
+    np.testing.assert_allclose(restored["센서값2"], source["센서값2"].astype(np.float32), rtol=1e-6)
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        read_compact(str(tmp_path / "log.xlsx"))
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from services.sensor_data import generate_frame
+from services.sensor_frame import TIME_COLUMN, compact_frame
+from services.sensor_index import EQUIPMENT_COLUMN, PartitionIndex
+
+
+def test_slice_matches_filter():
+    frame = compact_frame(generate_frame(3000, n_equipment=4, seed=7, schema="pattern"))
+    frame = frame.sample(frac=1, random_state=0).reset_index(drop=True)  # 시간순이 아닌 입력
+    index = PartitionIndex(frame)
+    assert index.equipment() == ["EQP001", "EQP002", "EQP003", "EQP004"]
+    assert sum(index.rows(name) for name in index.equipment()) == len(frame)
+
+    first, last = index.time_range("EQP002")
+    start, end = first + (last - first) // 4, last - (last - first) // 4
+    result = index.slice("EQP002", start, end, columns=[TIME_COLUMN, "온도"])
+    times = frame[TIME_COLUMN]
+    expected = frame[(frame[EQUIPMENT_COLUMN] == "EQP002") & (times >= start) & (times <= end)]
+    assert list(result.columns) == [TIME_COLUMN, "온도"]
+    assert (np.diff(result[TIME_COLUMN].to_numpy()) >= 0).all()
+    assert sorted(result[TIME_COLUMN]) == sorted(expected[TIME_COLUMN])
+    assert index.locate("EQP002") == index.locate("EQP002", first, last)
+
+
+def test_unknown_or_empty_equipment():
+    frame = pd.DataFrame({
+        EQUIPMENT_COLUMN: pd.Categorical(["A", "A"], categories=["A", "B"]),
+        TIME_COLUMN: np.array([1, 2], dtype=np.int64),
+        "v": np.array([1.0, 2.0], dtype=np.float32),
+    })
+    index = PartitionIndex(frame)
+    assert index.frame is frame  # 이미 정렬된 입력은 복사하지 않음
+    assert index.equipment() == ["A"]
+    assert index.time_range("B") is None and index.time_range("Z") is None
+    assert len(index.slice("Z")) == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from services.sensor_data import PATTERN_SENSORS, write_dataset
+from services.sensor_store import SharedSensorData
+
+
+def test_default_keeps_baseline_sensors():
+    shared = SharedSensorData(path="")
+    frame = shared.current()
+    assert all(name in frame.columns for name in PATTERN_SENSORS)
+    assert shared.missing_sensors() == []
+    assert shared.memory_usage()["source"] == "generated"
+
+
+def test_log_file_reports_missing_sensors_and_reloads(tmp_path):
+    path = str(tmp_path / "log.csv")
+    write_dataset(path, fmt="csv", n_records=500, schema="log")
+    shared = SharedSensorData(path=path, check_seconds=0)
+    assert "센서값1" in shared.current().columns
+    assert shared.missing_sensors() == list(PATTERN_SENSORS)
+    assert shared.view() is not shared.current() and shared.version == 1
+
+    write_dataset(path, fmt="csv", n_records=800, schema="log")
+    assert len(shared.current()) == 800 and shared.version == 2
+
+
+def test_bad_reload_keeps_last_good_frame(tmp_path):
+    path = tmp_path / "log.csv"
+    write_dataset(str(path), fmt="csv", n_records=500, schema="log")
+    shared = SharedSensorData(path=str(path), check_seconds=0)
+    good = shared.current()
+
+    path.write_bytes(b"\x00garbage")  # 쓰는 중이거나 손상된 파일
+    assert shared.current() is good and shared.error
+    path.unlink()
+    assert shared.current() is good and shared.version == 1
+
+    write_dataset(str(path), fmt="csv", n_records=600, schema="log")
+    assert len(shared.current()) == 600 and shared.error is None
+
+
+def test_missing_configured_file_is_not_replaced_by_mock_data(tmp_path):
+    shared = SharedSensorData(path=str(tmp_path / "missing.csv"))
+    with pytest.raises(FileNotFoundError):
+        shared.current()
@@ -0,0 +1,34 @@
+import openai
+import pytest
+
+from services import chat, fake_openai, rag
+from tests.helpers import pdf_file
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server, api_base = fake_openai.start_server(first_token_delay=0.05, token_delay=0.01)
+    monkeypatch.setattr(openai, "api_base", api_base)
+    monkeypatch.setattr(openai, "api_key", "test")
+    yield server
+    server.shutdown()
+
+
+def test_stream_yields_tokens_in_order(fake_server):
+    messages = chat.build_messages("펌프 압력 점검 방법은?", "[p.2] 흡입 밸브를 점검합니다.")
+    expected = fake_openai.fake_answer(messages)
+    stream = chat.TimedStream(chat.stream(messages))
+    tokens = list(stream)
+    assert len(tokens) > 1
+    assert "".join(tokens) == expected and stream.text == expected
+    assert stream.ttft_ms is not None and 0 < stream.ttft_ms <= stream.total_ms
+
+
+def test_stream_rag_chain_over_fake_server(fake_server):
+    manual = pdf_file(["펌프 압력이 떨어지면 흡입 밸브를 점검합니다.", "베어링 온도가 높으면 정지합니다."])
+    context, stream = rag.stream_rag_chain("펌프 압력 점검은?", manual)
+    tokens = list(stream)
+    assert stream.text == "".join(tokens).strip()
+    assert stream.text.startswith("'펌프 압력 점검은?'에 대한 매뉴얼 기반 답변입니다")
+    assert "p.1" in stream.text and context["context"]
+    assert stream.ttft_ms <= stream.total_ms
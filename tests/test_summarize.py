@@ -0,0 +1,34 @@
+import threading
+
+from services.summarize import Summarizer, SummaryCache
+
+
+def _chunks(prefix, pages):
+    return [{"page": page, "text": f"{prefix} {page}쪽 절차"} for page in range(1, pages + 1)]
+
+
+def test_stats_are_per_call(tmp_path):
+    started = threading.Barrier(2)
+
+    def complete(messages, max_tokens=None):
+        return "요약: " + messages[-1]["content"][:20]
+
+    summarizer = Summarizer(cache=SummaryCache(str(tmp_path / "s.sqlite3")), complete=complete, max_workers=2)
+    first = summarizer.summarize_chunks(_chunks("A", 3))
+    assert first["stats"] == {"chunks": 3, "generated": 5, "cached": 0}
+
+    # 같은 요약기를 동시에 쓰는 두 호출이 서로의 집계를 덮어쓰지 않아야 함
+    results = {}
+
+    def run(name, chunks):
+        started.wait()
+        results[name] = summarizer.summarize_chunks(chunks)["stats"]
+
+    threads = [threading.Thread(target=run, args=("cached", _chunks("A", 3))),
+               threading.Thread(target=run, args=("new", _chunks("B", 2)))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results["cached"] == {"chunks": 3, "generated": 0, "cached": 5}
+    assert results["new"] == {"chunks": 2, "generated": 4, "cached": 0}
@@ -0,0 +1,25 @@
+from tabs import wiki
+
+
+def test_entry_fields_are_escaped_before_caching():
+    entry = {"id": 10_001, "version": 1, "author": "<img src=x onerror=alert(1)>",
+             "tags": ["<b>펌프</b>", "a&b"], "content": "<script>alert('x')</script>\n둘째 줄"}
+    card = wiki.render_entry_html(entry)
+    assert "<script>" not in card and "<img" not in card and "<b>" not in card
+    assert "&lt;script&gt;" in card and "a&amp;b" in card
+    assert "&lt;/script&gt;<br />둘째 줄" in card
+    # 캐시에서 다시 꺼낸 카드도 이스케이프된 그대로
+    assert wiki._render_cache[(entry["id"], entry["version"])] == card
+    assert wiki.render_entry_html(entry) == card
+
+
+def test_llm_app_renders_escaped_entries():
+    from streamlit.testing.v1 import AppTest
+
+    from services.wiki_store import get_wiki_store
+
+    get_wiki_store().add_entry("<b>김</b>", ["펌프"], "<script>alert(1)</script>")
+    at = AppTest.from_file("../llm.py", default_timeout=60).run()
+    assert not at.exception
+    cards = [m.value for m in at.markdown if "alert(1)" in m.value]
+    assert cards and all("<script>" not in card and "<b>김" not in card for card in cards)
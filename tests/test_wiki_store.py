@@ -0,0 +1,78 @@
+import pytest
+
+from services.wiki_store import WikiStore
+
+PUMP = "펌프 압력이 떨어지면 흡입 밸브를 점검하고 필터 카트리지를 교체한 뒤 시운전으로 진동 값을 기록합니다."
+
+OTHERS = ["컨베이어 벨트 장력을 조정합니다.", "프레스 금형 교체 전 전원을 차단합니다.", "냉각수 탱크 수위를 확인합니다.",
+          "로봇 그리퍼 공압 호스를 교체합니다.", "용접기 토치 팁을 청소합니다."]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WikiStore(str(tmp_path / "wiki.sqlite3"))
+
+
+def test_similar_pairs_ignore_pagination(store):
+    first = store.add_entry("김", ["펌프"], PUMP)
+    for text in OTHERS:
+        store.add_entry("이", ["기타"], text)
+    later = store.add_entry("박", ["펌프"], PUMP + " 작업 후 보고합니다.")
+
+    page = store.search(page=1, page_size=2)["entries"]
+    assert later["id"] in [e["id"] for e in page] and first["id"] not in [e["id"] for e in page]
+    pairs = store.similar_pairs([e["id"] for e in page])
+    assert [(a["id"], b["id"]) for a, b, _ in pairs] == [(first["id"], later["id"])]
+    # 먼저 쓴 항목 쪽에서 찾아도 같은 쌍
+    assert [(a["author"], b["author"]) for a, b, _ in store.similar_pairs([first["id"]])] == [("김", "박")]
+
+    store.delete_entry(first["id"])
+    assert store.similar_pairs([later["id"]]) == []
+
+
+def test_search_matches_substrings_and_prefixes(store):
+    pump = store.add_entry("김", ["펌프"], "펌프 압력이 떨어지면 흡입 밸브(valve V-101)를 점검합니다.")
+    store.add_entry("이", ["설비"], "프레스 금형 교체 전에는 전원을 차단합니다.")
+    store.add_entry("Park", ["설비"], "냉각수 밸브는 매월 점검합니다.")
+
+    def ids(query, **kwargs):
+        result = store.search(query, **kwargs)
+        assert result["total"] == len(result["entries"])
+        return [e["id"] for e in result["entries"]]
+
+    assert ids("펌") == [pump["id"]]  # 한 글자
+    assert ids("valv") == [pump["id"]] and ids("valv*") == [pump["id"]] and ids("v-10") == [pump["id"]]
+    assert ids("VALVE") == [pump["id"]]
+    assert len(ids("밸브")) == 2
+    # 검색어의 2-gram을 모두 포함해야 함 (하나만 겹치는 "압박"은 제외)
+    assert ids("압력") == [pump["id"]] and ids("압박") == []
+    assert ids("밸브 펌") == [pump["id"]]
+    assert ids("par") == ids("k") == [pump["id"] + 2]
+    assert ids("펌", tags=["설비"]) == []
+
+
+def test_tag_counts_and_top_tags(store):
+    store.add_entry("김", ["펌프", "밸브"], OTHERS[0])
+    store.add_entry("이", ["펌프"], OTHERS[1])
+    last = store.add_entry("박", ["펌프", "밸브", "모터", " ", "모터"], OTHERS[2])  # 공백·중복 태그는 한 번만
+    assert store.tag_counts() == {"펌프": 3, "밸브": 2, "모터": 1}
+    assert store.top_tags(2) == [("펌프", 3), ("밸브", 2)]
+
+    store.delete_entry(last["id"])
+    assert store.tag_counts() == {"펌프": 2, "밸브": 1}  # 0이 된 태그는 빠짐
+    assert store.top_tags() == [("펌프", 2), ("밸브", 1)]
+
+
+def test_filter_by_tags_any_and_all(store):
+    a = store.add_entry("김", ["펌프", "밸브"], OTHERS[0])["id"]
+    b = store.add_entry("이", ["펌프"], OTHERS[1])["id"]
+    c = store.add_entry("박", ["밸브", "모터"], OTHERS[2])["id"]
+    assert store.filter_by_tags(["펌프"]) == (2, [b, a])
+    assert store.filter_by_tags(["펌프", "모터"], mode="any") == (3, [c, b, a])
+    assert store.filter_by_tags(["펌프", "밸브"], mode="all") == (1, [a])
+    assert store.filter_by_tags(["펌프", "없는 태그"], mode="all") == (0, [])
+    assert store.filter_by_tags(["펌프", "밸브"], mode="any", limit=1, offset=1) == (3, [b])
+
+    store.delete_entry(a)
+    assert store.filter_by_tags(["펌프", "밸브"], mode="all") == (0, [])
+    assert store.filter_by_tags(["펌프", "밸브"], mode="any") == (2, [c, b])